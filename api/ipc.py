@@ -0,0 +1,201 @@
+from dotenv import load_dotenv
+load_dotenv()
+import os
+import json
+import struct
+import asyncio
+import inspect
+import logging
+import itertools
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from fastapi.responses import StreamingResponse, JSONResponse
+from pydantic import BaseModel
+
+logger = logging.getLogger("api_ipc")
+
+# Local socket the API worker processes use to hand requests to the bot
+IPC_SOCKET = os.getenv("API_IPC_SOCKET", "/tmp/stabilibot-api.sock")
+
+# Messages are a 4-byte big-endian length followed by compact JSON.
+# Worker -> bot:  {"id", "op": route name, "args": {parameter: value}}
+# Bot -> worker:  {"id", "status", "body"} for a JSON answer,
+#                 {"id", "status", "raw", "media_type"} for any other response, or
+#                 {"id", "status", "media_type", "stream": true}, then {"id", "chunk"}... and {"id", "end": true}
+_HEADER = struct.Struct("!I")
+
+def write_message(writer: asyncio.StreamWriter, message: dict):
+    data = json.dumps(message, separators=(",", ":"), default=str).encode()
+    writer.write(_HEADER.pack(len(data)) + data)
+
+async def read_message(reader: asyncio.StreamReader) -> dict:
+    (length,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    return json.loads(await reader.readexactly(length))
+
+class CommandServer:
+    """Bot side of the out-of-process API.
+
+    Listens on the IPC socket and runs each command it receives with the matching V1
+    route handler on the bot's loop. The worker has already parsed and validated the
+    HTTP request; here the arguments are only turned back into the handler's models."""
+
+    def __init__(self, router, is_ready, path: str = IPC_SOCKET, ungated_paths=()):
+        self.routes = {route.name: route for route in router.routes if isinstance(route, APIRoute)}
+        # Routes answered even while is_ready() is False
+        self.ungated = {route.name for route in self.routes.values() if route.path in ungated_paths}
+        self.is_ready = is_ready
+        self.path = path
+        self.server = None
+        self.commands = 0
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # Left over from a previous run
+        self.server = await asyncio.start_unix_server(self._serve_worker, path=self.path)
+        logger.info(f"API command socket listening on {self.path}")
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _serve_worker(self, reader, writer):
+        running = set()
+        try:
+            while True:
+                message = await read_message(reader)
+                task = asyncio.create_task(self._run(message, writer))
+                running.add(task)
+                task.add_done_callback(running.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # Worker went away
+        finally:
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            writer.close()
+
+    async def _run(self, message, writer):
+        request_id = message["id"]
+        self.commands += 1
+        try:
+            if not self.is_ready() and message["op"] not in self.ungated:
+                write_message(writer, {"id": request_id, "status": 503, "body": {"error": "Bot is not connected to Discord"}})
+                return
+
+            if message["op"] == "readiness":
+                write_message(writer, {"id": request_id, "status": 200, "body": {"ready": True}})
+                return
+
+            route = self.routes.get(message["op"])
+            if route is None:
+                write_message(writer, {"id": request_id, "status": 404, "body": {"error": "Not found"}})
+                return
+
+            response = Response()
+            result = route.endpoint(**self._arguments(route, message["args"], response))
+            if inspect.isawaitable(result):
+                result = await result
+
+            if isinstance(result, StreamingResponse):
+                write_message(writer, {"id": request_id, "status": result.status_code, "media_type": result.media_type, "stream": True})
+                async for chunk in result.body_iterator:
+                    write_message(writer, {"id": request_id, "chunk": chunk if isinstance(chunk, str) else chunk.decode()})
+                    await writer.drain()
+                write_message(writer, {"id": request_id, "end": True})
+            elif isinstance(result, Response):
+                write_message(writer, {"id": request_id, "status": result.status_code, "raw": result.body.decode(), "media_type": result.media_type})
+            else:
+                write_message(writer, {"id": request_id, "status": response.status_code, "body": result})
+        except Exception as e:
+            logger.error(f"API command {message.get('op')} failed: {str(e)}", exc_info=True)
+            write_message(writer, {"id": request_id, "status": 500, "body": {"error": f"Internal error: {str(e)}"}})
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    def _arguments(self, route, args, response):
+        arguments = {}
+        for name, parameter in inspect.signature(route.endpoint).parameters.items():
+            if parameter.annotation is Request:
+                arguments[name] = None  # Handlers don't read the raw request
+            elif parameter.annotation is Response:
+                arguments[name] = response
+            elif inspect.isclass(parameter.annotation) and issubclass(parameter.annotation, BaseModel):
+                arguments[name] = parameter.annotation.model_validate(args[name])
+            elif name in args:
+                arguments[name] = args[name]
+        return arguments
+
+class CommandClient:
+    """Worker side: one connection to the bot, shared by every request in the process.
+    Replies are matched to requests by id, so requests don't wait on each other."""
+
+    def __init__(self, path: str = IPC_SOCKET):
+        self.path = path
+        self.reader = None
+        self.writer = None
+        self.pending: dict = {}  # request id -> queue of reply frames
+        self._ids = itertools.count()
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def connected(self):
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def connect(self):
+        async with self._connect_lock:
+            if self.connected:
+                return
+            self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+            asyncio.create_task(self._read_replies(self.reader))
+
+    async def _read_replies(self, reader):
+        try:
+            while True:
+                frame = await read_message(reader)
+                queue = self.pending.get(frame["id"])
+                if queue is not None:
+                    queue.put_nowait(frame)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            logger.error("Lost the connection to the bot")
+        finally:
+            self.writer = None
+            # Fail whatever was still waiting on the bot
+            for queue in self.pending.values():
+                queue.put_nowait({"status": 503, "body": {"error": "Lost the connection to the bot"}, "end": True})
+
+    async def call(self, op: str, args: dict):
+        """Sends one command and returns the HTTP response for it."""
+        try:
+            await self.connect()
+        except (FileNotFoundError, ConnectionError) as e:
+            return JSONResponse({"error": f"Bot is not accepting API commands: {e}"}, status_code=503)
+
+        request_id = next(self._ids)
+        queue = asyncio.Queue()
+        self.pending[request_id] = queue
+        write_message(self.writer, {"id": request_id, "op": op, "args": args})
+        await self.writer.drain()
+
+        first = await queue.get()
+        if not first.get("stream"):
+            self.pending.pop(request_id, None)
+            if "raw" in first:
+                return Response(first["raw"], status_code=first["status"], media_type=first.get("media_type"))
+            return JSONResponse(first["body"], status_code=first["status"])
+
+        async def chunks():
+            try:
+                while True:
+                    frame = await queue.get()
+                    if frame.get("end"):
+                        return
+                    yield frame["chunk"]
+            finally:
+                self.pending.pop(request_id, None)
+        return StreamingResponse(chunks(), status_code=first["status"], media_type=first.get("media_type"))
@@ -4,12 +4,29 @@ import discord
 from discord.ext import commands
 import os
 from fastapi import APIRouter, Request, Response
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
+import json
 import logging
 from typing import Optional, List
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from core.concurrency import gather_with_limit
+from core.guild_index import guild_index
+from core.discord_writes import discord_writes, BULK
+from core.jobs import dm_jobs, api_jobs, find_job, QueueFull
+from core.backend import backend
+from core.metrics import metrics
+from core.tracing import trace_log
+from core.gateway_profile import gateway_profile
+
+# Member edits share one per-guild rate limit bucket, so a batch only keeps a few in
+# flight and lets the write scheduler pace the rest
+BATCH_ROLE_CONCURRENCY = 3
+
+# Answered even while the bot isn't connected to the gateway: they don't need Discord,
+# and monitoring needs them most when it's down
+UNGATED_PATHS = {"/metrics", "/traces"}
+
 logger = logging.getLogger(__name__)
 
 class DiscordRoleAction(BaseModel):
@@ -23,6 +40,8 @@ class CreateChannelRequest(BaseModel):
     access_roles: List[str]
     view_users: List[int]
     access_users: List[int]
+    run_async: Optional[bool] = False  # Return 202 with a job id instead of waiting on Discord
+    callback_url: Optional[str] = None  # With run_async, POST the finished job here
     token: str
 
 class CreateRoleRequest(BaseModel):
@@ -31,10 +50,14 @@ class CreateRoleRequest(BaseModel):
     hoist: Optional[bool] = False  # Whether the role should be displayed separately
     mentionable: Optional[bool] = False  # Whether the role can be mentioned
     permissions: Optional[int] = None  # Permission integer
+    run_async: Optional[bool] = False  # Return 202 with a job id instead of waiting on Discord
+    callback_url: Optional[str] = None  # With run_async, POST the finished job here
     token: str
 
 class DeleteRoleRequest(BaseModel):
     role_name: str
+    run_async: Optional[bool] = False  # Return 202 with a job id instead of waiting on Discord
+    callback_url: Optional[str] = None  # With run_async, POST the finished job here
     token: str
 
 class SetNicknameRequest(BaseModel):
@@ -42,11 +65,25 @@ class SetNicknameRequest(BaseModel):
     nickname: str
     token: str
 
+class RoleAssignment(BaseModel):
+    user_id: int
+    add: List[str] = []
+    remove: List[str] = []
+
+class BatchRoleRequest(BaseModel):
+    assignments: List[RoleAssignment]
+    token: str
+
 class SendDMRequest(BaseModel):
     user_id: int
     message: str
     token: str
 
+class BroadcastDMRequest(BaseModel):
+    user_ids: List[int]
+    message: str
+    token: str
+
 class V1(commands.Cog):
     def __init__(self, bot: discord.Bot):
         self.bot = bot
@@ -60,6 +97,25 @@ class V1(commands.Cog):
             logger.info("Valid token provided to root endpoint")
             return {"message": "Welcome to the API!"}
         
+        # Prometheus text format. Scrape with ?token=... like the other endpoints.
+        # Async so the collectors read bot state on the event loop, not from a threadpool.
+        @self.router.get("/metrics")
+        async def get_metrics(request: Request, response: Response, token: str = None):
+            if token != os.getenv("API_TOKEN"):
+                logger.warning("Invalid token provided to metrics endpoint")
+                response.status_code = 401
+                return {"error": "Invalid token"}
+            return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+        # Slowest traced interactions, stage by stage. ?name=/roll to filter by command.
+        @self.router.get("/traces")
+        async def get_traces(request: Request, response: Response, token: str = None, limit: int = 10, name: str = None):
+            if token != os.getenv("API_TOKEN"):
+                logger.warning("Invalid token provided to traces endpoint")
+                response.status_code = 401
+                return {"error": "Invalid token"}
+            return {"traces": trace_log.slowest(limit, name)}
+
         @self.router.post("/{user_id}/roles/add")
         async def add_role(request: Request, response: Response, user_id: int, action: DiscordRoleAction):
             logger.info("Received request to add roles '%s' to user ID %d", ', '.join(action.roles), user_id)
@@ -73,20 +129,20 @@ class V1(commands.Cog):
                 response.status_code = 404
                 return {"error": "Guild not found"}
             
-            member = guild.get_member(user_id)
+            member = await self.get_member(guild, user_id)
             if not member:
                 logger.error("Member with ID %d not found", user_id)
                 response.status_code = 404
                 return {"error": "Member not found"}
             
             for role_name in action.roles:
-                role = discord.utils.get(guild.roles, name=role_name)
+                role = guild_index.role(guild, role_name)
                 if not role:
                     logger.error("Role '%s' not found", role_name)
                     response.status_code = 404
                     return {"error": "Role not found"}
                 
-                await member.add_roles(role)
+                await discord_writes.add_roles(member, role)
                 logger.info("Role '%s' added to user '%s'", role.name, member.name)
 
             return {"message": f"Roles {', '.join(action.roles)} added to {member.name}"}
@@ -104,24 +160,99 @@ class V1(commands.Cog):
                 response.status_code = 404
                 return {"error": "Guild not found"}
             
-            member = guild.get_member(user_id)
+            member = await self.get_member(guild, user_id)
             if not member:
                 logger.error("Member with ID %d not found", user_id)
                 response.status_code = 404
                 return {"error": "Member not found"}
             
             for role_name in action.roles:
-                role = discord.utils.get(guild.roles, name=role_name)
+                role = guild_index.role(guild, role_name)
                 if not role:
                     logger.error("Role '%s' not found", role_name)
                     response.status_code = 404
                     return {"error": "Role not found"}
                 
-                await member.remove_roles(role)
+                await discord_writes.remove_roles(member, role)
                 logger.info("Role '%s' removed from user '%s'", role.name, member.name)
 
             return {"message": f"Roles {', '.join(action.roles)} removed from {member.name}"}
         
+        @self.router.post("/roles/batch")
+        async def batch_roles(request: Request, response: Response, batch_request: BatchRoleRequest):
+            logger.info(f"Received request to update roles for {len(batch_request.assignments)} users")
+            if batch_request.token != os.getenv("API_TOKEN"):
+                logger.warning("Invalid token provided to batch_roles endpoint")
+                response.status_code = 401
+                return {"error": "Invalid token"}
+            guild = self.bot.get_guild(int(os.getenv("GUILD_ID")))
+            if not guild:
+                logger.error("Guild not found")
+                response.status_code = 404
+                return {"error": "Guild not found"}
+
+            # Merge the assignments per user first, so two entries for the same member become
+            # one edit instead of two concurrent full-list PATCHes that overwrite each other.
+            # Later entries win where they disagree about a role.
+            merged = {}
+            for assignment in batch_request.assignments:
+                entry = merged.setdefault(assignment.user_id, RoleAssignment(user_id=assignment.user_id, add=[], remove=[]))
+                for name in assignment.add:
+                    entry.remove = [other for other in entry.remove if other != name]
+                    if name not in entry.add:
+                        entry.add.append(name)
+                for name in assignment.remove:
+                    entry.add = [other for other in entry.add if other != name]
+                    if name not in entry.remove:
+                        entry.remove.append(name)
+            assignments = list(merged.values())
+
+            # Resolve every role name once for the whole batch
+            names = {name for assignment in assignments for name in assignment.add + assignment.remove}
+            roles_by_name = {name: role for name in names if (role := guild_index.role(guild, name))}
+
+            async def apply(assignment: RoleAssignment):
+                result = {"user_id": str(assignment.user_id)}
+                member = await self.get_member(guild, assignment.user_id)
+                if not member:
+                    return {**result, "status": "error", "error": "Member not found"}
+
+                missing = [name for name in assignment.add + assignment.remove if name not in roles_by_name]
+                if missing:
+                    return {**result, "status": "error", "error": f"Roles not found: {', '.join(missing)}"}
+
+                to_add = {roles_by_name[name] for name in assignment.add}
+                to_remove = {roles_by_name[name] for name in assignment.remove}
+                current = set(member.roles)
+                updated = (current | to_add) - to_remove
+                if updated == current:
+                    return {**result, "status": "unchanged"}
+
+                try:
+                    # One PATCH with the member's final role list instead of one call per role
+                    await discord_writes.edit_member(member, roles=[role for role in updated if not role.is_default()])
+                    logger.info(f"Updated roles for user '{member.name}' (+{len(to_add - current)} -{len(to_remove & current)})")
+                    return {**result, "status": "updated"}
+                except discord.errors.Forbidden:
+                    logger.error(f"Bot doesn't have permission to update roles for user '{member.name}'")
+                    return {**result, "status": "error", "error": "Bot doesn't have permission to update roles"}
+                except Exception as e:
+                    logger.error(f"Error updating roles for user '{member.name}': {str(e)}")
+                    return {**result, "status": "error", "error": str(e)}
+
+            results = await gather_with_limit([apply(assignment) for assignment in assignments], limit=BATCH_ROLE_CONCURRENCY)
+            results = [
+                result if not isinstance(result, BaseException) else {"user_id": str(assignment.user_id), "status": "error", "error": str(result)}
+                for assignment, result in zip(assignments, results)
+            ]
+
+            failed = sum(1 for result in results if result["status"] == "error")
+            logger.info(f"Batch role update finished: {len(results) - failed} succeeded, {failed} failed")
+            return {
+                "message": f"Updated roles for {len(results) - failed} of {len(results)} users",
+                "results": results
+            }
+
         @self.router.post("/channels/create-text")
         async def create_text_channel(request: Request, response: Response, channel_request: CreateChannelRequest):
             logger.info(f"Received request to create text channel: {channel_request.channel_name} in category: {channel_request.category_name}")
@@ -130,7 +261,12 @@ class V1(commands.Cog):
                 logger.warning("Invalid token provided to create_text_channel endpoint")
                 response.status_code = 401
                 return {"error": "Invalid token"}
-            
+
+            if channel_request.run_async:
+                return self.submit_job(response, "create_text_channel", lambda job_response: make_text_channel(job_response, channel_request), channel_request.callback_url)
+            return await make_text_channel(response, channel_request)
+
+        async def make_text_channel(response: Response, channel_request: CreateChannelRequest):
             guild = self.bot.get_guild(int(os.getenv("GUILD_ID")))
             if not guild:
                 logger.error("Guild not found")
@@ -138,7 +274,7 @@ class V1(commands.Cog):
                 return {"error": "Guild not found"}
             
             # Find the category
-            category = discord.utils.get(guild.categories, name=channel_request.category_name)
+            category = guild_index.category(guild, channel_request.category_name)
             if not category:
                 logger.error(f"Category '{channel_request.category_name}' not found")
                 response.status_code = 404
@@ -151,7 +287,7 @@ class V1(commands.Cog):
             
             # Add view roles
             for role_name in channel_request.view_roles:
-                role = discord.utils.get(guild.roles, name=role_name)
+                role = guild_index.role(guild, role_name)
                 if not role:
                     logger.error(f"View role '{role_name}' not found")
                     response.status_code = 404
@@ -160,7 +296,7 @@ class V1(commands.Cog):
             
             # Add access roles
             for role_name in channel_request.access_roles:
-                role = discord.utils.get(guild.roles, name=role_name)
+                role = guild_index.role(guild, role_name)
                 if not role:
                     logger.error(f"Access role '{role_name}' not found")
                     response.status_code = 404
@@ -168,7 +304,7 @@ class V1(commands.Cog):
                 overwrites[role] = discord.PermissionOverwrite(read_messages=True, send_messages=True)
 
             for user_id in channel_request.view_users:
-                user = guild.get_member(user_id)
+                user = await self.get_member(guild, user_id)
                 if not user:
                     logger.error(f"View user '{user_id}' not found")
                     response.status_code = 404
@@ -176,7 +312,7 @@ class V1(commands.Cog):
                 overwrites[user] = discord.PermissionOverwrite(read_messages=True, send_messages=False)
 
             for user_id in channel_request.access_users:
-                user = guild.get_member(user_id)
+                user = await self.get_member(guild, user_id)
                 if not user:
                     logger.error(f"Access user '{user_id}' not found")
                     response.status_code = 404
@@ -209,7 +345,12 @@ class V1(commands.Cog):
                 logger.warning("Invalid token provided to create_voice_channel endpoint")
                 response.status_code = 401
                 return {"error": "Invalid token"}
-            
+
+            if channel_request.run_async:
+                return self.submit_job(response, "create_voice_channel", lambda job_response: make_voice_channel(job_response, channel_request), channel_request.callback_url)
+            return await make_voice_channel(response, channel_request)
+
+        async def make_voice_channel(response: Response, channel_request: CreateChannelRequest):
             guild = self.bot.get_guild(int(os.getenv("GUILD_ID")))
             if not guild:
                 logger.error("Guild not found")
@@ -217,7 +358,7 @@ class V1(commands.Cog):
                 return {"error": "Guild not found"}
             
             # Find the category
-            category = discord.utils.get(guild.categories, name=channel_request.category_name)
+            category = guild_index.category(guild, channel_request.category_name)
             if not category:
                 logger.error(f"Category '{channel_request.category_name}' not found")
                 response.status_code = 404
@@ -247,7 +388,7 @@ class V1(commands.Cog):
                 overwrites[role] = discord.PermissionOverwrite(view_channel=True, connect=True, speak=True)
 
             for user_id in channel_request.view_users:
-                user = guild.get_member(user_id)
+                user = await self.get_member(guild, user_id)
                 if not user:
                     logger.error(f"View user '{user_id}' not found")
                     response.status_code = 404
@@ -255,7 +396,7 @@ class V1(commands.Cog):
                 overwrites[user] = discord.PermissionOverwrite(view_channel=True, connect=False)
 
             for user_id in channel_request.access_users:
-                user = guild.get_member(user_id)
+                user = await self.get_member(guild, user_id)
                 if not user:
                     logger.error(f"Access user '{user_id}' not found")
                     response.status_code = 404
@@ -288,7 +429,12 @@ class V1(commands.Cog):
                 logger.warning("Invalid token provided to create_role endpoint")
                 response.status_code = 401
                 return {"error": "Invalid token"}
-            
+
+            if role_request.run_async:
+                return self.submit_job(response, "create_role", lambda job_response: make_role(job_response, role_request), role_request.callback_url)
+            return await make_role(response, role_request)
+
+        async def make_role(response: Response, role_request: CreateRoleRequest):
             guild = self.bot.get_guild(int(os.getenv("GUILD_ID")))
             if not guild:
                 logger.error("Guild not found")
@@ -296,7 +442,7 @@ class V1(commands.Cog):
                 return {"error": "Guild not found"}
             
             # Check if role already exists
-            existing_role = discord.utils.get(guild.roles, name=role_request.role_name)
+            existing_role = guild_index.role(guild, role_request.role_name)
             if existing_role:
                 logger.warning(f"Role '{role_request.role_name}' already exists")
                 response.status_code = 409
@@ -348,7 +494,12 @@ class V1(commands.Cog):
                 logger.warning("Invalid token provided to delete_role endpoint")
                 response.status_code = 401
                 return {"error": "Invalid token"}
-            
+
+            if role_request.run_async:
+                return self.submit_job(response, "delete_role", lambda job_response: remove_role_from_guild(job_response, role_request), role_request.callback_url)
+            return await remove_role_from_guild(response, role_request)
+
+        async def remove_role_from_guild(response: Response, role_request: DeleteRoleRequest):
             guild = self.bot.get_guild(int(os.getenv("GUILD_ID")))
             if not guild:
                 logger.error("Guild not found")
@@ -356,7 +507,7 @@ class V1(commands.Cog):
                 return {"error": "Guild not found"}
             
             # Find the role to delete
-            role = discord.utils.get(guild.roles, name=role_request.role_name)
+            role = guild_index.role(guild, role_request.role_name)
             if not role:
                 logger.error(f"Role '{role_request.role_name}' not found")
                 response.status_code = 404
@@ -399,7 +550,7 @@ class V1(commands.Cog):
                 response.status_code = 404
                 return {"error": "Guild not found"}
             
-            member = guild.get_member(user_id)
+            member = await self.get_member(guild, user_id)
             if not member:
                 logger.error(f"Member with ID {user_id} not found")
                 response.status_code = 404
@@ -407,7 +558,7 @@ class V1(commands.Cog):
             
             try:
                 # Set the nickname
-                await member.edit(nick=nickname_request.nickname)
+                await discord_writes.edit_member(member, nick=nickname_request.nickname)
                 
                 logger.info(f"Set nickname for user '{member.name}' to '{nickname_request.nickname}'")
                 return {
@@ -442,7 +593,7 @@ class V1(commands.Cog):
                     return {"error": "User not found"}
 
             try:
-                await user.send(dm_request.message)
+                await discord_writes.send_dm(user, dm_request.message)
                 logger.info(f"Sent DM to user '{user.name}'")
                 return {"message": f"DM sent to {user.name}"}
             except discord.Forbidden:
@@ -453,3 +604,129 @@ class V1(commands.Cog):
                 response.status_code = 500
                 return {"error": f"Error sending DM: {str(e)}"}
 
+        @self.router.post("/dm/broadcast")
+        async def broadcast_dm(request: Request, response: Response, broadcast_request: BroadcastDMRequest):
+            logger.info(f"Received request to DM {len(broadcast_request.user_ids)} users")
+
+            if broadcast_request.token != os.getenv("API_TOKEN"):
+                logger.warning("Invalid token provided to broadcast_dm endpoint")
+                response.status_code = 401
+                return {"error": "Invalid token"}
+
+            # Same user listed twice only gets the message once
+            user_ids = list(dict.fromkeys(broadcast_request.user_ids))
+
+            try:
+                job = dm_jobs.submit("dm_broadcast", lambda job: self.broadcast(job, user_ids, broadcast_request.message), total=len(user_ids))
+            except QueueFull as e:
+                logger.error(str(e))
+                response.status_code = 503
+                return {"error": str(e)}
+
+            response.status_code = 202
+            return {"message": f"Broadcast to {len(user_ids)} users queued", "job_id": job.id}
+
+        @self.router.get("/jobs/{job_id}")
+        async def get_job(request: Request, response: Response, job_id: str, token: str = None, offset: int = 0):
+            if token != os.getenv("API_TOKEN"):
+                logger.warning("Invalid token provided to get_job endpoint")
+                response.status_code = 401
+                return {"error": "Invalid token"}
+
+            job = find_job(job_id)
+            if not job:
+                response.status_code = 404
+                return {"error": "Job not found"}
+            return job.to_dict(offset)
+
+        # Newline-delimited JSON: one line per result as it lands, then a summary line
+        @self.router.get("/jobs/{job_id}/stream")
+        async def stream_job(request: Request, response: Response, job_id: str, token: str = None, offset: int = 0):
+            if token != os.getenv("API_TOKEN"):
+                logger.warning("Invalid token provided to stream_job endpoint")
+                response.status_code = 401
+                return {"error": "Invalid token"}
+
+            job = find_job(job_id)
+            if not job:
+                response.status_code = 404
+                return {"error": "Job not found"}
+
+            async def lines():
+                async for result in job.watch(offset):
+                    yield json.dumps(result) + "\n"
+                summary = job.to_dict()
+                summary.pop("results")
+                yield json.dumps(summary) + "\n"
+
+            return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    # Queue one of the endpoints' work as an api job and answer 202. `work` takes the
+    # Response the endpoint would have set its status code on. With a callback_url the
+    # job is POSTed there when it finishes, whether it's done or failed.
+    def submit_job(self, response, kind, work, callback_url=None):
+        async def run(job):
+            job_response = Response()
+            try:
+                body = await work(job_response)
+            except Exception as e:
+                if callback_url:
+                    await self.send_callback(callback_url, {"job_id": job.id, "kind": kind, "status": "failed", "error": str(e)})
+                raise
+            result = {"status_code": job_response.status_code, "body": body}
+            if callback_url:
+                await self.send_callback(callback_url, {"job_id": job.id, "kind": kind, "status": "done", "result": result})
+            return result
+
+        try:
+            job = api_jobs.submit(kind, run)
+        except QueueFull as e:
+            logger.error(str(e))
+            response.status_code = 503
+            return {"error": str(e)}
+
+        response.status_code = 202
+        return {"message": f"{kind} queued", "job_id": job.id}
+
+    # A member missing from the cache isn't necessarily missing from the guild: under the
+    # standard and minimal gateway profiles the cache fills in after startup, or never,
+    # so until it is complete a miss is fetched from Discord instead
+    async def get_member(self, guild, user_id):
+        member = guild.get_member(user_id)
+        if member is not None or (gateway_profile.members_loaded.is_set() and gateway_profile.chunking != "never"):
+            return member
+        try:
+            return await guild.fetch_member(user_id)
+        except discord.NotFound:
+            return None
+
+    async def send_callback(self, url, payload):
+        try:
+            async with backend.session.post(url, json=payload) as callback_response:
+                if callback_response.status >= 400:
+                    logger.error(f"Job callback to {url} failed: {callback_response.status}")
+        except Exception as e:
+            logger.error(f"Job callback to {url} failed: {str(e)}")
+
+    # Background half of /dm/broadcast. Records delivered/forbidden/failed per user.
+    async def broadcast(self, job, user_ids, message):
+        guild = self.bot.get_guild(int(os.getenv("GUILD_ID")))
+        for user_id in user_ids:
+            result = {"user_id": str(user_id)}
+            try:
+                # Cached members and users first; fetching is a Discord call of its own
+                user = (guild and guild.get_member(user_id)) or self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+                await discord_writes.send_dm(user, message, priority=BULK)
+                result["status"] = "delivered"
+            except discord.NotFound:
+                result.update(status="failed", error="User not found")
+            except discord.Forbidden:
+                result.update(status="forbidden", error="Cannot send DM to this user (DMs may be disabled)")
+            except Exception as e:
+                logger.error(f"Error sending broadcast DM to user ID {user_id}: {str(e)}")
+                result.update(status="failed", error=str(e))
+            job.add_result(result)
+
+        delivered = sum(1 for result in job.results if result["status"] == "delivered")
+        logger.info(f"Broadcast {job.id} finished: {delivered} of {len(user_ids)} delivered")
+        return {"delivered": delivered}
@@ -0,0 +1,63 @@
+from dotenv import load_dotenv
+load_dotenv()
+import os
+import inspect
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+from api.v1 import V1
+from api.ipc import CommandClient
+
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8080"))
+API_WORKERS = int(os.getenv("API_WORKERS", "2"))
+API_DRAIN_TIMEOUT = float(os.getenv("API_DRAIN_TIMEOUT", "10"))
+
+# Route handler with V1's signature that sends the validated arguments to the bot
+def forwarder(client: CommandClient, route: APIRoute):
+    async def forward(**kwargs):
+        args = {}
+        for name, value in kwargs.items():
+            if isinstance(value, (Request, Response)):
+                continue
+            args[name] = value.model_dump() if isinstance(value, BaseModel) else value
+        return await client.call(route.name, args)
+
+    # FastAPI reads the signature to parse and validate the request, so the worker does
+    # all of that with the same models V1 declares
+    forward.__signature__ = inspect.signature(route.endpoint)
+    forward.__name__ = route.name
+    return forward
+
+def create_app() -> FastAPI:
+    """The internal API as an out-of-process worker (API_MODE=worker).
+
+    Same routes and request models as V1, but each handler only forwards its
+    arguments to the bot over the IPC socket, so HTTP parsing and validation happen
+    in this process instead of on the gateway's event loop."""
+    client = CommandClient()
+    app = FastAPI()
+
+    # V1 only touches the bot inside handlers, so it can be built without one to read its routes
+    for route in V1(None).router.routes:
+        if isinstance(route, APIRoute):
+            app.add_api_route(route.path, forwarder(client, route), methods=list(route.methods), name=route.name)
+
+    @app.get("/ready")
+    async def readiness():
+        return await client.call("readiness", {})
+
+    return app
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "api.worker:create_app",
+        factory=True,
+        host=API_HOST,
+        port=API_PORT,
+        workers=API_WORKERS,
+        timeout_graceful_shutdown=API_DRAIN_TIMEOUT
+    )
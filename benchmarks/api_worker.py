@@ -0,0 +1,124 @@
+# In-process API vs worker processes: python -m benchmarks.api_worker [requests] [concurrency]
+# Fires POST /{user_id}/roles/add at a stand-in bot, once with the API on the bot's
+# loop and once through the worker processes, while a simulated /roll runs on the
+# bot's loop every 20ms. The load comes from a separate process in both modes.
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import subprocess
+from types import SimpleNamespace
+
+import aiohttp
+
+if __name__ == "__main__":
+    def percentiles(samples):
+        samples = sorted(samples)
+        return samples[len(samples) // 2] * 1000, samples[int(len(samples) * 0.95)] * 1000
+
+    if sys.argv[1:2] == ["load"]:
+        # Load generator process: prints throughput and latency percentiles as JSON
+        url, requests, concurrency = sys.argv[2], int(sys.argv[3]), int(sys.argv[4])
+
+        async def load():
+            latencies = []
+            rng = random.Random(1)
+            semaphore = asyncio.Semaphore(concurrency)
+            async with aiohttp.ClientSession() as session:
+                async def one():
+                    async with semaphore:
+                        start = time.perf_counter()
+                        body = {"roles": [f"Role {rng.randrange(20)}"], "token": "bench"}
+                        async with session.post(f"{url}/{rng.randrange(200)}/roles/add", json=body) as response:
+                            await response.read()
+                            assert response.status == 200, response.status
+                        latencies.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                await asyncio.gather(*[one() for _ in range(requests)])
+                elapsed = time.perf_counter() - start
+            p50, p95 = percentiles(latencies)
+            print(json.dumps({"throughput": requests / elapsed, "p50": p50, "p95": p95}))
+
+        asyncio.run(load())
+        sys.exit()
+
+    from fastapi import FastAPI
+    from uvicorn import Config, Server
+    from api.v1 import V1
+    from api.ipc import CommandServer
+
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    port = 8765
+    url = f"http://127.0.0.1:{port}"
+    os.environ.update(API_TOKEN="bench", GUILD_ID="1", API_PORT=str(port), API_HOST="127.0.0.1", API_IPC_SOCKET="/tmp/stabilibot-bench.sock")
+
+    async def add_roles(*roles):
+        await asyncio.sleep(0.005)  # Discord round trip
+
+    guild = SimpleNamespace(id=1)
+    guild.roles = [SimpleNamespace(id=100 + i, name=f"Role {i}", position=i) for i in range(20)]
+    guild.categories = []
+    members = {user_id: SimpleNamespace(id=user_id, name=f"member{user_id}", guild=guild, add_roles=add_roles) for user_id in range(200)}
+    guild.get_member = members.get
+    bot = SimpleNamespace(get_guild=lambda guild_id: guild)
+
+    async def wait_until_up():
+        async with aiohttp.ClientSession() as session:
+            for _ in range(200):
+                try:
+                    async with session.get(f"{url}/ready") as response:
+                        if response.status == 200:
+                            return
+                except aiohttp.ClientError:
+                    pass
+                await asyncio.sleep(0.05)
+        raise RuntimeError("API did not come up")
+
+    async def measure(mode):
+        # Simulated /roll: defer, a backend call and an edit, each awaited on the bot's
+        # loop. What's measured is how far past its 10ms of awaits each one runs.
+        roll_delays = []
+        async def rolls():
+            while True:
+                start = time.perf_counter()
+                for _ in range(3):
+                    await asyncio.sleep(0.01 / 3)
+                roll_delays.append(time.perf_counter() - start - 0.01)
+                await asyncio.sleep(0.02)
+
+        probe = asyncio.create_task(rolls())
+        loader = await asyncio.create_subprocess_exec(sys.executable, "-m", "benchmarks.api_worker", "load", url, str(requests), str(concurrency), stdout=subprocess.PIPE)
+        output, _ = await loader.communicate()
+        probe.cancel()
+        result = json.loads(output)
+        roll_p50, roll_p95 = percentiles(roll_delays)
+        print(f"{mode:<10} {result['throughput']:7.0f} req/s  request p50 {result['p50']:6.1f}ms p95 {result['p95']:6.1f}ms  "
+              f"/roll delay p50 {roll_p50:5.1f}ms p95 {roll_p95:5.1f}ms")
+
+    async def main():
+        print(f"{requests} requests, {concurrency} concurrent")
+
+        app = FastAPI()
+        app.include_router(V1(bot).router)
+        app.get("/ready")(lambda: {"ready": True})
+        server = Server(Config(app=app, host="127.0.0.1", port=port, log_level="warning"))
+        serving = asyncio.create_task(server.serve())
+        await wait_until_up()
+        await measure("inprocess")
+        server.should_exit = True
+        await serving
+
+        command_server = CommandServer(V1(bot).router, lambda: True, os.environ["API_IPC_SOCKET"])
+        await command_server.start()
+        worker = await asyncio.create_subprocess_exec(sys.executable, "-m", "api.worker", stderr=subprocess.DEVNULL)
+        await wait_until_up()
+        await measure("worker")
+        worker.terminate()
+        await worker.wait()
+        await command_server.stop()
+        print(f"commands served over the socket: {command_server.commands}")
+
+    asyncio.run(main())
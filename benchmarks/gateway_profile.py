@@ -0,0 +1,43 @@
+# Startup cost per profile: python -m benchmarks.gateway_profile [profile ...]
+# Logs in with TOKEN once per profile, in a fresh process each, with no cogs loaded,
+# and prints the time and RSS at on_ready and once members are loaded.
+import os
+import sys
+import json
+import subprocess
+
+import discord
+
+from core.gateway_profile import gateway_profile, PROFILES
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--run"]:
+        bot = discord.Bot(**gateway_profile.bot_options())
+
+        @bot.event
+        async def on_ready():
+            gateway_profile.record("ready", bot)
+            if gateway_profile.chunking == "deferred":
+                for guild in bot.guilds:
+                    await guild.chunk()
+                gateway_profile.record("members_loaded", bot)
+            print(json.dumps(gateway_profile.report))
+            await bot.close()
+
+        bot.run(os.getenv("TOKEN"))
+        sys.exit()
+
+    print(f"{'profile':<10} {'ready':>8} {'RSS':>10} {'members':>8}   {'loaded':>8} {'RSS':>10} {'members':>8}")
+    for name in sys.argv[1:] or list(PROFILES):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.gateway_profile", "--run"],
+            env={**os.environ, "GATEWAY_PROFILE": name},
+            capture_output=True, text=True
+        ).stdout
+        report = json.loads(output.strip().splitlines()[-1])
+        row = f"{name:<10}"
+        for stage in ("ready", "members_loaded"):
+            entry = report.get(stage)
+            if entry:
+                row += f" {entry['seconds']:>7}s {entry['rss_bytes'] / (1024 * 1024):>6.1f} MiB {entry['members']:>8}  "
+        print(row)
@@ -0,0 +1,43 @@
+# Role lookups against a synthetic guild: python -m benchmarks.guild_index [role count]
+# Checks the index agrees with a linear scan, then times both.
+import sys
+import time
+import random
+from types import SimpleNamespace
+
+from core.guild_index import guild_index
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    guild = SimpleNamespace(id=1)
+    guild.roles = [SimpleNamespace(id=1000 + i, name=f"Role {i}", position=i, guild=guild) for i in range(count)]
+    guild.categories = [SimpleNamespace(id=5000 + i, name=f"Category {i}", position=i, guild=guild) for i in range(50)]
+
+    # Same semantics as discord.utils.get(guild.roles, name=...)
+    def scan(roles, name):
+        return next((role for role in roles if role.name == name), None)
+
+    rng = random.Random(1)
+    names = [f"Role {rng.randrange(count)}" for _ in range(10000)]
+
+    start = time.perf_counter()
+    guild_index.build(guild)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for name in names:
+        assert guild_index.role(guild, name) is scan(guild.roles, name)
+    check_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for name in names:
+        guild_index.role(guild, name)
+    indexed_us = (time.perf_counter() - start) * 1e6 / len(names)
+
+    start = time.perf_counter()
+    for name in names:
+        scan(guild.roles, name)
+    scan_us = (time.perf_counter() - start) * 1e6 / len(names)
+
+    print(f"{count} roles, index built in {build_ms:.2f}ms, {len(names)} lookups verified in {check_ms:.0f}ms")
+    print(f"index {indexed_us:.2f}us/lookup  linear scan {scan_us:.2f}us/lookup  ({scan_us / indexed_us:.0f}x)")
@@ -0,0 +1,61 @@
+# Name checks against a local hiscores stand-in: python -m benchmarks.hiscores [lookups] [latency ms]
+# Compares requests made and time taken with and without the cache/coalescing client.
+import sys
+import time
+import random
+import asyncio
+
+from aiohttp import web
+
+from core.backend import backend
+from core.hiscores import HiscoresClient
+
+if __name__ == "__main__":
+    lookups = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.15
+
+    async def main():
+        # Stand-in for index_lite.ws: names starting with "x" don't exist
+        served = 0
+        async def index_lite(request):
+            nonlocal served
+            served += 1
+            await asyncio.sleep(latency)
+            if request.query["player"].lower().startswith("x"):
+                return web.Response(status=404)
+            return web.Response(text="1,2277,4600000000\n")
+
+        app = web.Application()
+        app.router.add_get("/index_lite.ws", index_lite)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/index_lite.ws"
+
+        # /namechange traffic: a few popular names checked over and over, some typos
+        rng = random.Random(1)
+        names = [rng.choice(["Zezima", "Lynx Titan", "lynx_titan", "Woox", "xNotAName", f"Player {rng.randrange(100)}"]) for _ in range(lookups)]
+
+        async def uncached(name):
+            async with backend.session.get(url, params={"player": name}) as response:
+                return response.status == 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*[uncached(name) for name in names])
+        uncached_s = time.perf_counter() - start
+        uncached_served, served = served, 0
+
+        client = HiscoresClient(url)
+        start = time.perf_counter()
+        await asyncio.gather(*[client.exists(name) for name in names])
+        cached_s = time.perf_counter() - start
+
+        print(f"{lookups} lookups, {latency * 1000:.0f}ms stand-in latency")
+        print(f"uncached: {uncached_served} requests to the hiscores in {uncached_s:.2f}s")
+        print(f"service:  {served} requests to the hiscores in {cached_s:.2f}s  {client.stats()}")
+
+        await backend.close()
+        await runner.cleanup()
+
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+# Drop search against a synthetic whitelist: python -m benchmarks.trigger_index [trigger count]
+# Prints build time and per-query latency next to the old substring scan.
+import sys
+import time
+import random
+
+from core.trigger_index import TriggerIndex
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rng = random.Random(1)
+    syllables = ["ar", "ma", "dyl", "tan", "za", "nite", "fang", "ves", "tige", "tas", "sets", "ah", "rim", "tor", "va", "zul", "rah", "nex", "bow", "staff", "ring", "helm", "kar", "il"]
+
+    def word():
+        return "".join(rng.choice(syllables) for _ in range(rng.randint(1, 3)))
+
+    triggers = [
+        f"{' '.join(word() for _ in range(rng.randint(1, 3))).capitalize()}" + (f":{word().capitalize()}" if rng.random() < 0.8 else "")
+        for _ in range(count)
+    ]
+    # Lowered once up front, so the scan below is timed on the comparison alone
+    lowered = [(trigger.lower(), trigger) for trigger in triggers]
+    queries = ["fang", "tassets", "tasets", "zul", "vestige", "arma helm", "nite", "staf", "karil ring", "dylrah"]
+
+    start = time.perf_counter()
+    index = TriggerIndex(triggers)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(index)} triggers, {len(index.vocabulary)} tokens, built in {build_ms:.1f}ms")
+
+    rounds = 100
+    for query in queries:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            index._results.clear()  # Measure the search itself, not the result cache
+            results, total = index.search(query, limit=25)
+        indexed_ms = (time.perf_counter() - start) * 1000 / rounds
+
+        needle = query.lower()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            [trigger for key, trigger in sorted(pair for pair in lowered if needle in pair[0])]
+        scan_ms = (time.perf_counter() - start) * 1000 / rounds
+
+        print(f"{query!r:14} {total:6} matches  index {indexed_ms:7.2f}ms  substring scan {scan_ms:7.2f}ms")
@@ -0,0 +1,41 @@
+# Memory over a long event: python -m benchmarks.ui_state [views]
+# Half the simulated /items views are abandoned rather than closed. A plain dict
+# keyed by view never drops those; the registry does.
+import sys
+import random
+import tracemalloc
+
+from core.ui_state import StateRegistry
+
+if __name__ == "__main__":
+    views = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    class View:
+        def __init__(self):
+            self.children = [{"label": f"Option {i}", "custom_id": f"option_{i}"} for i in range(5)]
+        def stop(self):
+            pass
+
+    def simulate(record, finish):
+        rng = random.Random(1)
+        tracemalloc.start()
+        for opened in range(views):
+            key = str(opened)  # An abandoned view is never touched again
+            record(key)
+            if rng.random() < 0.5:
+                finish(key)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return size
+
+    open_views = {}
+    def record_dict(key):
+        open_views[key] = View()
+    dict_bytes = simulate(record_dict, open_views.pop)
+
+    registry = StateRegistry("benchmark", ttl=3600, maxsize=500)
+    registry_bytes = simulate(lambda key: registry.start(key, View()), registry.end)
+
+    print(f"{views} views opened, half abandoned")
+    print(f"plain dict: {len(open_views)} entries, {dict_bytes / 1024:.0f} KiB")
+    print(f"registry:   {len(registry)} entries, {registry_bytes / 1024:.0f} KiB  {registry.stats()}")
@@ -1,56 +1,116 @@
+import sys
 import asyncio
 from discord.ext import commands
 import discord
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from uvicorn import Config, Server
-from api.v1 import V1
+from api.v1 import V1, UNGATED_PATHS
+from api.ipc import CommandServer
 
 from dotenv import load_dotenv
 load_dotenv()
+import os
+
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8080"))
+# Seconds shutdown waits for in-flight API requests before closing them
+API_DRAIN_TIMEOUT = float(os.getenv("API_DRAIN_TIMEOUT", "10"))
+# "inprocess" serves the API on the bot's event loop. "worker" runs it in separate
+# processes (python -m api.worker, API_WORKERS of them) that pass each request to the
+# bot over a local socket.
+API_MODE = os.getenv("API_MODE", "inprocess").lower()
 
 class Api(discord.Cog):
+    """Embedded FastAPI server for the backend's internal API.
+
+    Built once and started by Stabilibot.start before the gateway connects, so it
+    survives reconnects (on_ready fires again after each one). While the bot isn't
+    connected to the gateway, requests get an immediate 503 instead of waiting on a
+    guild that isn't there; /ready reports the same state. /metrics and /traces are
+    always served.
+
+    With API_MODE=worker only the command socket runs here, and the HTTP side is a
+    child process."""
+
     def __init__(self, bot: discord.Client):
         self.bot = bot
-        self.server_task = None  # Reference to the server task
+        self.ready = False
+        self.server_task = None
+        self.worker = None
+        router = V1(self.bot).router
+
+        if API_MODE == "worker":
+            self.command_server = CommandServer(router, lambda: self.ready, ungated_paths=UNGATED_PATHS)
+            return
 
-    @discord.Cog.listener(name="on_ready")
-    async def on_ready(self):
         self.app = FastAPI()
-        v1 = V1(self.bot)
-        self.app.include_router(v1.router)
+        self.app.include_router(router)
+        self.app.middleware("http")(self.require_ready)
+        self.app.get("/ready")(self.readiness)
 
-        config = Config(
+        self.server = Server(Config(
             app=self.app,
-            host="0.0.0.0",
-            port=8080
-        )
-        server = Server(config=config)
-
-        # Start the server in the background and store the task reference
-        self.server_task = asyncio.create_task(server.serve())
-
-    @discord.Cog.listener(name="on_close")
-    async def on_close(self):
-        # Cancel the server task if it is running
-        if self.server_task:
-            self.server_task.cancel()
-            try:
-                await self.server_task
-            except asyncio.CancelledError:
-                pass
+            host=API_HOST,
+            port=API_PORT,
+            timeout_graceful_shutdown=API_DRAIN_TIMEOUT
+        ))
 
-        # Additional cleanup if necessary
-        print("FastAPI server has been shut down.")
+    async def require_ready(self, request: Request, call_next):
+        if not self.ready and request.url.path != "/ready" and request.url.path not in UNGATED_PATHS:
+            return JSONResponse({"error": "Bot is not connected to Discord"}, status_code=503, headers={"Retry-After": "5"})
+        return await call_next(request)
+
+    async def readiness(self):
+        if not self.ready:
+            return JSONResponse({"ready": False}, status_code=503)
+        return {"ready": True}
 
-    def setup(self):
-        self.bot.add_cog(self)
+    async def start(self):
+        if API_MODE == "worker":
+            if self.worker is None:
+                await self.command_server.start()
+                self.worker = await asyncio.create_subprocess_exec(sys.executable, "-m", "api.worker")
+                print(f"API worker process {self.worker.pid} starting on {API_HOST}:{API_PORT}")
+            return
 
-        # Register a shutdown hook to call on_close
-        original_close = self.bot.close
+        if self.server_task is None:
+            self.server_task = asyncio.create_task(self.server.serve())
+            print(f"API server starting on {API_HOST}:{API_PORT}")
+
+    async def stop(self):
+        if self.worker is not None:
+            # SIGTERM lets uvicorn drain its in-flight requests, which still need the socket
+            self.worker.terminate()
+            try:
+                await asyncio.wait_for(self.worker.wait(), timeout=API_DRAIN_TIMEOUT + 5)
+            except asyncio.TimeoutError:
+                self.worker.kill()
+            self.worker = None
+            await self.command_server.stop()
+            print("API worker has been shut down.")
+            return
 
-        async def close_with_on_close():
-            await self.on_close()  # Call the on_close method
-            await original_close()  # Proceed with the original close logic
+        if self.server_task is None:
+            return
+        # Stop accepting connections and let in-flight requests finish
+        self.ready = False
+        self.server.should_exit = True
+        try:
+            await asyncio.wait_for(self.server_task, timeout=API_DRAIN_TIMEOUT + 5)
+        except asyncio.TimeoutError:
+            pass  # wait_for has cancelled the server task
+        self.server_task = None
+        print("FastAPI server has been shut down.")
+
+    @discord.Cog.listener()
+    async def on_ready(self):
+        self.ready = True
 
-        self.bot.close = close_with_on_close
+    @discord.Cog.listener()
+    async def on_resumed(self):
+        self.ready = True
 
+    @discord.Cog.listener()
+    async def on_disconnect(self):
+        self.ready = False
@@ -1,12 +1,13 @@
 from discord.ext import commands
 from discord import ui
 import discord
-import requests
 
 from dotenv import load_dotenv
 load_dotenv()
 import os
 
+from core.guild_index import guild_index
+
 class Apply(commands.Cog):
   def __init__(self, bot):
     self.bot = bot
@@ -21,13 +22,13 @@ class Apply(commands.Cog):
       return
     
     # Check if the user has the "Applied" role
-    role = discord.utils.get(interaction.guild.roles, name = "Applied")
+    role = guild_index.role(interaction.guild, "Applied")
     if role in interaction.user.roles:
       await interaction.response.send_message("You have already applied", ephemeral = True)
       return
     
     # Check if the user has the "Member" role
-    role = discord.utils.get(interaction.guild.roles, name = "Member")
+    role = guild_index.role(interaction.guild, "Member")
     if role in interaction.user.roles:
       await interaction.response.send_message("You are already a member", ephemeral = True)
       return
@@ -1,7 +1,7 @@
 import discord
 from discord.ext import commands
-import os
-import requests
+
+from core.backend import backend
 
 class CheckAvatarUpdate(commands.Cog):
     def __init__(self, bot):
@@ -11,12 +11,15 @@ class CheckAvatarUpdate(commands.Cog):
     async def on_user_update(self, before: discord.User, after: discord.User):
         # Check if the avatar has changed
         if before.avatar != after.avatar:
-            requests.put(
-                os.getenv("BACKEND_URL") + f"/users/{after.id}",
-                json={
-                    "discord_avatar_url": after.avatar.url,
-                }
+            success, response_data = await backend.call(
+                f"/users/{after.id}",
+                {
+                    "discord_avatar_url": after.display_avatar.url,
+                },
+                method="PUT"
             )
+            if not success:
+                print(f"Failed to update avatar for {after.id}: {response_data}")
 
 async def setup(bot):
     await bot.add_cog(CheckAvatarUpdate(bot))
@@ -4,6 +4,8 @@ import aiohttp
 import os
 from datetime import datetime, time, timezone, timedelta
 
+from core.backend import backend
+
 class PostRiddles(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -25,44 +27,43 @@ class PostRiddles(commands.Cog):
         
         # Fetch riddles from backend
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(os.getenv("BACKEND_URL") + "/riddles") as response:
-                    if response.status != 200:
-                        print(f"Error fetching riddles: {response.status} - {await response.text()}")
-                        return
-                    
-                    riddles_data = await response.json()
-                    riddles = riddles_data.get("riddles", [])
-                    
-                    if not riddles:
-                        print("No riddles found")
-                        return
-                    
-                    # Get the latest riddle based on release_timestamp
-                    latest_riddle = max(riddles, key=lambda r: r.get("release_timestamp", ""))
-                    
-                    # Get the channel to post to
-                    channel = self.bot.get_channel(1472741684801441802)
-                    if not channel:
-                        print("Channel not found")
-                        return
-                    
-                    # Format and post the riddle as an embed
-                    riddle_text = latest_riddle.get("riddle", "No riddle text available")
-                    riddle_name = latest_riddle.get("name", "Unknown")
-                    riddle_id = latest_riddle.get("id", "Unknown")
-                    riddle_number = len(riddles)
-                    
-                    embed = discord.Embed(
-                        title=riddle_text,
-                        color=discord.Color.gold()
-                    )
-                    embed.set_author(name=riddle_name)
-                    embed.timestamp = datetime.now(pst)
-                    
-                    await channel.send(embed=embed)
-                    print(f"Posted riddle {riddle_id} to channel {channel.id}")
-                    
+            async with backend.session.get(os.getenv("BACKEND_URL") + "/riddles") as response:
+                if response.status != 200:
+                    print(f"Error fetching riddles: {response.status} - {await response.text()}")
+                    return
+                
+                riddles_data = await response.json()
+                riddles = riddles_data.get("riddles", [])
+                
+                if not riddles:
+                    print("No riddles found")
+                    return
+                
+                # Get the latest riddle based on release_timestamp
+                latest_riddle = max(riddles, key=lambda r: r.get("release_timestamp", ""))
+                
+                # Get the channel to post to
+                channel = self.bot.get_channel(1472741684801441802)
+                if not channel:
+                    print("Channel not found")
+                    return
+                
+                # Format and post the riddle as an embed
+                riddle_text = latest_riddle.get("riddle", "No riddle text available")
+                riddle_name = latest_riddle.get("name", "Unknown")
+                riddle_id = latest_riddle.get("id", "Unknown")
+                riddle_number = len(riddles)
+                
+                embed = discord.Embed(
+                    title=riddle_text,
+                    color=discord.Color.gold()
+                )
+                embed.set_author(name=riddle_name)
+                embed.timestamp = datetime.now(pst)
+                
+                await channel.send(embed=embed)
+                print(f"Posted riddle {riddle_id} to channel {channel.id}")
+                
         except aiohttp.ClientConnectorError as e:
             print(f"Error connecting to backend: {str(e)}")
         except Exception as e:
@@ -1,15 +1,43 @@
 import discord
 from discord.ext import commands, tasks
-import requests
 import os
-import asyncio
+
+from core.backend import backend
+from core.guild_index import guild_index
+from core.discord_writes import discord_writes
+from core.gateway_profile import gateway_profile
+
+# Daily, as the sweep has always run. It is one /users download and a dict compare,
+# and only members whose name changed since the last sweep get a Discord call, so it
+# can be made more frequent with NICKNAME_SYNC_INTERVAL_MINUTES.
+SYNC_INTERVAL_MINUTES = float(os.getenv("NICKNAME_SYNC_INTERVAL_MINUTES", "1440"))
+
+# Work out the nickname a member should have, or None if theirs is already right
+def expected_nickname(member, user_info):
+    current_name = user_info["current_name"]
+    previous_names = user_info["previous_names"]
+    current_nick = member.nick or member.name
+
+    # Check if any previous name is in the current nickname
+    matched_previous_name = next((name for name in previous_names if name.lower() in current_nick.lower()), None)
+
+    if matched_previous_name:
+        # Replace the matched previous name with the current name
+        return current_nick.replace(matched_previous_name, current_name)
+    elif current_name.lower() not in current_nick.lower():
+        # If no match, prepend the current name to the nickname
+        return f"{current_name}"
+    # No changes needed
+    return None
 
 class UpdateNicknames(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # discord_id -> {"current_name", "previous_names"} as of the last sweep
+        self.user_map = {}
         self.check_usernames.start()
 
-    @tasks.loop(hours=24)
+    @tasks.loop(minutes=SYNC_INTERVAL_MINUTES)
     async def check_usernames(self):
         guild = self.bot.get_guild(int(os.getenv("GUILD_ID")))
         if not guild:
@@ -17,15 +45,9 @@ class UpdateNicknames(commands.Cog):
             return
 
         # Fetch user data from the backend
-        try:
-            url = os.getenv("BACKEND_URL") + "/users"
-            response = requests.get(url)
-            if response.status_code != 200:
-                print(f"Error fetching user data: {response.status_code} - {response.text}")
-                return
-            user_data = response.json()
-        except Exception as e:
-            print(f"Error fetching user data: {e}")
+        success, user_data = await backend.call("/users", method="GET")
+        if not success:
+            print(f"Error fetching user data: {user_data}")
             return
 
         # Map user IDs to their OSRS usernames and previous names
@@ -37,45 +59,57 @@ class UpdateNicknames(commands.Cog):
             for user in user_data
         }
 
-        # Loop through members with the "Member" role
-        role = discord.utils.get(guild.roles, name="Member")
-        if not role:
-            print("Member role not found")
-            return
+        # Only users whose names changed since the last sweep (everyone on the first one)
+        changed = [discord_id for discord_id, user_info in user_map.items() if self.user_map.get(discord_id) != user_info]
+        self.user_map = user_map
+        print(f"Nickname sync: {len(changed)} of {len(user_map)} users changed since the last sweep")
 
-        for member in role.members:
-            user_info = user_map.get(str(member.id))
-            if not user_info:
-                continue
-
-            current_name = user_info["current_name"]
-            previous_names = user_info["previous_names"]
-            current_nick = member.nick or member.name
-
-            # Check if any previous name is in the current nickname
-            matched_previous_name = next((name for name in previous_names if name.lower() in current_nick.lower()), None)
-
-            if matched_previous_name:
-                # Replace the matched previous name with the current name
-                new_nick = current_nick.replace(matched_previous_name, current_name)
-            elif current_name.lower() not in current_nick.lower():
-                # If no match, prepend the current name to the nickname
-                new_nick = f"{current_name}"
-            else:
-                # No changes needed
-                continue
-
-            try:
-                old_nick = member.nick if member.nick else member.name
-                await member.edit(nick=new_nick)
-                print(f"Updated nickname for {old_nick} to {new_nick}")
-                await asyncio.sleep(1)  # Add a 1-second delay between edits
-            except discord.errors.Forbidden:
-                print(f"Bot does not have permission to change nickname for {member.display_name}")
-            except discord.errors.HTTPException as e:
-                print(f"Failed to update nickname for {member.display_name}: {e}")
-                await asyncio.sleep(5)  # Add a longer delay if an HTTPException occurs
+        for discord_id in changed:
+            member = guild.get_member(int(discord_id))
+            if member and not await self.sync_member(member):
+                # Leave it out of the snapshot so the next sweep tries again
+                self.user_map.pop(discord_id, None)
 
     @check_usernames.before_loop
     async def before_check_usernames(self):
         await self.bot.wait_until_ready()
+        # With deferred chunking most members aren't cached yet at on_ready; the first
+        # sweep would skip them and not look at them again until their name changes
+        await gateway_profile.members_loaded.wait()
+
+    # Bring one Member's nickname in line with their OSRS name. Returns False if it's worth retrying.
+    async def sync_member(self, member):
+        user_info = self.user_map.get(str(member.id))
+        if not user_info:
+            return True
+
+        role = guild_index.role(member.guild, "Member")
+        if not role or role not in member.roles:
+            return True
+
+        new_nick = expected_nickname(member, user_info)
+        if new_nick is None:
+            return True
+
+        try:
+            old_nick = member.nick if member.nick else member.name
+            await discord_writes.edit_member(member, nick=new_nick)
+            print(f"Updated nickname for {old_nick} to {new_nick}")
+            return True
+        except discord.errors.Forbidden:
+            print(f"Bot does not have permission to change nickname for {member.display_name}")
+            return True  # Retrying won't help (server owner, higher role)
+        except discord.errors.HTTPException as e:
+            print(f"Failed to update nickname for {member.display_name}: {e}")
+        return False
+
+    # Someone changed their nickname or was given the Member role; fix it up now rather
+    # than at the next sweep. Our own edits land here too but then need no change.
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        if before.nick != after.nick or before.roles != after.roles:
+            await self.sync_member(after)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        await self.sync_member(member)
@@ -1,12 +1,23 @@
-from discord.ext import commands
+from discord.ext import commands, tasks
 import discord
 from dotenv import load_dotenv
 load_dotenv()
 import os
 import json
-import aiohttp
 import logging
 
+from core.backend import backend
+from core.cache import active_event_cache, team_cache, team_member_index
+from core.whitelist import drop_whitelist
+from core.concurrency import gather_with_limit, first_match
+from core.guild_index import guild_index
+from core.discord_writes import discord_writes, INTERACTIVE
+
+# Most backend requests a single mod command fans out at once
+TEAM_FETCH_CONCURRENCY = 6
+# How often every team's member list is re-read to keep team_member_index warm
+TEAM_INDEX_REFRESH_MINUTES = float(os.getenv("TEAM_INDEX_REFRESH_MINUTES", "30"))
+
 class AddToTeamSelectView(discord.ui.View):
     def __init__(self, target_member, teams, cog, event_id):
         super().__init__(timeout=300)
@@ -58,41 +69,26 @@ class AddToTeamSelectView(discord.ui.View):
         if not success:
             # Player might be on another team — find and remove them, then retry
             discord_id = str(self.target_member.id)
-            for team in self.teams:
-                other_team_id = team.get('id')
-                if other_team_id == team_id:
-                    continue
-                # Check if player is a member of this team
-                success_get, members_data = await self.cog.call_backend_api(
-                    f"/v2/teams/{other_team_id}/members",
-                    None,
-                    interaction,
-                    method="GET"
-                )
-                if not success_get:
-                    continue
-                members = members_data.get('data', [])
-                member_entry = next((m for m in members if m.get('user', {}).get('discord_id') == discord_id), None)
-                if not member_entry:
-                    continue
+            membership = await self.cog.find_team_membership(self.event_id, discord_id, self.teams, exclude_team_id=team_id)
+            if membership:
+                team, user_id = membership
                 # Remove from this team using the internal user_id
-                user_id = member_entry.get('user', {}).get('id')
                 rm_success, _ = await self.cog.call_backend_api(
-                    f"/v2/teams/{other_team_id}/members/{user_id}",
+                    f"/v2/teams/{team.get('id')}/members/{user_id}",
                     None,
                     interaction,
                     method="DELETE"
                 )
                 if rm_success:
                     moved_from_team = team.get('name', 'Unknown')
+                    team_cache.invalidate((str(self.event_id), discord_id))
                     # Remove old team role if it exists
-                    old_role = discord.utils.get(interaction.guild.roles, name=team.get('name', ''))
+                    old_role = guild_index.role(interaction.guild, team.get('name', ''))
                     if old_role and old_role in self.target_member.roles:
                         try:
-                            await self.target_member.remove_roles(old_role)
+                            await discord_writes.remove_roles(self.target_member, old_role, priority=INTERACTIVE)
                         except discord.Forbidden:
                             pass
-                    break
 
             if moved_from_team:
                 # Retry adding to the selected team
@@ -108,9 +104,14 @@ class AddToTeamSelectView(discord.ui.View):
                 await interaction.followup.send(f"Failed to add player to team: {response_data}", ephemeral=True)
                 return
 
+        # v2 team ids aren't guaranteed to match the ids EventUser resolves, so drop
+        # the cached membership rather than writing this one in
+        team_cache.invalidate((str(self.event_id), str(self.target_member.id)))
+        team_member_index.invalidate((str(self.event_id), str(self.target_member.id)))
+
         # Create or find the Discord role with the team name and assign it
         guild = interaction.guild
-        role = discord.utils.get(guild.roles, name=team_name)
+        role = guild_index.role(guild, team_name)
 
         if not role:
             try:
@@ -123,7 +124,7 @@ class AddToTeamSelectView(discord.ui.View):
                 return
 
         try:
-            await self.target_member.add_roles(role)
+            await discord_writes.add_roles(self.target_member, role, priority=INTERACTIVE)
         except discord.Forbidden:
             await interaction.followup.send(
                 f"Added {self.target_member.display_name} to team '{team_name}' via API, but I don't have permission to assign the role.",
@@ -185,6 +186,7 @@ class TeamSelectView(discord.ui.View):
         )
         
         if success:
+            team_cache.set((str(self.event_id), str(self.user.id)), team_id)
             member_id = response_data.get('member_id')
             usernames = response_data.get('usernames', [])
             
@@ -197,7 +199,7 @@ class TeamSelectView(discord.ui.View):
                     message += f"\n• {username}"
         
             # Update the existing message instead of creating a new one and deleting the old one
-            await interaction.message.edit(content=message, view=None)
+            await discord_writes.edit_message(interaction.message, content=message, view=None)
             await interaction.followup.send("User added to team successfully!", ephemeral=True)
         else:
             await interaction.followup.send(f"Failed to add user to team: {response_data}", ephemeral=True)
@@ -583,9 +585,32 @@ class EventMod(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.backend_url = os.getenv("BACKEND_URL")
+        self.refresh_team_member_index.start()
+
+    # Re-reads every team's member list in the background, so team lookups in the mod
+    # commands normally start from the team the player is actually on
+    @tasks.loop(minutes=TEAM_INDEX_REFRESH_MINUTES)
+    async def refresh_team_member_index(self):
+        event, error = await self.get_active_event(None)
+        if error:
+            print(f"Team member index refresh skipped: {error}")
+            return
+
+        # The v2 event payload's teams, whose ids the v2 member lists are keyed by
+        event_id = event.get('id')
+        teams = event.get('teams', [])
+        await gather_with_limit([self.fetch_team_members(event_id, team) for team in teams], limit=TEAM_FETCH_CONCURRENCY)
+
+    @refresh_team_member_index.before_loop
+    async def before_refresh_team_member_index(self):
+        await self.bot.wait_until_ready()
     
     # Helper to get the first active stability party event
     async def get_active_event(self, interaction):
+        event = active_event_cache.get("v2_active")
+        if event:
+            return event, None
+
         # Fetch available events
         success, response_data = await self.call_backend_api(
             "/v2/events/active",
@@ -605,15 +630,60 @@ class EventMod(commands.Cog):
         
         # # Return the first active event
         # event = stability_party_events[0]
+        active_event_cache.set("v2_active", response_data)
         return response_data, None
     
+    # Record where every member of a v2 team list is, keeping the reverse index warm
+    def remember_team_members(self, event_id, team_id, members):
+        for member in members:
+            user = member.get('user', {})
+            if user.get('discord_id'):
+                team_member_index.set((str(event_id), user['discord_id']), {"team_id": team_id, "user_id": user.get('id')})
+
+    # Helper to get a v2 team's member list, recording it in team_member_index. None on failure.
+    async def fetch_team_members(self, event_id, team):
+        success, members_data = await self.call_backend_api(
+            f"/v2/teams/{team.get('id')}/members",
+            None,
+            None,
+            method="GET"
+        )
+        if not success:
+            return None
+        members = members_data.get('data', [])
+        self.remember_team_members(event_id, team.get('id'), members)
+        return members
+
+    # Helper to find which team a player is on. Returns (team, internal user_id) or None.
+    async def find_team_membership(self, event_id, discord_id, teams, exclude_team_id=None):
+        async def lookup(team):
+            members = await self.fetch_team_members(event_id, team)
+            if members is None:
+                return None
+            member_entry = next((m for m in members if m.get('user', {}).get('discord_id') == discord_id), None)
+            return (team, member_entry.get('user', {}).get('id')) if member_entry else None
+
+        candidates = [team for team in teams if team.get('id') != exclude_team_id]
+
+        # Check the team the player was last seen on first; one lookup instead of N
+        known = team_member_index.get((str(event_id), discord_id))
+        known_team = next((team for team in candidates if known and team.get('id') == known["team_id"]), None)
+        if known_team:
+            membership = await lookup(known_team)
+            if membership:
+                return membership
+            candidates.remove(known_team)
+
+        # Otherwise ask every team at once and stop at the first one that has them
+        return await first_match([lookup(team) for team in candidates], limit=TEAM_FETCH_CONCURRENCY)
+
     # Helper to check if user has event moderator permissions
     async def check_mod_permissions(self, interaction):
         # Check if user has the Event Moderator role or is an administrator
         if interaction.user.guild_permissions.administrator:
             return True
         
-        event_mod_role = discord.utils.get(interaction.guild.roles, name="Staff")
+        event_mod_role = guild_index.role(interaction.guild, "Staff")
         if event_mod_role and event_mod_role in interaction.user.roles:
             return True
         
@@ -622,75 +692,35 @@ class EventMod(commands.Cog):
     
     # Helper method to make API calls to the backend
     async def call_backend_api(self, endpoint, payload=None, interaction=None, method="POST"):
-        url = f"{self.backend_url}{endpoint}"
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                if method == "GET":
-                    async with session.get(url) as response:
-                        if response.status in [200, 201]:
-                            try:
-                                data = await response.json()
-                                return True, data
-                            except aiohttp.ContentTypeError:
-                                # Handle non-JSON responses
-                                data = await response.text()
-                                return True, json.loads(data)
-                        else:
-                            error_text = await response.text()
-                            print(f"Error calling {url}: {response.status} - {error_text}")
-                            return False, f"Error: {response.status} - {error_text}"
-                
-                elif method == "POST":
-                    async with session.post(url, json=payload) as response:
-                        if response.status in [200, 201]:
-                            try:
-                                data = await response.json()
-                            except aiohttp.ContentTypeError:
-                                data = await response.text()
-                                return True, json.loads(data)
-                        else:
-                            error_text = await response.text()
-                            print(f"Error calling {url}: {response.status} - {error_text}")
-                            return False, f"Error: {response.status} - {error_text}"
-
-                elif method == "PUT":
-                    async with session.put(url, json=payload) as response:
-                        if response.status in [200, 201]:
-                            try:
-                                data = await response.json()
-                            except aiohttp.ContentTypeError:
-                                data = await response.text()
-                                return True, json.loads(data)
-                        else:
-                            error_text = await response.text()
-                            print(f"Error calling {url}: {response.status} - {error_text}")
-                            return False, f"Error: {response.status} - {error_text}"
-                
-                elif method == "DELETE":
-                    async with session.delete(url, json=payload if payload else {}) as response:
-                        if response.status in [200, 201]:
-                            try:
-                                data = await response.json()
-                            except:
-                                # Some DELETE endpoints might not return JSON
-                                return True, {}
-                        else:
-                            error_text = await response.text()
-                            print(f"Error calling {url}: {response.status} - {error_text}")
-                            return False, f"Error: {response.status} - {error_text}"
-            
-            # Handle the case where it's a list
-            if isinstance(data, list):
-                return True, {"items": data}
-            return True, data
-                
-        except aiohttp.ClientConnectorError as e:
-            print(f"Connection error to {url}: {str(e)}")
-            return False, f"Connection error: {str(e)}\nMake sure your backend server is running at {self.backend_url}"
-        except Exception as e:
-            print(f"Unexpected error calling {url}: {str(e)}")
-            return False, f"Unexpected error: {str(e)}"
+        # Moderation DELETE endpoints expect a JSON body, even an empty one
+        if method == "DELETE" and payload is None:
+            payload = {}
+        return await backend.call(endpoint, payload, method)
+
+    # Refresh Cache Command
+    @discord.slash_command(name="event_refresh_cache", description="Reload the active event, team memberships and drop whitelist from the backend", guild_ids=[int(os.getenv("GUILD_ID"))])
+    async def refresh_cache(self, interaction):
+        print(f"{interaction.user.display_name}: /event_refresh_cache")
+
+        if not await self.check_mod_permissions(interaction):
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        stats = active_event_cache.stats()
+        active_event_cache.invalidate()
+        team_cache.invalidate()
+
+        # Drop triggers are edited by mods mid-event, so reload them unconditionally
+        if await drop_whitelist.refresh(force=True):
+            whitelist_status = f"Drop whitelist reloaded ({len(drop_whitelist.triggers or [])} triggers)."
+        else:
+            whitelist_status = "Couldn't reload the drop whitelist (no active event, or the server is unavailable)."
+
+        await interaction.followup.send(
+            f"Active event and team membership caches cleared ({stats['hits']} event hits / {stats['misses']} misses since startup).\n{whitelist_status}",
+            ephemeral=True
+        )
 
     # Add Player to Team Command
     @discord.slash_command(name="add_to_team", description="Add a player to an event team", guild_ids=[int(os.getenv("GUILD_ID"))])
@@ -755,6 +785,8 @@ class EventMod(commands.Cog):
         )
         
         if success:
+            # The cached active event carries the team list, so drop it
+            active_event_cache.invalidate()
             message = f"Team '{team_name}' created successfully for event {event.get('name')}.\nTeam ID: {response_data.get('team_id')}"
             discord_info = response_data.get('discord', {})
             if discord_info:
@@ -1026,17 +1058,31 @@ class EventMod(commands.Cog):
                 return
             
             embed = discord.Embed(title=f"Event Teams - {event_name}", color=discord.Color.blue())
-            
-            for team in teams:
+
+            # Fetch every team's members at once rather than one team at a time
+            results = await gather_with_limit(
+                [
+                    self.call_backend_api(
+                        f"/events/{event_id}/moderation/teams/{team.get('id', 'Unknown')}/members",
+                        method="GET"
+                    )
+                    for team in teams
+                ],
+                limit=TEAM_FETCH_CONCURRENCY
+            )
+
+            failed_teams = 0
+            for team, result in zip(teams, results):
                 team_id = team.get('id', 'Unknown')
-                success, response = await self.call_backend_api(
-                    f"/events/{event_id}/moderation/teams/{team_id}/members",
-                    method="GET"
-                )
                 team_name = team.get('name', 'Unknown')
-                members = response
-                
-                member_list = "\n".join([f"• {member.get('username', 'Unknown')}" for member in members]) or "No members"
+
+                if isinstance(result, Exception) or not result[0]:
+                    print(f"Failed to get members for team {team_id}: {result if isinstance(result, Exception) else result[1]}")
+                    failed_teams += 1
+                    member_list = "⚠️ Couldn't load members"
+                else:
+                    members = result[1]
+                    member_list = "\n".join([f"• {member.get('username', 'Unknown')}" for member in members]) or "No members"
                 
                 # Get stars and coins from team data if available
                 team_data = team.get('data', {})
@@ -1048,6 +1094,9 @@ class EventMod(commands.Cog):
                     value=member_list, 
                     inline=False
                 )
+
+            if failed_teams:
+                embed.set_footer(text=f"Members for {failed_teams} of {len(teams)} teams couldn't be loaded.")
             
             await interaction.followup.send(embed=embed, ephemeral=True)
         else:
@@ -1153,49 +1202,73 @@ class EventMod(commands.Cog):
             return
             
         event_id = event.get('id')
-        
-        # Now get teams for this event
-        success, teams = await self.call_backend_api(
-            f"/events/{event_id}/teams",
-            None,
-            interaction,
-            method="GET"
-        )
-        
-        if not success:
-            await interaction.followup.send(f"Failed to retrieve teams: {teams}", ephemeral=True)
+
+        # Teams from the v2 event payload, the same ids the v2 member lists use (the
+        # v1 /events/{id}/teams ids aren't guaranteed to match)
+        teams = event.get('teams', [])
+        if not teams:
+            await interaction.followup.send("No teams found for the event.", ephemeral=True)
             return
-        
-        # Find which team(s) this user is on
+
         discord_id = str(member.id)
-        user_teams = []
-        
-        for team in teams:
-            team_id = team.get('id')
-            team_name = team.get('name')
-            
+
+        # Find the teams the player is actually on before deleting anything. These are
+        # reads, so they can all go at once; the DELETEs then only hit real memberships.
+        member_lists = await gather_with_limit(
+            [self.fetch_team_members(event_id, team) for team in teams],
+            limit=TEAM_FETCH_CONCURRENCY
+        )
+        memberships = []  # (team, internal user_id)
+        unchecked_teams = []
+        for team, members in zip(teams, member_lists):
+            if isinstance(members, Exception) or members is None:
+                unchecked_teams.append(team)
+                continue
+            member_entry = next((m for m in members if m.get('user', {}).get('discord_id') == discord_id), None)
+            if member_entry:
+                memberships.append((team, member_entry.get('user', {}).get('id')))
+
+        async def remove(team, user_id):
             success, _ = await self.call_backend_api(
-                f"/events/{event_id}/moderation/teams/{team_id}/members/{discord_id}",
+                f"/v2/teams/{team.get('id')}/members/{user_id}",
                 None,
                 None,
                 "DELETE"
             )
+            return success
 
-            if success:
-                user_teams.append(team_name)
-        
-        if not user_teams:
-            await interaction.followup.send(f"{member.display_name} is not on any teams for the current event.", ephemeral=True)
+        # A team whose list couldn't be read gets the moderation DELETE by discord id,
+        # as before the lookups; it fails when the player isn't on that team
+        async def remove_unchecked(team):
+            success, _ = await self.call_backend_api(
+                f"/events/{event_id}/moderation/teams/{team.get('id')}/members/{discord_id}",
+                None,
+                None,
+                "DELETE"
+            )
+            return success
+
+        results = await gather_with_limit(
+            [remove(team, user_id) for team, user_id in memberships] + [remove_unchecked(team) for team in unchecked_teams],
+            limit=TEAM_FETCH_CONCURRENCY
+        )
+        membership_results, unchecked_results = results[:len(memberships)], results[len(memberships):]
+        removed_from = [team.get('name') for (team, _), result in zip(memberships, membership_results) if result is True]
+        failed = [team.get('name') for (team, _), result in zip(memberships, membership_results) if result is not True]
+        removed_from += [team.get('name') for team, result in zip(unchecked_teams, unchecked_results) if result is True]
+        unchecked = sum(1 for result in unchecked_results if result is not True)
+
+        team_cache.invalidate((str(event_id), discord_id))
+        team_member_index.invalidate((str(event_id), discord_id))
+
+        unchecked_note = f" ({unchecked} of {len(teams)} teams couldn't be checked)" if unchecked else ""
+        if not removed_from and not failed:
+            await interaction.followup.send(f"{member.display_name} is not on any teams for the current event{unchecked_note}.", ephemeral=True)
             return
-        
-        # If user is only on one team, remove them directly
-        if len(user_teams) == 1:
-            if success:
-                await interaction.followup.send(f"Successfully removed {member.display_name} from team {team['team_name']}.", ephemeral=True)
-            else:
-                await interaction.followup.send(f"Failed to remove player from team {user_teams[0]}", ephemeral=True)
-        else:
-            if success:
-                await interaction.followup.send(f"Successfully removed {member.display_name} from teams {', '.join(user_teams)}.", ephemeral=True)
-            else:
-                await interaction.followup.send(f"Failed to remove player from teams: {', '.join(user_teams)}", ephemeral=True)
+
+        messages = []
+        if removed_from:
+            messages.append(f"Successfully removed {member.display_name} from team{'s' if len(removed_from) > 1 else ''} {', '.join(removed_from)}.")
+        if failed:
+            messages.append(f"Failed to remove player from team{'s' if len(failed) > 1 else ''}: {', '.join(failed)}")
+        await interaction.followup.send("\n".join(messages) + unchecked_note, ephemeral=True)
@@ -1,27 +1,27 @@
-from discord.ext import commands
+from discord.ext import commands, tasks
 import discord
 from dotenv import load_dotenv
 load_dotenv()
 import os
-import json
-import aiohttp
 import asyncio
 from typing import Dict, Any, Optional
 import logging
 import traceback
-from datetime import datetime
-
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("event_rolls.log"),
-        logging.StreamHandler()
-    ]
-)
+
+from core.backend import backend
+from core.cache import active_event_cache, team_cache
+from core.ui_state import item_views
+from core.roll_pages import roll_pages
+from core.discord_writes import discord_writes, DEFAULT
+from core.tracing import trace, span
+from core.logs import LazyJson, log_payload
+
+# Handlers and levels are set up by core.logs; LOG_LEVELS=event_user=DEBUG for the roll details
 logger = logging.getLogger("event_user")
 
+# custom_id prefix of every roll component; RollDispatcher handles the clicks
+ROLL_PREFIX = "roll"
+
 # Roll progression data class
 class RollProgressionPayload:
     def __init__(self, data: dict):
@@ -69,16 +69,56 @@ class EventUser(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.backend_url = os.getenv("BACKEND_URL")
-        # Dictionary to track active rolls and who initiated them
-        self.active_rolls: Dict[str, str] = {}  # team_id -> discord_user_id
-        self.active_item_views: Dict[str, discord.ui.View] = {}  # team_id -> discord.ui.View
-        # Add a dictionary to store the original roll messages
-        self.roll_messages: Dict[str, discord.Message] = {}  # team_id -> discord.Message
+        # Roll buttons are handled by one dispatcher for every roll message, which reads
+        # what each message is waiting on from core.roll_pages
+        self.roll_dispatcher = RollDispatcher(self)
+        # Open /items views (user id -> view) live in core.ui_state, which expires and caps them
+        item_views.on_end(self.item_view_ended)
+        item_views.shared_ids.update((id(self), id(bot)))
+        self.sweep_ui_state.start()
         logger.info(f"EventUser cog initialized with backend URL: {self.backend_url}")
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction):
+        if interaction.type == discord.InteractionType.component:
+            await self.roll_dispatcher.dispatch(interaction)
+
+    # Take the components off roll messages whose page was replaced, so stale buttons
+    # can't be pressed. Best effort: the message may be gone or ephemeral.
+    async def strip_roll_messages(self, messages):
+        for message_id, channel_id in messages:
+            message = self.bot.get_partial_messageable(channel_id).get_partial_message(message_id)
+            try:
+                await discord_writes.edit_message(message, priority=DEFAULT, view=None)
+            except discord.HTTPException as e:
+                logger.debug(f"Couldn't clear components of old roll message {message_id}: {e}")
+
+    def item_view_ended(self, user_id, view, reason):
+        view.stop()
+
+    @tasks.loop(minutes=1)
+    async def sweep_ui_state(self):
+        # Views nobody touches again never hit a get(); this catches them
+        expired = item_views.sweep()
+        if expired:
+            logger.info(f"Expired {expired} idle item views")
+        if self.sweep_ui_state.current_loop % 60 == 0:
+            await roll_pages.prune()
+
+    @sweep_ui_state.before_loop
+    async def before_sweep_ui_state(self):
+        await self.bot.wait_until_ready()
+        # The guilds' caches are shared by every message; keep them out of the size estimate
+        for guild in self.bot.guilds:
+            item_views.shared_ids.add(id(guild))
     
     # Helper to get the first active stability party event
     async def get_active_event(self, interaction):
         logger.debug(f"Getting active event for user: {interaction.user.id}")
+        event = active_event_cache.get("stability_party")
+        if event:
+            return event, None
+
         # Fetch available events
         success, events = await self.call_backend_api(
             "/events",
@@ -96,6 +136,7 @@ class EventUser(commands.Cog):
         for event in events:
             if event.get("type") == "STABILITY_PARTY":
                 logger.info(f"Active event found: {event['id']}")
+                active_event_cache.set("stability_party", event)
                 return event, None
             
         logger.warning("No active stability party events found")
@@ -105,6 +146,9 @@ class EventUser(commands.Cog):
     async def get_user_team(self, interaction, event_id):
         discord_id = str(interaction.user.id)
         logger.debug(f"Getting team for user {discord_id} in event {event_id}")
+        team_id = team_cache.get((str(event_id), discord_id))
+        if team_id:
+            return team_id, None
         
         # Call the API to get the user's team
         success, response_data = await self.call_backend_api(
@@ -126,108 +170,12 @@ class EventUser(commands.Cog):
             return None, "You are not part of any team for this event."
         
         logger.info(f"User {discord_id} belongs to team {team_id} in event {event_id}")
+        team_cache.set((str(event_id), discord_id), team_id)
         return team_id, None
     
     # Helper method to make API calls to the backend
     async def call_backend_api(self, endpoint, payload=None, method="GET"):
-        url = f"{self.backend_url}{endpoint}"
-        logger.debug(f"API call: {method} {url} - Payload: {payload}")
-        
-        # Define common headers
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
-        
-        try:
-            start_time = datetime.now()
-            async with aiohttp.ClientSession() as session:
-                if method == "GET":
-                    # For GET requests, we don't send a Content-Type header since there's no body
-                    async with session.get(url, headers={"Accept": "application/json"}) as response:
-                        elapsed = (datetime.now() - start_time).total_seconds() * 1000
-                        if response.status in [200, 201]:
-                            try:
-                                data = await response.json()
-                                logger.debug(f"API response ({elapsed:.2f}ms): {method} {url} - Status: {response.status} - Response size: {len(str(data))} chars")
-                            except aiohttp.ContentTypeError:
-                                # Handle non-JSON responses
-                                data = await response.text()
-                                logger.warning(f"Non-JSON response ({elapsed:.2f}ms): {method} {url} - Status: {response.status} - Data: {data[:100]}...")
-                            
-                            # Handle string data (possibly JSON)
-                            if isinstance(data, str):
-                                try:
-                                    return True, json.loads(data)
-                                except json.JSONDecodeError:
-                                    logger.warning(f"Failed to decode JSON string: {data[:100]}...")
-                                    return True, data
-                            return True, data
-                        else:
-                            error_text = await response.text()
-                            logger.error(f"API error ({elapsed:.2f}ms): {method} {url} - Status: {response.status} - Error: {error_text}")
-                            return False, f"Error: {response.status} - {error_text}"
-                
-                elif method == "POST":
-                    async with session.post(url, json=payload, headers=headers) as response:
-                        elapsed = (datetime.now() - start_time).total_seconds() * 1000
-                        if response.status in [200, 201]:
-                            data = await response.json()
-                            logger.debug(f"API response ({elapsed:.2f}ms): {method} {url} - Status: {response.status} - Response size: {len(str(data))} chars")
-                        else:
-                            error_text = await response.text()
-                            logger.error(f"API error ({elapsed:.2f}ms): {method} {url} - Status: {response.status} - Error: {error_text}")
-                            return False, f"Error: {response.status} - {error_text}"
-                
-                elif method == "PUT":
-                    async with session.put(url, json=payload, headers=headers) as response:
-                        if response.status in [200, 201]:
-                            data = await response.json()
-                        else:
-                            error_text = await response.text()
-                            print(f"Error calling {url}: {response.status} - {error_text}")
-                            return False, f"Error: {response.status} - {error_text}"
-                
-                elif method == "DELETE":
-                    # For DELETE with payload, include headers
-                    if payload:
-                        async with session.delete(url, json=payload, headers=headers) as response:
-                            if response.status in [200, 201]:
-                                try:
-                                    data = await response.json()
-                                except:
-                                    # Some DELETE endpoints might not return JSON
-                                    return True, {}
-                            else:
-                                error_text = await response.text()
-                                print(f"Error calling {url}: {response.status} - {error_text}")
-                                return False, f"Error: {response.status} - {error_text}"
-                    else:
-                        # For DELETE without payload, don't include Content-Type header
-                        async with session.delete(url, headers={"Accept": "application/json"}) as response:
-                            if response.status in [200, 201]:
-                                try:
-                                    data = await response.json()
-                                except:
-                                    # Some DELETE endpoints might not return JSON
-                                    return True, {}
-                            else:
-                                error_text = await response.text()
-                                print(f"Error calling {url}: {response.status} - {error_text}")
-                                return False, f"Error: {response.status} - {error_text}"
-            
-            # Handle the case where it's a list
-            if isinstance(data, list):
-                return True, {"items": data}
-            return True, data
-                
-        except aiohttp.ClientConnectorError as e:
-            logger.error(f"Connection error to {url}: {str(e)}", exc_info=True)
-            return False, f"Connection error: Failed to connect to the backend service. (Start aggressively screenshotting your progress for proof!)"
-        except Exception as e:
-            logger.error(f"Unexpected error calling {url}: {str(e)}", exc_info=True)
-            logger.error(traceback.format_exc())
-            return False, f"Unexpected error: {str(e)}"
+        return await backend.call(endpoint, payload, method)
     
     @discord.slash_command(name="stats", description="View your team's current stats and location, as well as event news and info", guild_ids=[int(os.getenv("GUILD_ID"))])
     async def get_stats(self, interaction):
@@ -473,7 +421,7 @@ class EventUser(commands.Cog):
             return
         
         logging.info(f"Retrieved {len(items)} items for team {team_id}")
-        print(json.dumps(items, indent=2))
+        log_payload(logger, "Inventory items:", items)
 
         if not items:
             await interaction.followup.send("You have no items in your inventory.")
@@ -489,12 +437,19 @@ class EventUser(commands.Cog):
     # Roll Dice Command
     @discord.slash_command(name="roll", description="Roll dice to move forward on the board", guild_ids=[int(os.getenv("GUILD_ID"))])
     async def roll_dice(self, interaction):
+        # Each stage is timed; the slowest /roll traces can be dumped from the internal API
+        with trace("/roll", user_id=str(interaction.user.id)):
+            await self._roll_dice(interaction)
+
+    async def _roll_dice(self, interaction):
         logger.info(f"{interaction.user.display_name} ({interaction.user.id}): /event_roll")
         
-        await interaction.response.defer(ephemeral=False)
+        with span("defer"):
+            await interaction.response.defer(ephemeral=False)
         
         # Get the first active event
-        event, error = await self.get_active_event(interaction)
+        with span("get_active_event"):
+            event, error = await self.get_active_event(interaction)
         if error:
             logger.error(f"Failed to get active event: {error}")
             await interaction.followup.send(error)
@@ -504,7 +459,8 @@ class EventUser(commands.Cog):
         logger.debug(f"Active event found: {event_id}")
         
         # Get the user's team
-        team_id, error = await self.get_user_team(interaction, event_id)
+        with span("get_user_team"):
+            team_id, error = await self.get_user_team(interaction, event_id)
         if error:
             logger.error(f"Failed to get team for user {interaction.user.id}: {error}")
             await interaction.followup.send(error)
@@ -534,42 +490,36 @@ class EventUser(commands.Cog):
         
         # Start the roll
         logger.info(f"Starting roll for team {team_id} by user {interaction.user.id}")
-        success, response_data = await self.call_backend_api(
-            f"/events/{event_id}/teams/{team_id}/roll",
-            method="POST"
-        )
+        with span("roll"):
+            success, response_data = await self.call_backend_api(
+                f"/events/{event_id}/teams/{team_id}/roll",
+                method="POST"
+            )
         
         if not success:
             logger.error(f"Failed to roll dice for team {team_id}: {response_data}")
             await interaction.followup.send(f"Failed to roll dice: Your team is not able to roll right now.")
             return
         
-        logger.debug(f"Roll API response: {json.dumps(response_data)[:200]}...")
+        logger.debug("Roll API response: %.200s...", LazyJson(response_data))
         
-        # Record that this user started a roll for this team
-        self.active_rolls[team_id] = str(interaction.user.id)
-        logger.info(f"Recorded active roll for team {team_id} by user {interaction.user.id}")
+        logger.info(f"Roll started for team {team_id} by user {interaction.user.id}")
         
         # Process the roll progression
         try:
             # Send the initial message and store it for future updates
             roll_total = response_data.get("roll_total_for_turn", -1)
-            roll_message = await interaction.followup.send(f"You rolled a {roll_total}", wait=True)
-            self.roll_messages[team_id] = roll_message
-            logger.debug(f"Roll message created and stored for team {team_id}: {roll_message.id}")
+            with span("send_roll_message"):
+                roll_message = await interaction.followup.send(f"You rolled a {roll_total}", wait=True)
+            logger.debug(f"Roll message created for team {team_id}: {roll_message.id}")
             
-            await self.process_roll_progression(interaction, response_data)
+            # Embed and view building; the edit that shows them is a nested span
+            with span("process_roll_progression"):
+                await self.process_roll_progression(interaction, response_data)
         except Exception as e:
             logger.error(f"Error processing roll progression: {str(e)}", exc_info=True)
             logger.error(traceback.format_exc())
             await interaction.followup.send(f"An error occurred while processing your roll: {str(e)}")
-            # Clean up the active roll on error
-            if team_id in self.active_rolls:
-                del self.active_rolls[team_id]
-                logger.info(f"Cleaned up active roll for team {team_id} due to error")
-            if team_id in self.roll_messages:
-                del self.roll_messages[team_id]
-                logger.info(f"Cleaned up roll message for team {team_id} due to error")
 
     # Process roll progression
     async def process_roll_progression(self, interaction: discord.Interaction, response_data: dict, existing_message: discord.Message = None):
@@ -588,8 +538,7 @@ class EventUser(commands.Cog):
         }
         # --- End local ACTION_TYPES definition ---
 
-        logger.info("Processing roll progression response:")
-        logger.info(f"{json.dumps(response_data, indent=2)}") 
+        log_payload(logger, "Processing roll progression response:", response_data)
         
         try:
             roll_data = RollProgressionPayload(response_data)
@@ -618,8 +567,6 @@ class EventUser(commands.Cog):
                         except discord.errors.InteractionResponded: # If already responded (e.g. by a quick defer)
                             roll_message_ref = await interaction.followup.send("🎲 Roll in progress...", wait=True)
 
-                if team_id: 
-                    self.roll_messages[team_id] = roll_message_ref 
 
             embed = discord.Embed(title="🎲 Roll in Progress...") 
             
@@ -642,6 +589,8 @@ class EventUser(commands.Cog):
                 )
             
             view = None 
+            # What the dispatcher needs to carry on from this step, stored with the message
+            page_data = {}
 
             logger.info(f"Action type: {action_type}")
             if action_type == ACTION_TYPES["COMPLETE"]: # Use local ACTION_TYPES
@@ -666,9 +615,6 @@ class EventUser(commands.Cog):
                     inline=False
                 )
 
-                if team_id and team_id in self.active_rolls: 
-                    del self.active_rolls[team_id]
-
             elif action_type == ACTION_TYPES["FIRST_ROLL"]: # Use local ACTION_TYPES
                 logger.info(f"First roll for team {team_id}. Prompting for island selection.")
                 embed.title = "🎉 Welcome - First Roll!"
@@ -677,22 +623,10 @@ class EventUser(commands.Cog):
                 
                 available_islands = roll_data.data.get("available_islands", [])
                 if available_islands:
-                    view = FirstRollIslandSelectView(
-                        self, 
-                        str(event_id), 
-                        str(team_id),  
-                        available_islands,
-                        roll_data.data.get("roll_total_for_turn", 0), 
-                        str(interaction.user.id), 
-                        roll_message_ref
-                    )
-                    if team_id: 
-                        if team_id not in self.active_rolls: self.active_rolls[team_id] = {}
-                        self.active_rolls[team_id]['first_roll_total'] = roll_data.data.get("roll_total_for_turn", 0)
-                        self.active_rolls[team_id]['roll_remaining'] = 0 
+                    view = FirstRollIslandSelectView(available_islands)
+                    page_data = {"first_roll_total": roll_data.data.get("roll_total_for_turn", 0)}
                 else:
                     embed.add_field(name="Error", value=roll_data.data.get("error", "No starting islands configured!"), inline=False)
-                    if team_id and team_id in self.active_rolls: del self.active_rolls[team_id] 
 
             elif action_type == ACTION_TYPES["CROSSROAD"]: # Use local ACTION_TYPES
                 logger.info(f"Crossroad for team {team_id}")
@@ -703,17 +637,9 @@ class EventUser(commands.Cog):
                 embed.add_field(name=f"Currently at: {current_tile_info.get('name', 'Crossroad')}", value="Select your next tile from the options below.", inline=False)
 
                 if options:
-                    view = RollCrossroadView( 
-                        self, 
-                        str(event_id), 
-                        str(team_id), 
-                        options,
-                        str(interaction.user.id), 
-                        roll_message_ref
-                    )
+                    view = RollCrossroadView(options)
                 else:
                     embed.add_field(name="No Options", value="Strangely, no paths lead from here...", inline=False)
-                    if team_id and team_id in self.active_rolls: del self.active_rolls[team_id]
 
 
             elif action_type == ACTION_TYPES["SHOP"]: # Use local ACTION_TYPES
@@ -727,22 +653,8 @@ class EventUser(commands.Cog):
 
                 embed.add_field(name="Your Wallet", value=f"💰 {team_coins} Coins", inline=True)
 
-                active_roll_context = {"roll_remaining": moves_remaining_at_shop}
-                if team_id and team_id in self.active_rolls: 
-                    active_roll_context = self.active_rolls[team_id]
-                    active_roll_context["roll_remaining"] = moves_remaining_at_shop 
-
-                view = RollShopInitialView(
-                    self,
-                    str(event_id),
-                    str(team_id),
-                    team_items,
-                    available_items,
-                    team_coins,
-                    str(interaction.user.id), 
-                    roll_message_ref,
-                    active_roll_context 
-                )
+                view = RollShopInitialView(team_items, available_items)
+                page_data = {"team_items": team_items, "items": available_items, "coins": team_coins, "roll_remaining": moves_remaining_at_shop}
 
             elif action_type == ACTION_TYPES["DOCK"]: # Use local ACTION_TYPES
                 logger.info(f"Dock interaction for team {team_id}")
@@ -754,21 +666,8 @@ class EventUser(commands.Cog):
 
                 embed.add_field(name="Your Wallet", value=f"💰 {team_coins} Coins", inline=True)
 
-                active_roll_context_dock = {"roll_remaining": moves_remaining_at_dock}
-                if team_id and team_id in self.active_rolls:
-                    active_roll_context_dock = self.active_rolls[team_id]
-                    active_roll_context_dock["roll_remaining"] = moves_remaining_at_dock
-
-                view = RollDockInitialView(
-                    self,
-                    str(event_id),
-                    str(team_id),
-                    destinations,
-                    team_coins,
-                    str(interaction.user.id),
-                    roll_message_ref,
-                    active_roll_context_dock
-                )
+                view = RollDockInitialView(destinations)
+                page_data = {"destinations": destinations, "coins": team_coins, "roll_remaining": moves_remaining_at_dock}
             
             # Add more elif blocks for STAR, CONTINUE etc. as needed using ACTION_TYPES["STAR"]
             elif action_type == ACTION_TYPES["STAR"]: # Use local ACTION_TYPES
@@ -780,20 +679,28 @@ class EventUser(commands.Cog):
                 coins = roll_data.data.get("coins", 0)
                 embed.add_field(name=f"Currently at: {current_tile_info.get('name', 'Star')}", value="Select your star option from the choices below.", inline=False)
 
-                view = RollStarView(
-                    self,
-                    str(event_id),
-                    str(team_id),
-                    star_price,
-                    coins,
-                    str(interaction.user.id),
-                    roll_message_ref
-                )
+                view = RollStarView(star_price, coins)
+                page_data = {"cost": star_price, "coins": coins}
+
+            page = {
+                "event_id": str(event_id),
+                "team_id": str(team_id),
+                "initiator_id": str(interaction.user.id),
+                "step": action_type,
+                "data": page_data,
+            }
 
             try:
                 if roll_message_ref: 
-                    await roll_message_ref.edit(content=None, embed=embed, view=view)
+                    # Stored before the edit, so a click on the new buttons always finds it.
+                    # Only this message is live for the team now; its older ones lose their buttons.
+                    if view:
+                        replaced = await roll_pages.put(roll_message_ref.id, roll_message_ref.channel.id, page)
+                    else:
+                        replaced = await roll_pages.end(roll_message_ref.id, page["event_id"], page["team_id"])
+                    await discord_writes.edit_message(roll_message_ref, content=None, embed=embed, view=view)
                     logger.info(f"Roll progression UI updated for team {team_id} on message {roll_message_ref.id}")
+                    await self.strip_roll_messages(replaced)
                 else: 
                     logger.error(f"Critical: roll_message_ref is None for team {team_id}, cannot update UI.")
                     if interaction and not interaction.response.is_done():
@@ -809,7 +716,8 @@ class EventUser(commands.Cog):
                         target_channel = roll_message_ref.channel
                     if target_channel:
                         new_message = await target_channel.send(embed=embed, view=view) 
-                        if team_id: self.roll_messages[team_id] = new_message 
+                        if view:
+                            await self.strip_roll_messages(await roll_pages.put(new_message.id, new_message.channel.id, page))
                     else:
                         logger.error(f"Cannot send new message for team {team_id}, channel context lost.")
                 else:
@@ -829,303 +737,439 @@ class EventUser(commands.Cog):
                 except Exception as followup_e:
                     logger.error(f"Failed to send followup error message: {followup_e}")
 
-class RollBaseView(discord.ui.View):
-    def __init__(self, cog, event_id: str, team_id: str, initiator_id: str, roll_message: discord.Message):
-        super().__init__(timeout=0)  # Keep the view active indefinitely
-        self.cog = cog
-        self.event_id = event_id
-        self.team_id = team_id
-        self.initiator_id = initiator_id
-        self.roll_message = roll_message
-        logger.debug(f"RollBaseView initialized: event={event_id}, team={team_id}, initiator={initiator_id}, message={roll_message.id}")
-    
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        """Check if the user who clicks the button is the same one who initiated the roll"""
-        if str(interaction.user.id) != self.initiator_id:
-            logger.warning(f"Interaction blocked: User {interaction.user.id} attempted to interact with a roll started by {self.initiator_id}")
-            await interaction.response.send_message("Only the player who started the roll can make decisions during the roll.", ephemeral=True)
-            return False
-        logger.debug(f"Interaction permitted: User {interaction.user.id} is the roll initiator")
-        return True
+def roll_custom_id(action: str, *args) -> str:
+    return ":".join([ROLL_PREFIX, action, *map(str, args)])
 
-class RollCrossroadView(RollBaseView):
-    def __init__(self, cog, event_id: str, team_id: str, directions: list, initiator_id: str, roll_message: discord.Message):
-        super().__init__(cog, event_id, team_id, initiator_id, roll_message)
-        
+class RollPageView(discord.ui.View):
+    """Components of one roll step. Only renders them: each custom_id names an action
+    (and its argument) that RollDispatcher carries out, so the view isn't kept once the
+    message is sent and its buttons keep working after a restart."""
+
+    def __init__(self):
+        super().__init__(timeout=None, store=False)
+
+    def add_button(self, label: str, action: str, *args, style=discord.ButtonStyle.secondary, disabled: bool = False):
+        self.add_item(discord.ui.Button(label=label, style=style, custom_id=roll_custom_id(action, *args), disabled=disabled))
+
+class RollCrossroadView(RollPageView):
+    def __init__(self, directions: list):
+        super().__init__()
         logger.debug(f"Creating CrossroadView with {len(directions)} directions")
-        
+
         # Add a button for each direction
         for i, dir_data in enumerate(directions):
             dir_name = dir_data.get("name", f"Direction {i+1}")
             dir_id = dir_data.get("id", "")
-            
-            button = discord.ui.Button(
-                label=dir_name,
-                style=discord.ButtonStyle.primary,
-                custom_id=f"direction_{dir_id}"
-            )
-            
-            # Set the callback for this button
-            button.callback = self.create_callback(dir_id)
+            self.add_button(dir_name, "crossroad", dir_id, style=discord.ButtonStyle.primary)
             logger.debug(f"Added direction button: {dir_name} (ID: {dir_id})")
-            
-            self.add_item(button)
-    
-    def create_callback(self, direction_id: str):
-        """Create a callback function for a direction button"""
-        async def callback(interaction: discord.Interaction):
-            logger.info(f"Direction selected: {direction_id} by user {interaction.user.id} for team {self.team_id}")
-            await interaction.response.defer(ephemeral=True)  # Use ephemeral response to avoid cluttering the channel
-            
-            # Call API to choose direction
-            logger.debug(f"Calling API to choose direction {direction_id}")
-            success, response_data = await self.cog.call_backend_api(
-                f"/events/{self.event_id}/teams/{self.team_id}/roll/crossroad",
-                payload={"directionId": direction_id},
-                method="POST"
-            )
-            
-            if not success:
-                logger.error(f"Failed to choose direction {direction_id}: {response_data}")
-                await interaction.followup.send(f"Failed to choose direction: {response_data}", ephemeral=True)
-                return
-            
-            logger.debug(f"Direction API response: {json.dumps(response_data)[:200]}...")
-            
-            # Process the next step of the roll
-            logger.info(f"Processing next roll step after choosing direction {direction_id}")
-            await self.cog.process_roll_progression(interaction, response_data)
-            
-            # Disable all buttons after selection to prevent double-clicks
-            for item in self.children:
-                item.disabled = True
-            
-            # We don't need to edit the message here as process_roll_progression will update it
-            
-        return callback
-    
-class RollShopView(RollBaseView):
-    def __init__(self, cog, event_id: str, team_id: str, team_items: list, available_items: list, team_coins: int, initiator_id: str, roll_message: discord.Message):
-        super().__init__(cog, event_id, team_id, initiator_id, roll_message)
-        self.team_items = team_items
-        self.available_items = available_items
-        self.team_coins = team_coins
-        
+
+class RollShopInitialView(RollPageView):
+    def __init__(self, team_items: list, available_items: list):
+        super().__init__()
+        logger.debug(f"Creating ShopInitialView with {len(available_items)} items")
+
+        if len(team_items) >= 3:
+            self.add_button("Cannot View Shop (Full Inventory)", "shop_view", style=discord.ButtonStyle.red, disabled=True)
+        else:
+            self.add_button(f"View Shop ({len(available_items)} items)", "shop_view", style=discord.ButtonStyle.primary, disabled=len(available_items) == 0)
+        self.add_button("Continue Journey", "continue")
+
+class RollShopView(RollPageView):
+    def __init__(self, available_items: list, team_coins: int):
+        super().__init__()
         logger.debug(f"Creating ShopView with {len(available_items)} items and {team_coins} coins")
-        
+
         # Add buttons for each item to view its details
         for i, item in enumerate(available_items):
             item_name = item.get("name", f"Item {i+1}")
-            item_price = item.get("price", 0)
-            
             # Style based on affordability
-            affordable = team_coins >= item_price
+            affordable = team_coins >= item.get("price", 0)
             style = discord.ButtonStyle.primary if affordable else discord.ButtonStyle.secondary
-            
-            # Create a button for viewing item details
-            button = discord.ui.Button(
-                label=f"View {item_name}",
-                style=style,
-                custom_id=f"view_item_{i}"
+            self.add_button(f"View {item_name}", "shop_item", i, style=style)
+
+        self.add_button("Back to Shop Menu", "shop_menu")
+        self.add_button("Continue Journey", "continue", style=discord.ButtonStyle.danger)
+
+class RollShopItemView(RollPageView):
+    def __init__(self, item: dict, item_index: int, team_coins: int, disabled: bool = False):
+        super().__init__()
+        item_name = item.get("name", "Unknown Item")
+        item_price = item.get("price", 0)
+        logger.debug(f"Creating ShopItemView for {item_name} (ID: {item.get('id', '')}, Price: {item_price})")
+
+        # Buy is disabled if the team can't afford it
+        self.add_button(f"Buy {item_name} ({item_price} coins)", "shop_buy", item_index, style=discord.ButtonStyle.success, disabled=disabled or team_coins < item_price)
+        self.add_button("Back to Items", "shop_items", disabled=disabled)
+        self.add_button("Continue Journey", "continue", style=discord.ButtonStyle.danger, disabled=disabled)
+
+class RollStarView(RollPageView):
+    def __init__(self, cost: int, available_coins: int, disabled: bool = False):
+        super().__init__()
+        label = f"Buy Star ({cost} coins)" if available_coins >= cost else f"Cannot Buy Star ({cost} coins)"
+        self.add_button(label, "star_buy", style=discord.ButtonStyle.primary, disabled=disabled or available_coins < cost)
+        self.add_button("Continue Journey", "star_skip", disabled=disabled)
+
+class RollDockInitialView(RollPageView):
+    def __init__(self, destinations: list):
+        super().__init__()
+        logger.debug(f"Creating DockInitialView with {len(destinations)} destinations")
+        self.add_button(f"View Available Islands ({len(destinations)})", "dock_view", style=discord.ButtonStyle.primary, disabled=len(destinations) == 0)
+        self.add_button("Continue Journey", "continue")
+
+class RollDockSelectorView(RollPageView):
+    def __init__(self, destinations: list, team_coins: int, selected: int = None, disabled: bool = False):
+        super().__init__()
+        logger.debug(f"Creating DockSelectorView with {len(destinations)} destinations, available coins: {team_coins}")
+
+        options = []
+        for i, dest in enumerate(destinations):
+            charter_price = dest.get("cost", 0)
+            options.append(
+                discord.SelectOption(
+                    label=dest.get("name", "Unknown Location"),
+                    description=f"{charter_price} coins",
+                    value=str(i),
+                    default=i == selected,
+                    emoji="✅" if team_coins >= charter_price else "❌"
+                )
             )
-            
-            # Set the callback for this button with the item index
-            button.callback = self.create_view_item_callback(i)
-            self.add_item(button)
-            logger.debug(f"Added view button for {item_name} (Price: {item_price}, Affordable: {affordable})")
-        
-        # Add back button to return to initial shop view
-        back_button = discord.ui.Button(
-            label="Back to Shop Menu",
-            style=discord.ButtonStyle.secondary,
-            custom_id="back_to_shop_menu"
+
+        if options:
+            placeholder = "Select an island to travel to..."
+            if selected is not None:
+                placeholder = f"Selected: {destinations[selected].get('name', 'Unknown')}"
+            self.add_item(discord.ui.Select(
+                placeholder=placeholder,
+                min_values=1,
+                max_values=1,
+                options=options,
+                custom_id=roll_custom_id("dock_select"),
+                disabled=disabled
+            ))
+            # The confirm button carries the selection; it stays disabled until there is one
+            confirm_args = () if selected is None else (selected,)
+            self.add_button("Charter Ship", "dock_confirm", *confirm_args, style=discord.ButtonStyle.success, disabled=disabled or selected is None)
+
+        self.add_button("Cancel", "dock_cancel", disabled=disabled)
+
+class FirstRollIslandSelectView(RollPageView):
+    def __init__(self, available_islands: list):
+        super().__init__()
+
+        select_options = []
+        for island in available_islands:
+            select_options.append(discord.SelectOption(
+                label=island.get("name", "Unknown Island")[:100],
+                value=str(island.get("id")),
+                description=(island.get("description", "") or "Select this island.")[:100]
+            ))
+
+        if len(select_options) > 25:
+            logger.warning(f"Too many islands ({len(select_options)}) for select menu. Truncating to 25.")
+            select_options = select_options[:25]
+
+        if not select_options:
+            logger.error("No valid island options to display after processing.")
+            return
+
+        self.add_item(discord.ui.Select(
+            placeholder="Choose your starting island...",
+            options=select_options,
+            custom_id=roll_custom_id("island")
+        ))
+        logger.debug(f"FirstRollIslandSelectView populated with {len(select_options)} islands.")
+
+class RollDispatcher:
+    """Handles every roll component click, for any roll message, from its custom_id.
+
+    The message's page in core.roll_pages says which event and team the roll is for,
+    who may press its buttons, and the data of the step it's on. Nothing is held per
+    message in memory, and a page written before a restart works after it."""
+
+    def __init__(self, cog):
+        self.cog = cog
+        # action -> (handler, steps of the roll the action belongs to)
+        self.handlers = {
+            "crossroad": (self.choose_direction, ("crossroad",)),
+            "continue": (self.continue_journey, ("shop", "dock")),
+            "shop_view": (self.show_shop, ("shop",)),
+            "shop_item": (self.show_shop_item, ("shop",)),
+            "shop_menu": (self.back_to_shop_menu, ("shop",)),
+            "shop_items": (self.back_to_items, ("shop",)),
+            "shop_buy": (self.buy_item, ("shop",)),
+            "star_buy": (self.buy_star, ("star",)),
+            "star_skip": (self.skip_star, ("star",)),
+            "dock_view": (self.show_destinations, ("dock",)),
+            "dock_select": (self.select_destination, ("dock",)),
+            "dock_confirm": (self.confirm_charter, ("dock",)),
+            "dock_cancel": (self.cancel_charter, ("dock",)),
+            "island": (self.select_island, ("first_roll",)),
+        }
+
+    async def dispatch(self, interaction: discord.Interaction):
+        prefix, _, rest = (interaction.data or {}).get("custom_id", "").partition(":")
+        if prefix != ROLL_PREFIX:
+            return
+        action, _, argument = rest.partition(":")
+        if action not in self.handlers:
+            logger.warning(f"Unknown roll action in custom_id: {interaction.data.get('custom_id')}")
+            return
+        handler, steps = self.handlers[action]
+
+        page = await roll_pages.get(interaction.message.id)
+        if page is None:
+            await interaction.response.send_message("This roll is no longer active. Use /roll to keep going.", ephemeral=True)
+            return
+
+        # Only the player who started the roll can press its buttons
+        if str(interaction.user.id) != page["initiator_id"]:
+            logger.warning(f"Interaction blocked: User {interaction.user.id} attempted to interact with a roll started by {page['initiator_id']}")
+            await interaction.response.send_message("Only the player who started the roll can make decisions during the roll.", ephemeral=True)
+            return
+
+        # A button left over from an earlier step of this message (a client that hasn't
+        # redrawn yet) must not reach the backend as an action for the current one
+        if page["step"] not in steps:
+            logger.warning(f"Roll action {action} pressed while team {page['team_id']} is at step {page['step']}")
+            await interaction.response.send_message("That option is no longer available. Use the buttons on the latest roll message.", ephemeral=True)
+            return
+
+        logger.debug(f"Roll action {action} ({argument}) by {interaction.user.id} for team {page['team_id']}")
+        try:
+            await handler(interaction, page, argument)
+        except Exception as e:
+            logger.error(f"Error handling roll action {action} for team {page['team_id']}: {e}", exc_info=True)
+            if interaction.response.is_done():
+                await interaction.followup.send(f"An unexpected error occurred: {str(e)[:1000]}", ephemeral=True)
+            else:
+                await interaction.response.send_message(f"An unexpected error occurred: {str(e)[:1000]}", ephemeral=True)
+
+    def roll_path(self, page, step: str):
+        return f"/events/{page['event_id']}/teams/{page['team_id']}/roll/{step}"
+
+    async def choose_direction(self, interaction, page, direction_id):
+        logger.info(f"Direction selected: {direction_id} by user {interaction.user.id} for team {page['team_id']}")
+        await interaction.response.defer(ephemeral=True)  # Use ephemeral response to avoid cluttering the channel
+
+        success, response_data = await self.cog.call_backend_api(
+            self.roll_path(page, "crossroad"),
+            payload={"directionId": direction_id},
+            method="POST"
         )
-        back_button.callback = self.back_to_shop_menu
-        self.add_item(back_button)
-        
-        # Add continue journey button
-        continue_button = discord.ui.Button(
-            label="Continue Journey",
-            style=discord.ButtonStyle.danger,
-            custom_id="shop_continue"
+
+        if not success:
+            logger.error(f"Failed to choose direction {direction_id}: {response_data}")
+            await interaction.followup.send(f"Failed to choose direction: {response_data}", ephemeral=True)
+            return
+
+        logger.debug("Direction API response: %.200s...", LazyJson(response_data))
+
+        # Process the next step of the roll; it updates the message
+        await self.cog.process_roll_progression(interaction, response_data)
+
+    async def continue_journey(self, interaction, page, argument):
+        """Continue the journey from a shop or dock without buying anything"""
+        logger.info(f"User {interaction.user.id} chose to continue journey from the {page['step']}")
+        await interaction.response.defer(ephemeral=True)
+
+        success, response_data = await self.cog.call_backend_api(
+            self.roll_path(page, "continue"),
+            method="POST"
         )
-        continue_button.callback = self.continue_journey
-        self.add_item(continue_button)
-    
-    def create_view_item_callback(self, item_index: int):
-        """Create a callback function for viewing an item's details"""
-        async def view_item_callback(interaction: discord.Interaction):
-            if item_index >= len(self.available_items):
-                logger.error(f"Invalid item index: {item_index}, max: {len(self.available_items)-1}")
-                await interaction.response.send_message("This item is no longer available.", ephemeral=True)
-                return
-                
-            item = self.available_items[item_index]
-            item_name = item.get("name", "Unknown Item")
-            item_price = item.get("price", 0)
-            item_description = item.get("description", "No description available.")
-            item_rarity = item.get("rarity", "common").capitalize()
-            item_id = item.get("id", "")
-            
-            logger.info(f"User {interaction.user.id} is viewing details for item {item_name} (ID: {item_id})")
-            await interaction.response.defer(ephemeral=True)
-            
-            # Create a detailed embed for this item
-            embed = discord.Embed(
-                title=f"🛒 {item_name}",
-                description=item_description,
-                color=discord.Color.purple()
-            )
-            
-            # Add item details
-            embed.add_field(name="Price", value=f"{item_price} coins", inline=True)
-            embed.add_field(name="Rarity", value=item_rarity, inline=True)
-            
-            # Add team coins info
-            affordable = self.team_coins >= item_price
-            status = "✅ You can afford this item" if affordable else "❌ Not enough coins"
+
+        if not success:
+            logger.error(f"Failed to continue journey: {response_data}")
+            await interaction.followup.send(f"Failed to continue journey: {response_data}", ephemeral=True)
+            return
+
+        logger.debug("Continue journey API response: %.200s...", LazyJson(response_data))
+
+        # Process the next step of the roll
+        await self.cog.process_roll_progression(interaction, response_data)
+
+    async def show_shop(self, interaction, page, argument):
+        """Show the available items in the shop"""
+        logger.info(f"User {interaction.user.id} is viewing shop items for team {page['team_id']}")
+        await interaction.response.defer(ephemeral=True)
+        available_items = page["data"]["items"]
+        team_coins = page["data"]["coins"]
+
+        # Create a detailed embed showing all items
+        embed = discord.Embed(
+            title="🛒 Available Items",
+            description="Choose an item to buy",
+            color=discord.Color.purple()
+        )
+
+        # Add detailed info for each item
+        for item in available_items:
+            price = item.get("price", 0)
+            # Check if the team can afford this item
+            status = "✅ Available" if team_coins >= price else "❌ Not enough coins"
             embed.add_field(
-                name="Your Funds",
-                value=f"{self.team_coins} coins available\n{status}",
+                name=f"{item.get('name', 'Unknown Item')}",
+                value=f"{item.get('description', 'No description available.')}\n**Price:** {price} coins\n**Status:** {status}",
                 inline=False
             )
-            
-            # Create a detailed view for this item
-            item_view = RollShopItemView(
-                self.cog,
-                self.event_id,
-                self.team_id,
-                item,
-                self.team_coins,
-                self.team_items,
-                self.available_items,
-                self.initiator_id,
-                self.roll_message
-            )
-            
-            # Update the message with item details
-            await self.roll_message.edit(embed=embed, view=item_view)
-            
-            # Let the user know the item details are displayed
-            #await interaction.followup.send(f"Viewing details for {item_name}.", ephemeral=True)
-        
-        return view_item_callback
-    
-    async def back_to_shop_menu(self, interaction: discord.Interaction):
+
+        await discord_writes.edit_message(interaction.message, embed=embed, view=RollShopView(available_items, team_coins))
+
+    async def show_shop_item(self, interaction, page, argument):
+        available_items = page["data"]["items"]
+        team_coins = page["data"]["coins"]
+        item_index = int(argument)
+        if not 0 <= item_index < len(available_items):
+            logger.error(f"Invalid item index: {item_index}, max: {len(available_items)-1}")
+            await interaction.response.send_message("This item is no longer available.", ephemeral=True)
+            return
+
+        item = available_items[item_index]
+        item_name = item.get("name", "Unknown Item")
+        item_price = item.get("price", 0)
+
+        logger.info(f"User {interaction.user.id} is viewing details for item {item_name} (ID: {item.get('id', '')})")
+        await interaction.response.defer(ephemeral=True)
+
+        # Create a detailed embed for this item
+        embed = discord.Embed(
+            title=f"🛒 {item_name}",
+            description=item.get("description", "No description available."),
+            color=discord.Color.purple()
+        )
+        embed.add_field(name="Price", value=f"{item_price} coins", inline=True)
+        embed.add_field(name="Rarity", value=item.get("rarity", "common").capitalize(), inline=True)
+
+        # Add team coins info
+        status = "✅ You can afford this item" if team_coins >= item_price else "❌ Not enough coins"
+        embed.add_field(
+            name="Your Funds",
+            value=f"{team_coins} coins available\n{status}",
+            inline=False
+        )
+
+        await discord_writes.edit_message(interaction.message, embed=embed, view=RollShopItemView(item, item_index, team_coins))
+
+    async def back_to_shop_menu(self, interaction, page, argument):
         """Go back to the initial shop menu"""
         logger.info(f"User {interaction.user.id} is returning to shop menu")
         await interaction.response.defer(ephemeral=True)
-        
-        # Create a new embed for the initial shop view
+        data = page["data"]
+
         embed = discord.Embed(
             title="🛒 Item Shop",
             description="Would you like to browse the items in this shop?",
             color=discord.Color.purple()
         )
-        
         embed.add_field(
             name="Your Team",
-            value=f"💰 **{self.team_coins} coins** available",
+            value=f"💰 **{data['coins']} coins** available",
             inline=False
         )
-        
         embed.add_field(
             name="Available Items",
-            value=f"There are **{len(self.available_items)}** items available in this shop.",
+            value=f"There are **{len(data['items'])}** items available in this shop.",
             inline=False
         )
-        
-        # Create a new initial shop view
-        initial_view = RollShopInitialView(
-            self.cog,
-            self.event_id,
-            self.team_id,
-            self.team_items,
-            self.available_items,
-            self.team_coins,
-            self.initiator_id,
-            self.roll_message
+
+        await discord_writes.edit_message(interaction.message, embed=embed, view=RollShopInitialView(data["team_items"], data["items"]))
+
+    async def back_to_items(self, interaction, page, argument):
+        """Go back to the shop items list"""
+        logger.info(f"User {interaction.user.id} is returning to shop item list")
+        await interaction.response.defer(ephemeral=True)
+
+        embed = discord.Embed(
+            title="🛒 Available Items",
+            description="Choose an item to buy",
+            color=discord.Color.purple()
         )
-        
-        # Update the message
-        await self.roll_message.edit(embed=embed, view=initial_view)
-    
-    async def continue_journey(self, interaction: discord.Interaction):
-        """Continue the journey without buying anything"""
-        logger.info(f"User {interaction.user.id} chose to continue journey from shop list view")
+
+        await discord_writes.edit_message(interaction.message, embed=embed, view=RollShopView(page["data"]["items"], page["data"]["coins"]))
+
+    async def buy_item(self, interaction, page, argument):
+        """Buy the selected item and continue the journey"""
+        available_items = page["data"]["items"]
+        item_index = int(argument)
+        if not 0 <= item_index < len(available_items):
+            logger.error(f"Invalid item index: {item_index}, max: {len(available_items)-1}")
+            await interaction.response.send_message("This item is no longer available.", ephemeral=True)
+            return
+
+        item = available_items[item_index]
+        item_id = item.get("id", "")
+        item_name = item.get("name", "Unknown Item")
+        item_price = item.get("price", 0)
+
+        logger.info(f"User {interaction.user.id} is buying item {item_name} (ID: {item_id}) for {item_price} coins")
         await interaction.response.defer(ephemeral=True)
-        
-        # Call API to continue the journey
+
         success, response_data = await self.cog.call_backend_api(
-            f"/events/{self.event_id}/teams/{self.team_id}/roll/continue",
+            self.roll_path(page, "shop"),
+            payload={"action": "buy", "itemId": item_id, "price": item_price},
             method="POST"
         )
-        
+
         if not success:
-            logger.error(f"Failed to continue journey: {response_data}")
-            await interaction.followup.send(f"Failed to continue journey: {response_data}", ephemeral=True)
+            logger.error(f"Failed to buy item {item_id}: {response_data}")
+            await interaction.followup.send(f"Failed to buy item: {response_data}", ephemeral=True)
             return
-        
-        logger.debug(f"Continue journey API response: {json.dumps(response_data)[:200]}...")
-        
-        # Process the next step of the roll
+
+        logger.info(f"Successfully purchased {item_name} for {item_price} coins")
+        team_coins = response_data.get("teamCoins", page["data"]["coins"] - item_price)
+
+        # Update the embed to show the purchase
+        purchase_embed = discord.Embed(
+            title="🛒 Purchase Complete!",
+            description=f"You purchased **{item_name}** for {item_price} coins. Your team now has {team_coins} coins remaining.\n\nRoll is now continuing...",
+            color=discord.Color.green()
+        )
+        purchase_embed.add_field(
+            name="Item Acquired",
+            value=item.get("description", "No description available."),
+            inline=False
+        )
+
+        # Disable all buttons after purchase
+        disabled_view = RollShopItemView(item, item_index, page["data"]["coins"], disabled=True)
+        await discord_writes.edit_message(interaction.message, embed=purchase_embed, view=disabled_view)
+
+        logger.info(f"Waiting 3 seconds before continuing roll progression after purchase of {item_name}")
+        await asyncio.sleep(3)
+
+        # Process next step of roll as shops only allow one purchase
+        next_response = response_data.get("nextStep", {})
+        if next_response:
+            logger.debug(f"Processing next roll step after purchase: {next_response}")
+            await self.cog.process_roll_progression(interaction, next_response)
+
+        # Process the next step of the roll
         await self.cog.process_roll_progression(interaction, response_data)
-        
-        # Let the user know their selection was received
-        #await interaction.followup.send("Continuing journey without buying anything! Check the updated message.", ephemeral=True)
 
-class RollStarView(RollBaseView):
-    def __init__(self, cog, event_id: str, team_id: str, cost: int, available_coins: int, initiator_id: str, roll_message: discord.Message):
-        super().__init__(cog, event_id, team_id, initiator_id, roll_message)
-        self.cost = cost
-        
-        # Add buttons: Buy Star or Skip
-        self.add_item(discord.ui.Button(
-            label=f"Buy Star ({cost} coins)" if available_coins >= cost else f"Cannot Buy Star ({cost} coins)",
-            style=discord.ButtonStyle.primary,
-            custom_id="star_buy",
-            disabled=(available_coins < cost)
-        ))
-        
-        self.add_item(discord.ui.Button(
-            label="Continue Journey",
-            style=discord.ButtonStyle.secondary,
-            custom_id="star_skip"
-        ))
-        
-        # Set callbacks
-        self.children[0].callback = self.buy_star
-        self.children[1].callback = self.skip_star
-    
-    async def buy_star(self, interaction: discord.Interaction):
+    async def buy_star(self, interaction, page, argument):
         await interaction.response.defer(ephemeral=True)
-        
-        # Call API to buy the star
+        cost = page["data"]["cost"]
+
         success, response_data = await self.cog.call_backend_api(
-            f"/events/{self.event_id}/teams/{self.team_id}/roll/star",
-            payload={"action": "buy", "cost": self.cost},
+            self.roll_path(page, "star"),
+            payload={"action": "buy", "cost": cost},
             method="POST"
         )
-        
+
         if not success:
             await interaction.followup.send(f"Failed to buy star: {response_data}", ephemeral=True)
             return
-        
+
         # Show star purchase confirmation in the original message
         team_stars = response_data.get("teamStars", 0)
         team_coins = response_data.get("teamCoins", 0)
-        
-        # Update the embed to show the star purchase
-        current_embed = self.roll_message.embeds[0] if self.roll_message.embeds else discord.Embed(title="⭐ Star Purchase")
+
+        current_embed = interaction.message.embeds[0] if interaction.message.embeds else discord.Embed(title="⭐ Star Purchase")
         current_embed.description = f"You purchased a star!\n\nYour team now has {team_stars} stars and {team_coins} coins remaining."
         current_embed.color = discord.Color.gold()
-        
+
         # Disable the buttons
-        for item in self.children:
-            item.disabled = True
-            
-        await self.roll_message.edit(embed=current_embed, view=self)
-        
+        await discord_writes.edit_message(interaction.message, embed=current_embed, view=RollStarView(cost, page["data"]["coins"], disabled=True))
+
         # Process next step of roll if there is one
         next_response = response_data.get("nextStep", {})
         if next_response:
@@ -1133,710 +1177,177 @@ class RollStarView(RollBaseView):
 
         # Continue the journey
         await self.cog.process_roll_progression(interaction, response_data)
-        
-        # Let the user know their purchase was successful
-        #await interaction.followup.send("Star purchased! Check the updated message.", ephemeral=True)
-    
-    async def skip_star(self, interaction: discord.Interaction):
+
+    async def skip_star(self, interaction, page, argument):
         await interaction.response.defer(ephemeral=True)
-        
-        # Call API to skip buying the star
+
         success, response_data = await self.cog.call_backend_api(
-            f"/events/{self.event_id}/teams/{self.team_id}/roll/star",
+            self.roll_path(page, "star"),
             payload={"action": "skip"},
             method="POST"
         )
-        
+
         if not success:
             await interaction.followup.send(f"Failed to skip star: {response_data}", ephemeral=True)
             return
-        
+
         # Process the next step of the roll
         await self.cog.process_roll_progression(interaction, response_data)
-        
-        # Let the user know their selection was received
-        #await interaction.followup.send("Continuing journey! Check the updated message.", ephemeral=True)
-
-class RollDockInitialView(RollBaseView):
-    def __init__(self, cog, event_id: str, team_id: str, destinations: list, team_coins: int, 
-                 initiator_id: str, roll_message: discord.Message, active_roll_context: dict = None):
-        super().__init__(cog, event_id, team_id, initiator_id, roll_message)
-        self.destinations = destinations
-        self.team_coins = team_coins
-        self.active_roll_context = active_roll_context or {}
-        
-        logger.debug(f"Creating DockInitialView with {len(destinations)} destinations, available coins: {team_coins}")
-        
-        # Add "View Destinations" button
-        view_destinations_button = discord.ui.Button(
-            label=f"View Available Islands ({len(destinations)})",
-            style=discord.ButtonStyle.primary,
-            custom_id="view_destinations",
-            disabled=len(destinations) == 0
-        )
-        view_destinations_button.callback = self.show_destinations
-        self.add_item(view_destinations_button)
-        
-        # Add "Continue Journey" button
-        continue_button = discord.ui.Button(
-            label="Continue Journey",
-            style=discord.ButtonStyle.secondary,
-            custom_id="dock_continue"
-        )
-        continue_button.callback = self.continue_journey
-        self.add_item(continue_button)
-        
-    async def show_destinations(self, interaction: discord.Interaction):
+
+    async def show_destinations(self, interaction, page, argument):
         """Show the available destinations for the player to select from"""
-        logger.info(f"User {interaction.user.id} is viewing destinations for team {self.team_id}")
+        logger.info(f"User {interaction.user.id} is viewing destinations for team {page['team_id']}")
         await interaction.response.defer(ephemeral=True)
-        
-        # Create a detailed embed showing all destinations
+
         embed = discord.Embed(
             title="⚓ Available Islands",
             description=f"Choose an island to charter a ship to",
             color=discord.Color.blue()
         )
-        
-        # # Add detailed info for each destination
-        # for dest in self.destinations:
-        #     name = dest.get("name", "Unknown Location")
-        #     description = dest.get("description", "No description available.")
-        #     dest_id = dest.get("id", "")
-        #     charter_price = dest.get("cost", 0)
-            
-        #     # Check if the team can afford this destination
-        #     affordable = self.team_coins >= charter_price
-        #     status = "✅ Available" if affordable else "❌ Not enough coins"
-            
-        #     embed.add_field(
-        #         name=f"{name}",
-        #         value=f"{description}\n**Status:** {status}\n**Cost:** {charter_price} coins",
-        #         inline=False
-        #     )
-        
-        # Create a selector view with all destinations
-        destination_view = RollDockSelectorView(
-            self.cog,
-            self.event_id,
-            self.team_id,
-            self.destinations,
-            self.team_coins,
-            self.initiator_id,
-            self.roll_message
-        )
-        
-        # Update the message with destination details
-        await self.roll_message.edit(embed=embed, view=destination_view)
-        
-        # Let the user know the destinations are displayed
-        #await interaction.followup.send("Viewing available islands! Check the updated message.", ephemeral=True)
-    
-    async def continue_journey(self, interaction: discord.Interaction):
-        """Continue the journey without chartering a ship"""
-        logger.info(f"User {interaction.user.id} chose to continue journey without viewing destinations")
-        await interaction.response.defer(ephemeral=True)
-        
-        # Call API to continue the journey
-        success, response_data = await self.cog.call_backend_api(
-            f"/events/{self.event_id}/teams/{self.team_id}/roll/continue",
-            method="POST"
-        )
-        
-        if not success:
-            logger.error(f"Failed to continue journey: {response_data}")
-            await interaction.followup.send(f"Failed to continue journey: {response_data}", ephemeral=True)
-            return
-        
-        logger.debug(f"Continue journey API response: {json.dumps(response_data)[:200]}...")
-        
-        # Process the next step of the roll
-        await self.cog.process_roll_progression(interaction, response_data)
-        
-        # Let the user know their selection was received
-        #await interaction.followup.send("Continuing journey without chartering a ship! Check the updated message.", ephemeral=True)
-
-class RollDockSelectorView(RollBaseView):
-    def __init__(self, cog, event_id: str, team_id: str, destinations: list, team_coins: int, initiator_id: str, roll_message: discord.Message):
-        super().__init__(cog, event_id, team_id, initiator_id, roll_message)
-        self.destinations = destinations
-        self.team_coins = team_coins
-        
-        logger.debug(f"Creating DockSelectorView with {len(destinations)} destinations, available coins: {team_coins}")
-        
-        # Add a Select menu for destinations
-        options = []
-        self.destination_map = {}  # To map select values to destination IDs
-        
-        for i, dest in enumerate(destinations):
-            dest_name = dest.get("name", "Unknown Location")
-            dest_id = dest.get("id", "")
-            dest_desc = dest.get("description", "")
-            charter_price = dest.get("cost", 0)
-            affordable = team_coins >= charter_price
-            
-            # Truncate description if too long for the select option
-            short_desc = dest_desc[:50] + ("..." if len(dest_desc) > 50 else "")
-            
-            # Store the mapping of select value to destination ID
-            select_value = f"dest_{i}"
-            self.destination_map[select_value] = {
-                "id": dest_id,
-                "name": dest_name,
-                "description": dest_desc,
-                "cost": charter_price,
-                "affordable": affordable
-            }
-            
-            # Create the option
-            options.append(
-                discord.SelectOption(
-                    label=dest_name,
-                    description=f"{charter_price} coins",
-                    value=select_value,
-                    default=False,
-                    emoji="✅" if affordable else "❌"
-                )
-            )
-        
-        if options:
-            # Create the select menu for destinations
-            self.destination_select = discord.ui.Select(
-                placeholder="Select an island to travel to...",
-                min_values=1,
-                max_values=1,
-                options=options,
-                custom_id="destination_select"
-            )
-            self.destination_select.callback = self.on_destination_select
-            self.add_item(self.destination_select)
-            
-            # Add confirm and cancel buttons
-            self.confirm_button = discord.ui.Button(
-                label="Charter Ship",
-                style=discord.ButtonStyle.success,
-                custom_id="confirm_charter",
-                disabled=True  # Disabled until a selection is made
-            )
-            self.confirm_button.callback = self.on_confirm
-            self.add_item(self.confirm_button)
-        
-        # Add a cancel button to go back
-        self.cancel_button = discord.ui.Button(
-            label="Cancel",
-            style=discord.ButtonStyle.secondary,
-            custom_id="cancel_charter"
-        )
-        self.cancel_button.callback = self.on_cancel
-        self.add_item(self.cancel_button)
-        
-        # Track the selected destination
-        self.selected_destination = None
-    
-    async def on_destination_select(self, interaction: discord.Interaction):
+
+        view = RollDockSelectorView(page["data"]["destinations"], page["data"]["coins"])
+        await discord_writes.edit_message(interaction.message, embed=embed, view=view)
+
+    async def select_destination(self, interaction, page, argument):
         """Handle destination selection"""
         logger.info(f"User {interaction.user.id} selected a destination from the dropdown")
         await interaction.response.defer(ephemeral=True)
-        
-        # Get the selected value
-        selected_value = self.destination_select.values[0]
-        dest_info = self.destination_map.get(selected_value, {})
-        
-        if not dest_info:
-            logger.error(f"Invalid destination selection: {selected_value}")
+        destinations = page["data"]["destinations"]
+        team_coins = page["data"]["coins"]
+
+        selected = int(interaction.data["values"][0])
+        if not 0 <= selected < len(destinations):
+            logger.error(f"Invalid destination selection: {selected}")
             await interaction.followup.send("Invalid destination selected.", ephemeral=True)
             return
-        
-        dest_name = dest_info.get("name", "Unknown")
-        dest_id = dest_info.get("id", "")
-        dest_price = dest_info.get("cost", 0)
-        affordable = dest_info.get("affordable", False)
-        
-        logger.debug(f"Selected destination: {dest_name} (ID: {dest_id}, Affordable: {affordable})")
-        
-        if not affordable:
+
+        dest = destinations[selected]
+        dest_name = dest.get("name", "Unknown")
+        dest_price = dest.get("cost", 0)
+
+        logger.debug(f"Selected destination: {dest_name} (ID: {dest.get('id', '')}, Affordable: {team_coins >= dest_price})")
+
+        if team_coins < dest_price:
             logger.warning(f"User selected unaffordable destination: {dest_name}")
             await interaction.followup.send(f"You don't have enough coins to charter a ship to {dest_name}. You need {dest_price} coins.", ephemeral=True)
-            
             # Reset the selection
-            self.destination_select.placeholder = "Select an island to travel to..."
-            self.confirm_button.disabled = True
-            await self.roll_message.edit(view=self)
+            await discord_writes.edit_message(interaction.message, view=RollDockSelectorView(destinations, team_coins))
             return
-        
-        # Store the selected destination
-        self.selected_destination = dest_info
-        
-        # Enable the confirm button
-        self.confirm_button.disabled = False
-        self.destination_select.placeholder = f"Selected: {dest_name}"
-        
-        # Update the message
-        await self.roll_message.edit(view=self)
-        
-        # Let the user know their selection was recorded
-        #await interaction.followup.send(f"You selected {dest_name}. Click 'Charter Ship' to confirm your travel.", ephemeral=True)
-    
-    async def on_confirm(self, interaction: discord.Interaction):
+
+        # Re-render with the selection in the confirm button's custom_id
+        await discord_writes.edit_message(interaction.message, view=RollDockSelectorView(destinations, team_coins, selected))
+
+    async def confirm_charter(self, interaction, page, argument):
         """Handle confirmation of travel to selected destination"""
         logger.info(f"User {interaction.user.id} confirmed charter to destination")
         await interaction.response.defer(ephemeral=True)
-        
-        if not self.selected_destination:
+
+        if not argument:
             logger.error("User tried to confirm with no destination selected")
             await interaction.followup.send("You need to select a destination first.", ephemeral=True)
             return
-        
-        dest_id = self.selected_destination.get("id", "")
-        dest_name = self.selected_destination.get("name", "Unknown")
-        dest_cost = self.selected_destination.get("cost", 0)
-        
+
+        destinations = page["data"]["destinations"]
+        team_coins = page["data"]["coins"]
+        selected = int(argument)
+        if not 0 <= selected < len(destinations):
+            logger.error(f"Invalid destination selection: {selected}")
+            await interaction.followup.send("Invalid destination selected.", ephemeral=True)
+            return
+
+        dest = destinations[selected]
+        dest_id = dest.get("id", "")
+        dest_name = dest.get("name", "Unknown")
+        dest_cost = dest.get("cost", 0)
+
         logger.info(f"Chartering ship to {dest_name} (ID: {dest_id}) for {dest_cost} coins")
-        
-        # Call API to travel to the destination
+
         success, response_data = await self.cog.call_backend_api(
-            f"/events/{self.event_id}/teams/{self.team_id}/roll/dock",
+            self.roll_path(page, "dock"),
             payload={"action": "charter", "destinationId": dest_id, "cost": dest_cost},
             method="POST"
         )
-        
+
         if not success:
             logger.error(f"Failed to charter ship to {dest_id}: {response_data}")
             await interaction.followup.send(f"Failed to charter ship: {response_data}", ephemeral=True)
             return
-        
+
         logger.info(f"Successfully chartered ship to {dest_name} for {dest_cost} coins")
-        
+
         # Show travel confirmation in the existing message
         travel_cost = response_data.get("travelCost", dest_cost)
-        team_coins = response_data.get("teamCoins", self.team_coins - travel_cost)
+        remaining_coins = response_data.get("teamCoins", team_coins - travel_cost)
         new_tile_id = response_data.get("newTileId", "Unknown")
-        
-        # Update the embed
+
         travel_embed = discord.Embed(
             title="⚓ Ship Chartered!",
-            description=f"You traveled to **{dest_name}** for {travel_cost} coins. Your team now has {team_coins} coins remaining.",
+            description=f"You traveled to **{dest_name}** for {travel_cost} coins. Your team now has {remaining_coins} coins remaining.",
             color=discord.Color.blue()
         )
-        
         travel_embed.add_field(
             name="New Location",
             value=f"You are now on tile {new_tile_id} ({dest_name})",
             inline=False
         )
-        
+
         # Disable all components
-        for item in self.children:
-            item.disabled = True
-        
-        # Update the message
-        await self.roll_message.edit(embed=travel_embed, view=self)
-        
-        # Process next step or end roll
+        disabled_view = RollDockSelectorView(destinations, team_coins, selected, disabled=True)
+        await discord_writes.edit_message(interaction.message, embed=travel_embed, view=disabled_view)
+
+        # Process next step if there is one
         next_response = response_data.get("nextStep", {})
         if next_response:
             await self.cog.process_roll_progression(interaction, next_response)
-        else:
-            # If no next step, then we're done with the roll
-            if self.team_id in self.cog.active_rolls:
-                del self.cog.active_rolls[self.team_id]
-                logger.info(f"Cleaned up active roll for team {self.team_id} after traveling to {dest_name}")
-        
+
         # Process the next step of the roll
         await self.cog.process_roll_progression(interaction, response_data)
-        
-        # Let the user know their selection was registered
-        #await interaction.followup.send(f"Ship chartered to {dest_name}! Check the updated message.", ephemeral=True)
-    
-    async def on_cancel(self, interaction: discord.Interaction):
+
+    async def cancel_charter(self, interaction, page, argument):
         """Cancel selection and go back to initial dock view"""
         logger.info(f"User {interaction.user.id} canceled destination selection")
         await interaction.response.defer(ephemeral=True)
-        
-        # Go back to the initial dock view
+
         embed = discord.Embed(
             title="⚓ Ship Charter",
             description="Would you like to charter a ship to another island?",
             color=discord.Color.blue()
         )
-        
         embed.add_field(
             name="Your Team",
-            value=f"💰 **{self.team_coins} coins** available",
-            inline=False
-        )
-        
-        # Create a new initial view
-        initial_view = RollDockInitialView(
-            self.cog,
-            self.event_id,
-            self.team_id,
-            self.destinations,
-            self.team_coins,
-            self.initiator_id,
-            self.roll_message
-        )
-        
-        # Update the message
-        await self.roll_message.edit(embed=embed, view=initial_view)
-        
-        # Let the user know they've returned to the initial view
-        #await interaction.followup.send("Returning to ship charter options.", ephemeral=True)
-
-class RollShopInitialView(RollBaseView):
-    def __init__(self, cog, event_id: str, team_id: str, team_items: list, available_items: list, team_coins: int, initiator_id: str, roll_message: discord.Message, active_roll_context: dict = None):
-        super().__init__(cog, event_id, team_id, initiator_id, roll_message)
-        self.team_items = team_items
-        self.available_items = available_items
-        self.team_coins = team_coins
-        self.active_roll_context = active_roll_context or {}
-        
-        logger.debug(f"Creating ShopInitialView with {len(available_items)} items and {team_coins} coins")
-        
-        if len(team_items) >= 3:
-            view_shop_button = discord.ui.Button(
-                label="Cannot View Shop (Full Inventory)",
-                style=discord.ButtonStyle.red,
-                custom_id="view_shop",
-                disabled=True
-            )
-        else:
-            # Add "View Shop" button
-            view_shop_button = discord.ui.Button(
-                label=f"View Shop ({len(available_items)} items)",
-                style=discord.ButtonStyle.primary,
-                custom_id="view_shop",
-                disabled=len(available_items) == 0
-            )
-        view_shop_button.callback = self.show_shop
-        self.add_item(view_shop_button)
-        
-        # Add "Continue Journey" button
-        continue_button = discord.ui.Button(
-            label="Continue Journey",
-            style=discord.ButtonStyle.secondary,
-            custom_id="shop_continue"
-        )
-        continue_button.callback = self.continue_journey
-        self.add_item(continue_button)
-        
-    async def show_shop(self, interaction: discord.Interaction):
-        """Show the available items in the shop"""
-        logger.info(f"User {interaction.user.id} is viewing shop items for team {self.team_id}")
-        await interaction.response.defer(ephemeral=True)
-        
-        # Create a detailed embed showing all items
-        embed = discord.Embed(
-            title="🛒 Available Items",
-            description="Choose an item to buy",
-            color=discord.Color.purple()
-        )
-        
-        # Add detailed info for each item
-        for item in self.available_items:
-            name = item.get("name", "Unknown Item")
-            description = item.get("description", "No description available.")
-            price = item.get("price", 0)
-            item_id = item.get("id", "")
-            rarity = item.get("rarity", "common").capitalize()
-            image = item.get("image", "")
-            item_type = item.get("item_type", "Unknown")
-            
-            # Check if the team can afford this item
-            affordable = self.team_coins >= price
-            status = "✅ Available" if affordable else "❌ Not enough coins"
-            
-            embed.add_field(
-                name=f"{name}",
-                value=f"{description}\n**Price:** {price} coins\n**Status:** {status}",
-                inline=False
-            )
-        shop_view = RollShopView(
-          # Create a selector view with all items
-            self.cog,
-            self.event_id,
-            self.team_id,
-            self.team_items,
-            self.available_items,
-            self.team_coins,
-            self.initiator_id,
-            self.roll_message
-        )
-        
-        # Update the message with item details
-        await self.roll_message.edit(embed=embed, view=shop_view)
-        
-        # Let the user know the items are displayed
-        #await interaction.followup.send("Viewing available items! Check the updated message.", ephemeral=True)
-    
-    async def continue_journey(self, interaction: discord.Interaction):
-        """Continue the journey without buying anything"""
-        logger.info(f"User {interaction.user.id} chose to continue journey without viewing shop items")
-        await interaction.response.defer(ephemeral=True)
-        
-        # Call API to continue the journey
-        success, response_data = await self.cog.call_backend_api(
-            f"/events/{self.event_id}/teams/{self.team_id}/roll/continue",
-            method="POST"
-        )
-        
-        if not success:
-            logger.error(f"Failed to continue journey: {response_data}")
-            await interaction.followup.send(f"Failed to continue journey: {response_data}", ephemeral=True)
-            return
-        
-        logger.debug(f"Continue journey API response: {json.dumps(response_data)[:200]}...")
-        
-        # Process the next step of the roll
-        await self.cog.process_roll_progression(interaction, response_data)
-        
-        # Let the user know their selection was received
-        #await interaction.followup.send("Continuing journey without buying anything! Check the updated message.", ephemeral=True)
-
-class RollShopItemView(RollBaseView):
-    def __init__(self, cog, event_id: str, team_id: str, item: dict, team_coins: int, team_items: list, all_items: list, initiator_id: str, roll_message: discord.Message):
-        super().__init__(cog, event_id, team_id, initiator_id, roll_message)
-        self.item = item
-        self.team_coins = team_coins
-        self.all_items = all_items
-        self.team_items = team_items
-        
-        item_name = item.get("name", "Unknown Item")
-        item_price = item.get("price", 0)
-        self.item_id = item.get("id", "")
-        
-        logger.debug(f"Creating ShopItemView for {item_name} (ID: {self.item_id}, Price: {item_price})")
-        
-        # Check if the team can afford this item
-        affordable = team_coins >= item_price
-        
-        # Add Buy button (disabled if not affordable)
-        buy_button = discord.ui.Button(
-            label=f"Buy {item_name} ({item_price} coins)",
-            style=discord.ButtonStyle.success,
-            custom_id=f"buy_{self.item_id}",
-            disabled=not affordable
-        )
-        buy_button.callback = self.buy_item
-        self.add_item(buy_button)
-        
-        # Add back button to return to shop list
-        back_button = discord.ui.Button(
-            label="Back to Items",
-            style=discord.ButtonStyle.secondary,
-            custom_id="back_to_items"
-        )
-        back_button.callback = self.back_to_items
-        self.add_item(back_button)
-        
-        # Add continue journey button
-        continue_button = discord.ui.Button(
-            label="Continue Journey",
-            style=discord.ButtonStyle.danger,
-            custom_id="shop_continue"
-        )
-        continue_button.callback = self.continue_journey
-        self.add_item(continue_button)
-    
-    async def buy_item(self, interaction: discord.Interaction):
-        """Buy the selected item and continue the journey"""
-        item_name = self.item.get("name", "Unknown Item")
-        item_price = self.item.get("price", 0)
-        
-        logger.info(f"User {interaction.user.id} is buying item {item_name} (ID: {self.item_id}) for {item_price} coins")
-        await interaction.response.defer(ephemeral=True)
-        
-        # Call API to buy the item
-        success, response_data = await self.cog.call_backend_api(
-            f"/events/{self.event_id}/teams/{self.team_id}/roll/shop",
-            payload={"action": "buy", "itemId": self.item_id, "price": item_price},
-            method="POST"
-        )
-        
-        if not success:
-            logger.error(f"Failed to buy item {self.item_id}: {response_data}")
-            await interaction.followup.send(f"Failed to buy item: {response_data}", ephemeral=True)
-            return
-        
-        logger.info(f"Successfully purchased {item_name} for {item_price} coins")
-        
-        # Show purchase confirmation in the original message
-        team_coins = response_data.get("teamCoins", self.team_coins - item_price)
-        
-        # Update the embed to show the purchase
-        purchase_embed = discord.Embed(
-            title="🛒 Purchase Complete!",
-            description=f"You purchased **{item_name}** for {item_price} coins. Your team now has {team_coins} coins remaining.\n\nRoll is now continuing...",
-            color=discord.Color.green()
-        )
-        
-        # Show information about the purchased item
-        purchase_embed.add_field(
-            name="Item Acquired",
-            value=self.item.get("description", "No description available."),
+            value=f"💰 **{page['data']['coins']} coins** available",
             inline=False
         )
-        
-        # Disable all buttons after purchase
-        for item in self.children:
-            item.disabled = True
-        
-        # Update the message
-        await self.roll_message.edit(embed=purchase_embed, view=self)
 
-        logger.info(f"Waiting 3 seconds before continuing roll progression after purchase of {item_name}")
-        await asyncio.sleep(3)
-        
-        # Process next step of roll as shops only allow one purchase
-        next_response = response_data.get("nextStep", {})
-        if next_response:
-            logger.debug(f"Processing next roll step after purchase: {next_response}")
-            await self.cog.process_roll_progression(interaction, next_response)
-        else:
-            # If there's no next step provided, clean up the active roll
-            if self.team_id in self.cog.active_rolls:
-                del self.cog.active_rolls[self.team_id]
-                logger.info(f"Cleaned up active roll for team {self.team_id} after item purchase")
-        
-        # Process the next step of the roll
-        await self.cog.process_roll_progression(interaction, response_data)
-        # Let the user know their purchase was successful
-        #await interaction.followup.send(f"You purchased {item_name}! Check the updated message.", ephemeral=True)
-    
-    async def back_to_items(self, interaction: discord.Interaction):
-        """Go back to the shop items list"""
-        logger.info(f"User {interaction.user.id} is returning to shop item list")
-        await interaction.response.defer(ephemeral=True)
-        
-        # Create a detailed embed showing all items
-        embed = discord.Embed(
-            title="🛒 Available Items",
-            description="Choose an item to buy",
-            color=discord.Color.purple()
-        )
-        
-        shop_view = RollShopView(
-        # Create a shop view with all items
-            self.cog,
-            self.event_id,
-            self.team_id,
-            self.team_items,
-            self.all_items,
-            self.team_coins,
-            self.initiator_id,
-            self.roll_message
-        )
-        
-        # Update the message with item list
-        await self.roll_message.edit(embed=embed, view=shop_view)
-        
-        # Let the user know they've returned to the item list
-        #await interaction.followup.send("Returning to item list.", ephemeral=True)
-    
-    async def continue_journey(self, interaction: discord.Interaction):
-        """Continue the journey without buying anything"""
-        logger.info(f"User {interaction.user.id} chose to continue journey from item detail view")
-        await interaction.response.defer(ephemeral=True)
-        
-        # Call API to continue the journey
-        success, response_data = await self.cog.call_backend_api(
-            f"/events/{self.event_id}/teams/{self.team_id}/roll/continue",
-            method="POST"
-        )
-        
-        if not success:
-            logger.error(f"Failed to continue journey: {response_data}")
-            await interaction.followup.send(f"Failed to continue journey: {response_data}", ephemeral=True)
-            return
-        
-        logger.debug(f"Continue journey API response: {json.dumps(response_data)[:200]}...")
-        
-        # Process the next step of the roll
-        await self.cog.process_roll_progression(interaction, response_data)
-        
-        # Let the user know their selection was received
-        #await interaction.followup.send("Continuing journey without buying anything! Check the updated message.", ephemeral=True)
-
-class FirstRollIslandSelectView(RollBaseView): # Inherit from RollBaseView
-    def __init__(self, cog, event_id: str, team_id: str, 
-                 available_islands: list, first_roll_total: int, 
-                 initiator_id: str, 
-                 roll_message: discord.Message): 
-        super().__init__(cog, event_id, team_id, initiator_id, roll_message)
-        
-        self.first_roll_total = first_roll_total
+        await discord_writes.edit_message(interaction.message, embed=embed, view=RollDockInitialView(page["data"]["destinations"]))
 
-        if not available_islands:
-            logger.warning(f"FirstRollIslandSelectView initialized for team {team_id} with no available islands.")
-            # Optionally add a disabled item or label to the view
-            # self.add_item(discord.ui.Button(label="No islands available", disabled=True))
-            return
+    async def select_island(self, interaction, page, argument):
+        chosen_island_id = interaction.data["values"][0]
+        await interaction.response.defer(ephemeral=True)
+        first_roll_total = page["data"]["first_roll_total"]
 
-        select_options = []
-        for island in available_islands:
-            select_options.append(discord.SelectOption(
-                label=island.get("name", "Unknown Island")[:100], 
-                value=str(island.get("id")), 
-                description=(island.get("description", "") or "Select this island.")[:100] 
-            ))
-        
-        if len(select_options) > 25:
-            logging.warning(f"Too many islands ({len(select_options)}) for select menu for team {team_id}. Truncating to 25.")
-            select_options = select_options[:25]
-        
-        if not select_options: 
-             logging.error(f"No valid island options to display for team {team_id} after processing.")
-             return
+        logger.info(f"Team {page['team_id']} (Initiator: {page['initiator_id']}) selected island {chosen_island_id}. First roll total was {first_roll_total}.")
 
-        island_select = discord.ui.Select(
-            placeholder="Choose your starting island...",
-            options=select_options,
-            custom_id=f"sp3_island_select:{team_id}" 
+        success, response_data = await self.cog.call_backend_api(
+            self.roll_path(page, "first_island"),
+            method="POST",
+            payload={
+                "chosen_island_id": chosen_island_id,
+                "first_roll_total": first_roll_total
+            }
         )
-        island_select.callback = self.island_select_callback
-        self.add_item(island_select)
-        logger.debug(f"FirstRollIslandSelectView populated with {len(select_options)} islands for team {team_id}.")
-
-    async def island_select_callback(self, interaction: discord.Interaction):
-        chosen_island_id = interaction.data["values"][0]
-        # --- CORRECTED DEFER CALL ---
-        await interaction.response.defer(ephemeral=True) 
-        # --- END CORRECTION ---
 
-        logger.info(f"Team {self.team_id} (Initiator: {self.initiator_id}) selected island {chosen_island_id}. First roll total was {self.first_roll_total}.")
-
-        try:
-            action_type_island_selection = "island_selection" # Use string directly
-            # Fallback logic if ACTION_TYPES is defined in cog or globally (less likely for this view)
-            # if hasattr(self.cog, 'ACTION_TYPES') and "ISLAND_SELECTION" in self.cog.ACTION_TYPES:
-            #      action_type_island_selection = self.cog.ACTION_TYPES["ISLAND_SELECTION"]
-            # elif 'ACTION_TYPES' in globals() and "ISLAND_SELECTION" in globals()['ACTION_TYPES']:
-            #      action_type_island_selection = globals()['ACTION_TYPES']["ISLAND_SELECTION"]
-
-
-            success, response_data = await self.cog.call_backend_api( 
-                f"/events/{self.event_id}/teams/{self.team_id}/roll/first_island", 
-                method="POST",
-                payload={ 
-                    "chosen_island_id": chosen_island_id,
-                    "first_roll_total": self.first_roll_total 
-                }
+        if success and response_data:
+            await self.cog.process_roll_progression(
+                interaction=interaction,
+                response_data=response_data,
+                existing_message=interaction.message
             )
-
-            if success and response_data:
-                await self.cog.process_roll_progression(
-                    interaction=interaction, 
-                    response_data=response_data,
-                    existing_message=self.roll_message 
-                )
-                await interaction.followup.send(f"You selected island {chosen_island_id}. The game is updating...", ephemeral=True)
-            else:
-                error_message = response_data.get("error", "Failed to process island selection.") if isinstance(response_data, dict) else "Unknown error from API."
-                logger.error(f"API call for island selection failed for team {self.team_id}: {error_message}")
-                await interaction.followup.send(f"Error processing island selection: {error_message}", ephemeral=True)
-        except Exception as e:
-            logger.error(f"Exception during island selection callback for team {self.team_id}: {e}", exc_info=True)
-            await interaction.followup.send(f"An unexpected error occurred: {str(e)[:1000]}", ephemeral=True)
+            await interaction.followup.send(f"You selected island {chosen_island_id}. The game is updating...", ephemeral=True)
+        else:
+            error_message = response_data.get("error", "Failed to process island selection.") if isinstance(response_data, dict) else "Unknown error from API."
+            logger.error(f"API call for island selection failed for team {page['team_id']}: {error_message}")
+            await interaction.followup.send(f"Error processing island selection: {error_message}", ephemeral=True)
 
 class ItemResponseSelectorView(discord.ui.View):
     def __init__(self, cog, event_id, team_id, options, original_message):
@@ -1904,24 +1415,27 @@ class ItemResponseSelectorView(discord.ui.View):
                 color=discord.Color.green()
             )
 
-            await self.original_message.edit(embed=success_embed, view=None)
+            await discord_writes.edit_message(self.original_message, embed=success_embed, view=None)
         else:
             logger.error(f"Failed to process item response selection: {response_data}")
             await interaction.followup.send(f"Error processing selection: {response_data}", ephemeral=True)
 
 class ItemBaseView(discord.ui.View):
     def __init__(self, cog, interaction: discord.Interaction, event_id: str, team_id: str, original_message: discord.Message = None):
-        super().__init__()  # 3 minutes timeout
+        super().__init__(timeout=item_views.ttl)
         self.cog = cog
         self.original_interaction = interaction
         self.event_id = event_id
         self.team_id = team_id
         self.original_message = original_message
+        # One open inventory view per user; this stops whichever one it replaces
+        item_views.start(interaction.user.id, self)
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         if interaction.user.id != self.original_interaction.user.id:
             await interaction.response.send_message("You cannot interact with this inventory display.", ephemeral=True)
             return False
+        item_views.get(interaction.user.id)  # Activity keeps the view from expiring
         return True
 
     async def on_timeout(self):
@@ -1932,7 +1446,7 @@ class ItemBaseView(discord.ui.View):
                     description="This inventory view has timed out.",
                     color=discord.Color.orange()
                 )
-                await self.original_message.edit(embed=timeout_embed, view=None)
+                await discord_writes.edit_message(self.original_message, embed=timeout_embed, view=None)
             except discord.NotFound:
                 logger.warning(f"Original message {self.original_message.id} not found on timeout for inventory view.")
             except Exception as e:
@@ -1940,6 +1454,8 @@ class ItemBaseView(discord.ui.View):
         for item in self.children:
             item.disabled = True
         self.stop()
+        if item_views.get(self.original_interaction.user.id) is self:
+            item_views.end(self.original_interaction.user.id, "expired")
 
     async def handle_cancel(self, interaction: discord.Interaction):
         # Defer should be done by the calling method with appropriate ephemeral status
@@ -1955,6 +1471,8 @@ class ItemBaseView(discord.ui.View):
         except Exception as e:
             logger.error(f"Error deleting inventory message for user {interaction.user.id}: {e}")
         self.stop()
+        if item_views.get(interaction.user.id) is self:
+            item_views.end(interaction.user.id, "finished")
 
 class ItemDetailView(ItemBaseView):
     def __init__(self, cog, interaction: discord.Interaction, event_id: str, team_id: str, item_data: dict, all_items: list, original_message: discord.Message, item_index: int = None):
@@ -1991,7 +1509,7 @@ class ItemDetailView(ItemBaseView):
         item_name = self.item_data.get("name", "Unknown Item")
 
         if not item_id:
-            await self.original_message.edit(content="Error: Item ID is missing. Cannot use this item.", embed=None, view=None)
+            await discord_writes.edit_message(self.original_message, content="Error: Item ID is missing. Cannot use this item.", embed=None, view=None)
             logger.error(f"User {interaction.user.id} tried to use item without ID: {self.item_data}")
             return
 
@@ -2003,7 +1521,7 @@ class ItemDetailView(ItemBaseView):
         else:
             logger.warning(f"No item index found for item {item_name} ({item_id}), backend may reject this request")
 
-        print(json.dumps(payload, indent=2))  # Debugging line to check payload
+        logger.debug("Use item payload: %s", LazyJson(payload))
 
         success, response_data = await self.cog.call_backend_api(
             f"/events/{self.event_id}/teams/{self.team_id}/items/use",
@@ -2011,7 +1529,7 @@ class ItemDetailView(ItemBaseView):
             payload=payload
         )
 
-        print(response_data)
+        log_payload(logger, "Use item response:", response_data)
 
         result_embed = discord.Embed(title=f"Using {item_name}")
         result_view = None
@@ -2027,21 +1545,21 @@ class ItemDetailView(ItemBaseView):
                 result_embed.color = discord.Color.green()
                 logger.info(f"User {interaction.user.id} used item {item_id} for team {self.team_id}. Response: {message}")
 
-            await self.original_message.edit(embed=result_embed, view=result_view)
+            await discord_writes.edit_message(self.original_message, embed=result_embed, view=result_view)
         else:
             error_message = response_data if isinstance(response_data, str) else response_data.get("detail", "Failed to use item.")
             msg = error_message.get("message", "Unknown error occurred.")
             result_embed.description = f"❌ {msg}"
             result_embed.color = discord.Color.red()
             logger.error(f"User {interaction.user.id} failed to use item {item_id} for team {self.team_id}. Error: {error_message}")
-            await self.original_message.edit(embed=result_embed, view=self) # Re-show current view with error
+            await discord_writes.edit_message(self.original_message, embed=result_embed, view=self) # Re-show current view with error
 
     async def back_to_inventory_callback(self, interaction: discord.Interaction):
         await interaction.response.defer()
         inventory_embed, inventory_view = self.cog._build_inventory_display(
             self.original_interaction, self.event_id, self.team_id, self.all_items, self.original_message
         )
-        await self.original_message.edit(embed=inventory_embed, view=inventory_view)
+        await discord_writes.edit_message(self.original_message, embed=inventory_embed, view=inventory_view)
 
     async def cancel_button_callback(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
@@ -2104,7 +1622,7 @@ class InventoryView(ItemBaseView):
             
             # Edit the original message with the new view
             try:
-                await self.original_message.edit(embed=detailed_embed, view=detailed_view)
+                await discord_writes.edit_message(self.original_message, embed=detailed_embed, view=detailed_view)
             except Exception as e:
                 logger.error(f"Error editing message in item detail view: {str(e)}")
                 await interaction.followup.send(f"Error displaying item details: {str(e)}", ephemeral=True)
@@ -0,0 +1,51 @@
+from discord.ext import commands
+import asyncio
+
+from core.gateway_profile import gateway_profile, rss_bytes, DEFERRED_CHUNK_DELAY
+from core.metrics import metrics
+
+class GatewayStartup(commands.Cog):
+    """Loads the member list the way the gateway profile asks for and records the
+    startup report on /metrics."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.chunk_task = None
+        metrics.collector(self.collect)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # on_ready fires again after reconnects; the report is about the first one
+        if "ready" not in gateway_profile.report:
+            gateway_profile.record("ready", self.bot)
+            if gateway_profile.chunking != "deferred":
+                # Already chunked before on_ready, or never will be
+                gateway_profile.record("members_loaded", self.bot)
+                gateway_profile.members_loaded.set()
+
+        if gateway_profile.chunking == "deferred" and (self.chunk_task is None or self.chunk_task.done()):
+            self.chunk_task = asyncio.create_task(self.chunk_guilds())
+
+    async def chunk_guilds(self):
+        await asyncio.sleep(DEFERRED_CHUNK_DELAY)
+        for guild in self.bot.guilds:
+            if guild.chunked:
+                continue
+            try:
+                await guild.chunk()
+            except Exception as e:
+                print(f"Failed to load members for {guild.name}: {e}")
+        if not gateway_profile.members_loaded.is_set():
+            gateway_profile.record("members_loaded", self.bot)
+            gateway_profile.members_loaded.set()
+
+    def collect(self):
+        report = gateway_profile.report
+        profile = {"profile": gateway_profile.name}
+        return [
+            ("startup_seconds", "gauge", [({**profile, "stage": stage}, entry["seconds"]) for stage, entry in report.items()]),
+            ("startup_rss_bytes", "gauge", [({**profile, "stage": stage}, entry["rss_bytes"]) for stage, entry in report.items()]),
+            ("process_resident_memory_bytes", "gauge", [({}, rss_bytes())]),
+            ("discord_cached_members", "gauge", [({}, sum(len(guild.members) for guild in self.bot.guilds))]),
+            ("discord_cached_messages", "gauge", [({}, len(self.bot.cached_messages))]),
+        ]
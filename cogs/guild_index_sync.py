@@ -0,0 +1,50 @@
+from discord.ext import commands
+import discord
+
+from core.guild_index import guild_index
+
+class GuildIndexSync(commands.Cog):
+    """Keeps core.guild_index in step with the guild's roles and categories."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        for guild in self.bot.guilds:
+            guild_index.build(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        guild_index.build(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        guild_index.forget(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role):
+        guild_index.add_role(role)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before, after):
+        guild_index.update_role(before, after)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        guild_index.remove_role(role)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        if isinstance(channel, discord.CategoryChannel):
+            guild_index.add_category(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        if isinstance(after, discord.CategoryChannel):
+            guild_index.update_category(before, after)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        if isinstance(channel, discord.CategoryChannel):
+            guild_index.remove_category(channel)
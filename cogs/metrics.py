@@ -0,0 +1,94 @@
+from discord.ext import commands
+import asyncio
+import time
+
+from core.metrics import metrics, monitor_loop_lag
+from core.cache import caches
+from core.backend import backend
+from core.whitelist import drop_whitelist
+from core.guild_index import guild_index
+from core.discord_writes import discord_writes
+from core.jobs import queues
+from core.ui_state import registries
+from core.roll_pages import roll_pages
+
+class Metrics(commands.Cog):
+    """Records slash command latency and event loop lag, and registers the collectors
+    that put cache, backend, write scheduler, job and UI state stats on /metrics."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.in_flight = {}  # interaction id -> (command name, start time)
+        self.lag_task = None
+        metrics.collector(self.collect)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # on_ready fires again after reconnects; only one monitor should run
+        if self.lag_task is None or self.lag_task.done():
+            self.lag_task = asyncio.create_task(monitor_loop_lag())
+
+    @commands.Cog.listener()
+    async def on_application_command(self, ctx):
+        self.in_flight[ctx.interaction.id] = (ctx.command.qualified_name, time.perf_counter())
+
+    @commands.Cog.listener()
+    async def on_application_command_completion(self, ctx):
+        self.finish(ctx, "ok")
+
+    # Errors are reported by Stabilibot.on_application_command_error rather than a
+    # listener here: py-cord skips its default traceback output once any
+    # on_application_command_error listener is registered
+    def finish(self, ctx, outcome):
+        started = self.in_flight.pop(ctx.interaction.id, None)
+        if started:
+            command, start_time = started
+            metrics.observe("slash_command_seconds", time.perf_counter() - start_time, command=command)
+            metrics.inc("slash_commands_total", command=command, outcome=outcome)
+
+    def collect(self):
+        cache_stats = {name: cache.stats() for name, cache in caches.items()}
+        cache_stats["drop_whitelist"] = {
+            "entries": len(drop_whitelist.triggers or []),
+            "hits": drop_whitelist.hits,
+            "misses": drop_whitelist.misses,
+        }
+        index_stats = guild_index.stats()
+        cache_stats["guild_index"] = {**index_stats, "entries": index_stats["guilds"]}
+
+        backend_stats = backend.stats()
+        breaker = backend.breaker_stats()
+        writes = discord_writes.stats()
+        ui_state = {name: registry.stats() for name, registry in registries.items()}
+        pages = roll_pages.stats()
+
+        return [
+            ("interactions_in_flight", "gauge", [({}, len(self.in_flight))]),
+            ("cache_entries", "gauge", [({"cache": name}, stats["entries"]) for name, stats in cache_stats.items()]),
+            ("cache_hits_total", "counter", [({"cache": name}, stats["hits"]) for name, stats in cache_stats.items()]),
+            ("cache_misses_total", "counter", [({"cache": name}, stats["misses"]) for name, stats in cache_stats.items()]),
+            ("cache_hit_ratio", "gauge", [
+                ({"cache": name}, stats["hits"] / (stats["hits"] + stats["misses"]) if stats["hits"] + stats["misses"] else 0.0)
+                for name, stats in cache_stats.items()
+            ]),
+            ("backend_calls_total", "counter", [({"endpoint": template}, counters["calls"]) for template, counters in backend_stats.items()]),
+            ("backend_deduplicated_total", "counter", [({"endpoint": template}, counters["deduplicated"]) for template, counters in backend_stats.items()]),
+            ("backend_retries_total", "counter", [({"endpoint": template}, counters["retries"]) for template, counters in backend_stats.items()]),
+            ("backend_breaker_open", "gauge", [({}, 1 if breaker["state"] == "open" else 0)]),
+            ("backend_breaker_half_open", "gauge", [({}, 1 if breaker["state"] == "half_open" else 0)]),
+            ("backend_breaker_opened_total", "counter", [({}, breaker["times_opened"])]),
+            ("backend_breaker_rejected_total", "counter", [({}, breaker["rejected"])]),
+            ("discord_write_queue_depth", "gauge", [({"lane": lane}, stats["queued"]) for lane, stats in writes["lanes"].items()]),
+            ("discord_write_wait_avg_seconds", "gauge", [({"lane": lane}, stats["wait_avg_ms"] / 1000) for lane, stats in writes["lanes"].items()]),
+            ("discord_write_wait_max_seconds", "gauge", [({"lane": lane}, stats["wait_max_ms"] / 1000) for lane, stats in writes["lanes"].items()]),
+            ("discord_write_throttled_total", "counter", [({"route": route}, stats["throttled"]) for route, stats in writes["routes"].items()]),
+            ("jobs_waiting", "gauge", [({"queue": name}, queue.stats()["waiting"]) for name, queue in queues.items()]),
+            ("ui_state_entries", "gauge", [({"registry": name}, stats["entries"]) for name, stats in ui_state.items()]),
+            ("ui_state_approx_bytes", "gauge", [({"registry": name}, stats["approx_bytes"]) for name, stats in ui_state.items()]),
+            ("roll_pages_open", "gauge", [({}, pages["entries"])]),
+            ("roll_pages_missing_total", "counter", [({}, pages["missing"])]),
+            ("ui_state_ended_total", "counter", [
+                ({"registry": name, "reason": reason}, count)
+                for name, stats in ui_state.items() for reason, count in stats["ended"].items()
+            ]),
+        ]
@@ -3,12 +3,12 @@ import discord
 from dotenv import load_dotenv
 load_dotenv()
 import os
-import requests
+
+from core.backend import backend
 
 class RegisterAlt(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.backend_url = os.getenv("BACKEND_URL")
 
     @discord.slash_command(name="register_account", description="Register an alternate account", guild_ids=[int(os.getenv("GUILD_ID"))])
     async def register_alt(self, interaction, alt_name: str):
@@ -18,15 +18,16 @@ class RegisterAlt(commands.Cog):
         
         # Make API call to register alternate account
         discord_id = str(interaction.user.id)
-        response = requests.post(
-            f"{self.backend_url}/users/{discord_id}/add_alt",
-            json={"rsn": alt_name}
+        success, response_data = await backend.call(
+            f"/users/{discord_id}/add_alt",
+            {"rsn": alt_name},
+            method="POST"
         )
         
-        if response.status_code in [200, 201]:
+        if success:
             await interaction.followup.send(f"Successfully registered '{alt_name}' as an alternate account.", ephemeral=True)
         else:
-            await interaction.followup.send(f"Failed to register alternate account: {response.text}", ephemeral=True)
+            await interaction.followup.send(f"Failed to register alternate account: {response_data}", ephemeral=True)
     
     @discord.slash_command(name="remove_account", description="Remove an alternate account", guild_ids=[int(os.getenv("GUILD_ID"))])
     async def remove_alt(self, interaction, alt_name: str):
@@ -36,15 +37,16 @@ class RegisterAlt(commands.Cog):
         
         # Make API call to remove alternate account
         discord_id = str(interaction.user.id)
-        response = requests.delete(
-            f"{self.backend_url}/users/{discord_id}/remove_alt",
-            json={"rsn": alt_name}
+        success, response_data = await backend.call(
+            f"/users/{discord_id}/remove_alt",
+            {"rsn": alt_name},
+            method="DELETE"
         )
         
-        if response.status_code in [200, 201]:
+        if success:
             await interaction.followup.send(f"Successfully removed '{alt_name}' from your alternate accounts.", ephemeral=True)
         else:
-            await interaction.followup.send(f"Failed to remove alternate account: {response.text}", ephemeral=True)
+            await interaction.followup.send(f"Failed to remove alternate account: {response_data}", ephemeral=True)
 
     @discord.slash_command(name="list_accounts", description="List your registered accounts", guild_ids=[int(os.getenv("GUILD_ID"))])
     async def list_accounts(self, interaction):
@@ -54,19 +56,20 @@ class RegisterAlt(commands.Cog):
         
         # Make API call to list registered accounts
         discord_id = str(interaction.user.id)
-        response = requests.get(
-            f"{self.backend_url}/users/{discord_id}/accounts"
+        success, response_data = await backend.call(
+            f"/users/{discord_id}/accounts",
+            method="GET"
         )
         
-        if response.status_code == 200:
-            alts = response.json()
+        if success:
+            alts = response_data
             if alts:
                 alt_list = "\n".join(alts)
                 await interaction.followup.send(f"Your registered accounts:\n{alt_list}", ephemeral=True)
             else:
                 await interaction.followup.send("You have no registered accounts.", ephemeral=True)
         else:
-            await interaction.followup.send(f"Failed to retrieve accounts: {response.text}", ephemeral=True)
+            await interaction.followup.send(f"Failed to retrieve accounts: {response_data}", ephemeral=True)
                            
 def setup(bot):
     bot.add_cog(RegisterAlt(bot))
@@ -1,20 +1,17 @@
 from discord.ext import commands
 import discord
-import requests
 import os
 
+from core.backend import backend
+from core.discord_writes import discord_writes, INTERACTIVE
+from core.hiscores import hiscores
+
 class Rename(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
     async def is_valid_osrs_name(self, name):
-        hiscores_url = f"https://secure.runescape.com/m=hiscore_oldschool/index_lite.ws?player={name}"
-        try:
-            response = requests.get(hiscores_url)
-            return response.status_code == 200
-        except requests.RequestException as e:
-            print(f"Error checking OSRS Hiscores: {e}")
-            return False
+        return await hiscores.exists(name)
 
     @discord.slash_command(name="namechange", description="Update your OSRS username", guild_ids=[int(os.getenv("GUILD_ID"))])
     async def namechange(self, interaction, new_name: str):
@@ -35,19 +32,21 @@ class Rename(commands.Cog):
 
         # Update the name in the backend
         try:
-            url = f"{os.getenv('BACKEND_URL')}/users/{interaction.user.id}/rename"
             payload = {"runescape_name": new_name}
-            headers = {"Content-Type": "application/json"}
-            response = requests.put(url, json=payload, headers=headers)
+            success, response_data = await backend.call(
+                f"/users/{interaction.user.id}/rename",
+                payload,
+                method="PUT"
+            )
 
-            if response.status_code == 200:
+            if success:
                 await interaction.user.send(f"Username updated to {new_name}")
                 # Set the user's name in discord
                 guild = interaction.guild
                 member = guild.get_member(interaction.user.id)
                 if member:
                     current_nick = member.nick or member.name
-                    previous_names = response.json().get("previous_names", [])
+                    previous_names = response_data.get("previous_names", [])
 
                     # Check if any previous name is in the current nickname
                     matched_previous_name = next((name for name in previous_names if name.lower() in current_nick.lower()), None)
@@ -64,7 +63,7 @@ class Rename(commands.Cog):
 
                     try:
                         old_nick = member.nick if member.nick else member.name
-                        await member.edit(nick=new_nick)
+                        await discord_writes.edit_member(member, priority=INTERACTIVE, nick=new_nick)
                         print(f"Updated nickname for {old_nick} to {new_nick}")
                         await interaction.user.send(f"Nickname updated to {new_nick}")
                         return
@@ -75,8 +74,8 @@ class Rename(commands.Cog):
                 else:
                     print(f"Member not found in guild: {interaction.user.id}")
             else:
-                await interaction.user.send(f"Error updating username: {response.status_code} - {response.text}")
-                print(f"Error updating username: {response.status_code} - {response.text}")
+                await interaction.user.send(f"Error updating username: {response_data}")
+                print(f"Error updating username: {response_data}")
         except Exception as e:
             await interaction.user.send(f"Error updating username: {e}")
             print(f"Error updating username: {e}")
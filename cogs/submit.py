@@ -1,4 +1,4 @@
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import ui
 import discord
 
@@ -9,39 +9,22 @@ import json
 
 import aiohttp
 
+from core.backend import backend
+from core.whitelist import drop_whitelist
+from core.trigger_index import split_trigger
+
 # Discord StringSelect menus have a hard cap of 25 options, so the search
 # results shown at once are limited to this. Users narrow further via "Search again".
 MAX_SELECT_OPTIONS = 25
 
 
 async def fetch_drop_triggers():
-    """Fetch the current DROP-trigger whitelist from the backend.
+    """Fetch the current DROP-trigger whitelist, normally from the in-memory cache.
 
     Returns a list of "Item:Source" (or bare "Item") strings. Returns None when
     the whitelist can't be loaded (no active event -> 404, or the server is down).
     """
-    url = os.getenv("BACKEND_URL") + "/events/whitelist"
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers={"Accept": "application/json"}) as response:
-                if response.status != 200:
-                    print(f"Whitelist fetch failed: {response.status}")
-                    return None
-                # Backend returns json.dumps(...) from Flask, served as text/html,
-                # so bypass aiohttp's mimetype check (content_type=None).
-                data = await response.json(content_type=None)
-                return data.get("triggers", [])
-    except Exception as e:
-        print(f"Error fetching whitelist: {e}")
-        return None
-
-
-def split_trigger(trigger: str):
-    """"Tanzanite fang:Zulrah" -> ("Tanzanite fang", "Zulrah"); "Dom" -> ("Dom", "")."""
-    if ":" in trigger:
-        item_name, source = trigger.split(":", 1)
-        return item_name, source
-    return trigger, ""
+    return await drop_whitelist.get()
 
 
 async def submit_drop_payload(interaction, payload, public_summary=None):
@@ -50,20 +33,19 @@ async def submit_drop_payload(interaction, payload, public_summary=None):
     The success message is posted publicly (so the channel sees the drop landed);
     errors stay ephemeral to the person who submitted."""
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(os.getenv("DROP_SERVER_URL") + "/bot", json=payload) as response:
-                if response.status != 200:
-                    print(response.status)
-                    print(json.dumps(payload, indent=4))
-                    print(os.getenv("DROP_SERVER_URL") + "/bot")
-                    await interaction.followup.send("Error submitting file.", ephemeral=True)
-                    return
-                print(f"Submission successful: {response.status}")
-                print(await response.text())
-                data = await response.json()
-                content = f"{public_summary}\n{data['message']}" if public_summary else data["message"]
-                await interaction.followup.send(content, ephemeral=False)
+        async with backend.session.post(os.getenv("DROP_SERVER_URL") + "/bot", json=payload) as response:
+            if response.status != 200:
+                print(response.status)
+                print(json.dumps(payload, indent=4))
+                print(os.getenv("DROP_SERVER_URL") + "/bot")
+                await interaction.followup.send("Error submitting file.", ephemeral=True)
                 return
+            print(f"Submission successful: {response.status}")
+            print(await response.text())
+            data = await response.json()
+            content = f"{public_summary}\n{data['message']}" if public_summary else data["message"]
+            await interaction.followup.send(content, ephemeral=False)
+            return
     except aiohttp.ClientConnectorError as e:
         print(str(e))
         await interaction.followup.send(f"Error connecting to server: {str(e)}", ephemeral=True)
@@ -180,8 +162,8 @@ class DropSearchModal(ui.Modal):
             )
             return
 
-        matches = sorted((t for t in triggers if query.lower() in t.lower()), key=str.lower)
-        if not matches:
+        shown, total = drop_whitelist.index().search(query, limit=MAX_SELECT_OPTIONS)
+        if not shown:
             await interaction.followup.send(
                 f"No triggers matched \"{query}\". Try a different search term.",
                 view=SearchAgainView(self.bot, self.meta, quantity),
@@ -190,8 +172,6 @@ class DropSearchModal(ui.Modal):
             )
             return
 
-        total = len(matches)
-        shown = matches[:MAX_SELECT_OPTIONS]
         content = f"Select the drop you're submitting for **{self.meta['user']}**:"
         if total > MAX_SELECT_OPTIONS:
             content += (
@@ -217,6 +197,19 @@ class SearchAgainView(ui.View):
 class Submit(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Twice per TTL, so the copy is revalidated before searches would find it stale
+        self.refresh_whitelist.change_interval(seconds=drop_whitelist.ttl / 2)
+        self.refresh_whitelist.start()
+
+    # Keeps the whitelist warm (and preloads it at startup) so drop searches don't
+    # wait on the backend
+    @tasks.loop(seconds=300)
+    async def refresh_whitelist(self):
+        await drop_whitelist.refresh(revalidate=True)
+
+    @refresh_whitelist.before_loop
+    async def before_refresh_whitelist(self):
+        await self.bot.wait_until_ready()
 
     @discord.message_command(name = "Submit Drop", guild_ids = [int(os.getenv("GUILD_ID"))])
     async def submit(self, interaction: discord.Interaction, message: discord.Message):
@@ -266,17 +259,16 @@ class KCSubmissionModal(ui.Modal):
 
         # Send the json payload to the SUBMISSION_ENDPOINT
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(os.getenv("DROP_SERVER_URL") + "/bot", json = payload) as response:
-                    if response.status != 200:
-                        print(response.status)
-                        print(json.dumps(payload, indent = 4))
-                        print(os.getenv("DROP_SERVER_URL") + "/bot")
-                        await interaction.followup.send("Error submitting file.")
-                        return
-                    else:
-                        print(f"Submission successful: {response.status}")
-                        print(await response.text())
+            async with backend.session.post(os.getenv("DROP_SERVER_URL") + "/bot", json = payload) as response:
+                if response.status != 200:
+                    print(response.status)
+                    print(json.dumps(payload, indent = 4))
+                    print(os.getenv("DROP_SERVER_URL") + "/bot")
+                    await interaction.followup.send("Error submitting file.")
+                    return
+                else:
+                    print(f"Submission successful: {response.status}")
+                    print(await response.text())
 
                 # get response data
                 data = await response.json()
@@ -0,0 +1,272 @@
+from dotenv import load_dotenv
+load_dotenv()
+import os
+import json
+import asyncio
+import logging
+import time
+import re
+import random
+from collections import defaultdict
+
+import aiohttp
+
+from core.metrics import metrics
+from core.tracing import span, current_request_id, REQUEST_ID_HEADER
+
+logger = logging.getLogger("backend")
+
+CONNECTION_ERROR_MESSAGE = "Connection error: Failed to connect to the backend service. (Start aggressively screenshotting your progress for proof!)"
+
+# Connector tuning. One pool is shared by every cog, so the limits are for the whole bot.
+POOL_LIMIT = 100            # Total open connections across all hosts
+POOL_LIMIT_PER_HOST = 20    # Backend, drop server and hiscores each get their own share
+DNS_CACHE_TTL = 300         # Seconds a resolved hostname is reused
+KEEPALIVE_TIMEOUT = 60      # Seconds an idle connection is kept open for the next call
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=10)
+
+# Circuit breaker. After this many failures in a row (connection errors, timeouts, 5xx)
+# calls fail immediately for BREAKER_RESET_TIMEOUT seconds, then one probe is let through.
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BACKEND_BREAKER_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BACKEND_BREAKER_RESET_TIMEOUT", "30"))
+
+# GETs that hit a connection error (any aiohttp.ClientError) or a 502/503/504 are retried with full-jitter
+# exponential backoff: a random delay up to RETRY_BASE_DELAY * 2^attempt, capped.
+RETRY_ATTEMPTS = 2
+RETRY_BASE_DELAY = 0.25
+RETRY_MAX_DELAY = 2.0
+RETRYABLE_STATUSES = {502, 503, 504}
+
+_ID_SEGMENT = re.compile(r"\d+|[0-9a-fA-F-]{16,}")
+
+# "/events/12/teams/34/stats" -> "/events/{id}/teams/{id}/stats", so per-endpoint
+# metrics don't grow a row for every event, team and user
+def endpoint_template(endpoint: str) -> str:
+    path = endpoint.split("?", 1)[0]
+    return "/".join("{id}" if _ID_SEGMENT.fullmatch(segment) else segment for segment in path.split("/"))
+
+class CircuitBreaker:
+    """Stops sending requests to a backend that keeps failing.
+
+    closed: requests flow and consecutive failures are counted. open: requests are
+    refused without touching the network until `reset_timeout` passes. half_open: a
+    single probe request is let through; success closes the breaker, failure opens it
+    again."""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_started = None
+
+    def allow(self) -> bool:
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            logger.info("Backend circuit half-open, probing")
+        if self.state == "closed":
+            return True
+        # One probe at a time; a probe whose caller was cancelled mid-request never
+        # reports back, so it is given up on after a request timeout
+        if self.state == "half_open" and (self._probe_started is None or time.monotonic() - self._probe_started > REQUEST_TIMEOUT.total):
+            self._probe_started = time.monotonic()
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        if self.state != "closed":
+            logger.info("Backend circuit closed")
+        self.state = "closed"
+        self.failures = 0
+        self._probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_started = None
+        if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+            logger.error(f"Backend circuit open after {self.failures} consecutive failures; failing fast for {self.reset_timeout:.0f}s")
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+class BackendClient:
+    """Bot-wide HTTP client.
+
+    Owns a single long-lived aiohttp session so backend calls reuse pooled keep-alive
+    connections instead of paying a fresh TCP/TLS handshake each time. Started by
+    Stabilibot.start and closed by Stabilibot.close; `session` is also usable directly
+    for other hosts (drop server, hiscores)."""
+
+    def __init__(self, base_url: str = None):
+        self.base_url = base_url or os.getenv("BACKEND_URL")
+        self._session: aiohttp.ClientSession = None
+        # endpoint -> task for GETs currently on the wire, shared by identical callers
+        self._inflight: dict = {}
+        # endpoint template -> counters. "calls" are what cogs asked for, "requests" what
+        # actually went to the backend, "deduplicated" the GETs that joined one in flight.
+        self.endpoint_stats = defaultdict(lambda: {"calls": 0, "requests": 0, "deduplicated": 0, "retries": 0})
+        self.breaker = CircuitBreaker()
+
+    def _create_session(self):
+        connector = aiohttp.TCPConnector(
+            limit=POOL_LIMIT,
+            limit_per_host=POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=REQUEST_TIMEOUT)
+        logger.info(f"Backend HTTP session created for {self.base_url}")
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # Created lazily as well, in case a task fires before start() has run
+        if self._session is None or self._session.closed:
+            self._create_session()
+        return self._session
+
+    async def start(self):
+        if self._session is None or self._session.closed:
+            self._create_session()
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+            logger.info("Backend HTTP session closed")
+        self._session = None
+
+    # Make an API call to the backend. Returns (success, data) where data is the parsed
+    # JSON body on success and an error string otherwise.
+    #
+    # Identical GETs issued while one is already in flight wait for that request and
+    # get the same parsed result (the same object, so don't mutate it).
+    async def call(self, endpoint, payload=None, method="GET"):
+        template = endpoint_template(endpoint)
+        stats = self.endpoint_stats[f"{method} {template}"]
+        stats["calls"] += 1
+
+        if method != "GET":
+            stats["requests"] += 1
+            with span(f"backend {method} {template}"):
+                return await self._request(endpoint, payload, method)
+
+        task = self._inflight.get(endpoint)
+        joined = task is not None
+        if joined:
+            stats["deduplicated"] += 1
+        else:
+            stats["requests"] += 1
+            task = asyncio.ensure_future(self._request(endpoint, payload, method))
+            self._inflight[endpoint] = task
+            task.add_done_callback(lambda _: self._inflight.pop(endpoint, None))
+
+        # Shielded so one caller being cancelled doesn't cancel the request for the others
+        with span(f"backend {method} {template}", deduplicated=joined):
+            return await asyncio.shield(task)
+
+    async def _request(self, endpoint, payload, method):
+        attempts = 1 + (RETRY_ATTEMPTS if method == "GET" else 0)
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                logger.warning(f"Backend circuit open, not calling {method} {endpoint}")
+                return False, CONNECTION_ERROR_MESSAGE
+
+            success, data, retryable = await self._attempt(endpoint, payload, method)
+            if not retryable or attempt == attempts - 1:
+                return success, data
+
+            self.endpoint_stats[f"{method} {endpoint_template(endpoint)}"]["retries"] += 1
+            delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+            logger.warning(f"Retrying {method} {endpoint} in {delay * 1000:.0f}ms (attempt {attempt + 2} of {attempts})")
+            await asyncio.sleep(delay)
+
+    # One request. Returns (success, data, retryable) and reports the outcome to the breaker.
+    async def _attempt(self, endpoint, payload, method):
+        url = f"{self.base_url}{endpoint}"
+        logger.debug("API call: %s %s - Payload: %s", method, url, payload)
+
+        kwargs = {"headers": {"Accept": "application/json"}}
+        if payload is not None:
+            kwargs["json"] = payload
+        # Lets backend logs be matched up with the interaction that caused them
+        request_id = current_request_id()
+        if request_id:
+            kwargs["headers"][REQUEST_ID_HEADER] = request_id
+
+        template = endpoint_template(endpoint)
+        start_time = time.perf_counter()
+        try:
+            async with self.session.request(method, url, **kwargs) as response:
+                body = await response.text()
+                elapsed = (time.perf_counter() - start_time) * 1000
+                metrics.observe("backend_request_seconds", elapsed / 1000, method=method, endpoint=template)
+                metrics.inc("backend_requests_total", method=method, endpoint=template, status=response.status)
+                if response.status >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if response.status not in [200, 201]:
+                    logger.error(f"API error ({elapsed:.2f}ms): {method} {url} - Status: {response.status} - Error: {body}")
+                    return False, f"Error: {response.status} - {body}", response.status in RETRYABLE_STATUSES
+                logger.debug("API response (%.2fms): %s %s - Status: %s - Response size: %d chars", elapsed, method, url, response.status, len(body))
+        except aiohttp.ClientError as e:
+            # Refused connections, but also a pooled keep-alive connection the backend
+            # closed under us (ServerDisconnectedError, ClientOSError): all worth a retry
+            metrics.inc("backend_requests_total", method=method, endpoint=template, status="connection_error")
+            self.breaker.record_failure()
+            logger.error(f"Connection error to {url}: {type(e).__name__}: {str(e)}")
+            return False, CONNECTION_ERROR_MESSAGE, True
+        except asyncio.TimeoutError:
+            # Not retried: the caller has already waited out the full timeout
+            metrics.inc("backend_requests_total", method=method, endpoint=template, status="timeout")
+            self.breaker.record_failure()
+            logger.error(f"Timed out calling {url}")
+            return False, "Error: the backend took too long to respond.", False
+        except Exception as e:
+            metrics.inc("backend_requests_total", method=method, endpoint=template, status="error")
+            # Still an outcome for the breaker, or a failed half-open probe would never be released
+            self.breaker.record_failure()
+            logger.error(f"Unexpected error calling {url}: {str(e)}", exc_info=True)
+            return False, f"Unexpected error: {str(e)}", False
+
+        success, data = self._decode(method, url, body)
+        return success, data, False
+
+    # The backend serves some JSON as text/html, so bodies are parsed by hand rather
+    # than with response.json()
+    def _decode(self, method, url, body):
+        try:
+            data = json.loads(body) if body else {}
+        except json.JSONDecodeError:
+            if method == "DELETE":
+                # Some DELETE endpoints don't return JSON
+                return True, {}
+            if method == "GET":
+                logger.warning(f"Non-JSON response: {method} {url} - Data: {body[:100]}...")
+                return True, body
+            logger.error(f"Invalid JSON response: {method} {url} - Data: {body[:100]}...")
+            return False, "Unexpected error: the backend returned an invalid response."
+
+        # GET callers iterate lists directly; write endpoints wrap them
+        if method != "GET" and isinstance(data, list):
+            return True, {"items": data}
+        return True, data
+
+    def stats(self):
+        return {template: dict(counters) for template, counters in self.endpoint_stats.items()}
+
+    def breaker_stats(self):
+        return self.breaker.stats()
+
+backend = BackendClient()
@@ -0,0 +1,69 @@
+from dotenv import load_dotenv
+load_dotenv()
+import os
+import asyncio
+import socket
+import logging
+import traceback
+
+logger = logging.getLogger("blocking_guard")
+
+# BLOCKING_GUARD=warn (default) logs each offending call site once, =raise turns the
+# call into an error so it shows up in tests and dev runs, =off leaves sockets alone.
+MODE = os.getenv("BLOCKING_GUARD", "warn").lower()
+
+# Number of blocking calls seen on the loop thread, by call site
+violations: dict = {}
+
+_original_connect = socket.socket.connect
+_original_getaddrinfo = socket.getaddrinfo
+
+class BlockingCallError(RuntimeError):
+    pass
+
+def _on_loop_thread():
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+def _report(kind, detail):
+    # The frame that made the call, skipping this module, the stdlib and third-party internals
+    stack = traceback.extract_stack()[:-2]
+    site = next((f for f in reversed(stack) if "site-packages" not in f.filename and "/lib/python" not in f.filename), stack[-1])
+    key = f"{site.filename}:{site.lineno}"
+
+    first = key not in violations
+    violations[key] = violations.get(key, 0) + 1
+
+    message = f"Blocking {kind} ({detail}) on the event loop thread at {key} in {site.name}"
+    if MODE == "raise":
+        raise BlockingCallError(message)
+    if first:
+        logger.warning(message + "\n" + "".join(traceback.format_list(stack[-8:])))
+
+def _guarded_connect(self, address):
+    # asyncio and aiohttp connect non-blocking sockets (timeout 0.0) from the loop, which is fine
+    if self.gettimeout() != 0.0 and _on_loop_thread():
+        _report("socket connect", address)
+    return _original_connect(self, address)
+
+def _guarded_getaddrinfo(host, *args, **kwargs):
+    # loop.getaddrinfo resolves in an executor thread, so a call here means sync DNS
+    if _on_loop_thread():
+        _report("DNS lookup", host)
+    return _original_getaddrinfo(host, *args, **kwargs)
+
+def install():
+    """Report synchronous network calls (requests, urllib, plain sockets) made from
+    inside a coroutine, where they would stall the gateway heartbeat."""
+    if MODE == "off":
+        return
+    socket.socket.connect = _guarded_connect
+    socket.getaddrinfo = _guarded_getaddrinfo
+    logger.info(f"Blocking call guard installed (mode: {MODE})")
+
+def uninstall():
+    socket.socket.connect = _original_connect
+    socket.getaddrinfo = _original_getaddrinfo
@@ -0,0 +1,78 @@
+from dotenv import load_dotenv
+load_dotenv()
+import os
+import time
+from collections import OrderedDict
+
+# Every named cache, so their counters can be reported together
+caches: dict = {}
+
+class TTLCache:
+    """In-process cache where every entry expires after `ttl` seconds.
+
+    Entries are also dropped least-recently-used first once `maxsize` is reached.
+    Hit and miss counters are kept per cache; an expired entry counts as a miss."""
+
+    def __init__(self, name: str, ttl: float, maxsize: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        caches[name] = self
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: float = None):
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    # Drop one key, or everything when no key is given
+    def invalidate(self, key=None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+# The active event changes about once a month, so a few minutes of staleness is fine.
+# Mods can force a refresh with /event_refresh_cache.
+active_event_cache = TTLCache("active_event", ttl=float(os.getenv("ACTIVE_EVENT_CACHE_TTL", "300")), maxsize=8)
+
+# (event_id, discord_id) -> team_id. Membership only changes through the EventMod team
+# commands, which update or drop entries themselves; the TTL just bounds staleness for
+# changes made outside the bot.
+team_cache = TTLCache("user_team", ttl=float(os.getenv("TEAM_CACHE_TTL", "3600")), maxsize=4096)
+
+# (event_id, discord_id) -> {"team_id", "user_id"} from the v2 team member lists, so
+# moving a player between teams can go straight to the team they were last seen on.
+# EventMod re-reads every list each TEAM_INDEX_REFRESH_MINUTES to keep it warm.
+team_member_index = TTLCache("team_member_index", ttl=float(os.getenv("TEAM_CACHE_TTL", "3600")), maxsize=4096)
@@ -0,0 +1,44 @@
+import asyncio
+import inspect
+
+async def gather_with_limit(awaitables, limit: int = 8):
+    """Run awaitables concurrently, at most `limit` at a time.
+
+    Results come back in the same order. A failure is returned in place of its
+    result instead of being raised, so one bad call doesn't sink the rest."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(awaitable):
+        async with semaphore:
+            return await awaitable
+
+    return await asyncio.gather(*(run(awaitable) for awaitable in awaitables), return_exceptions=True)
+
+async def first_match(awaitables, predicate=lambda result: result is not None, limit: int = 8):
+    """Run awaitables concurrently, at most `limit` at a time, and return the first
+    result (by completion) that satisfies `predicate`. Everything still running is
+    cancelled once it's found. Returns None when nothing matches; failures are skipped."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(awaitable):
+        try:
+            async with semaphore:
+                return await awaitable
+        finally:
+            # Cancelled before it got a slot: close it so it isn't reported as never awaited
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()
+
+    tasks = [asyncio.ensure_future(run(awaitable)) for awaitable in awaitables]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                result = await next_done
+            except Exception:
+                continue
+            if predicate(result):
+                return result
+        return None
+    finally:
+        for task in tasks:
+            task.cancel()
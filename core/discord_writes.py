@@ -0,0 +1,230 @@
+import time
+import asyncio
+import logging
+import itertools
+import contextvars
+from collections import defaultdict, deque
+
+import discord
+
+from core.metrics import metrics
+from core.tracing import span
+
+logger = logging.getLogger("discord_writes")
+
+# Priority lanes, lowest runs first
+INTERACTIVE = 0  # Someone is looking at a button they just pressed
+DEFAULT = 1      # One-off messages and DMs
+BULK = 2         # Role and nickname jobs touching many members
+LANES = {INTERACTIVE: "interactive", DEFAULT: "default", BULK: "bulk"}
+
+WORKERS = 4
+# Idle route buckets are dropped past this many; webhook message routes are per message
+MAX_BUCKETS = 512
+# Workers that only take INTERACTIVE jobs, so a lane full of slow bulk writes can
+# never occupy every worker
+INTERACTIVE_WORKERS = 1
+
+# Requests per window each kind of route is paced to. discord.py doesn't hand response
+# headers back through its public API, so these are local estimates on the safe side
+# of what Discord sends in X-RateLimit-*; discord.py still enforces the real buckets.
+MESSAGE_EDITS = (5, 5.0)   # Per channel, or per interaction token for webhook messages
+MEMBER_EDITS = (10, 10.0)  # Per guild
+ROLE_CHANGES = (10, 10.0)  # Per guild, one request per role
+DMS = (5, 5.0)
+
+class RouteBucket:
+    def __init__(self, limit: int, per: float):
+        self.limit = limit
+        self.per = per
+        self.sent = deque()  # Send times within the current window
+        self.blocked_until = 0.0
+        self.requests = 0
+        self.throttled = 0     # Times a job was held back because the bucket was full
+        self.rate_limited = 0  # 429s that got past discord.py's own retries
+
+    def wait_time(self, requests: int = 1):
+        """Seconds until `requests` more can be sent on this route."""
+        now = time.monotonic()
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        while self.sent and self.sent[0] <= now - self.per:
+            self.sent.popleft()
+        over = len(self.sent) + requests - self.limit
+        if over <= 0 or not self.sent:
+            return 0.0
+        # Wait for enough of the window to roll off; a job bigger than the whole
+        # window goes once it is empty
+        return max(0.0, self.sent[min(over, len(self.sent)) - 1] + self.per - now)
+
+    def idle(self):
+        now = time.monotonic()
+        return self.blocked_until <= now and (not self.sent or self.sent[-1] <= now - self.per)
+
+    def charge(self, requests: int = 1):
+        now = time.monotonic()
+        self.sent.extend([now] * requests)
+        self.requests += requests
+
+    def block(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.rate_limited += 1
+
+class WriteScheduler:
+    """Queue for Discord writes (message edits, member edits, role changes, DMs).
+
+    Jobs are run by a few workers in priority order, so a bulk nickname sweep can't
+    hold up a roll view's edit, and INTERACTIVE_WORKERS of them take nothing but
+    interactive jobs. Each job names the rate limit route it hits and how many requests
+    it makes; jobs for a route whose window is full are held until it has room,
+    instead of being sent to wait in discord.py's rate limiter while holding a worker.
+    discord.py still handles 429s itself."""
+
+    def __init__(self, workers: int = WORKERS, interactive_workers: int = INTERACTIVE_WORKERS):
+        self.worker_count = workers
+        self.interactive_workers = min(interactive_workers, workers)
+        self.buckets = {}
+        self._lanes = {priority: deque() for priority in LANES}
+        self._ready: asyncio.Condition = None
+        self._workers = []
+        self._sequence = itertools.count()
+        # Per lane: jobs queued (including held ones), completed, and time spent waiting
+        self.depth = defaultdict(int)
+        self.completed = defaultdict(int)
+        self.wait_total = defaultdict(float)
+        self.wait_max = defaultdict(float)
+
+    def _start(self):
+        if self._ready is None:
+            self._ready = asyncio.Condition()
+        if not self._workers:
+            # A fresh context each, or the workers would inherit the first caller's
+            # trace and book every later write's spans against it
+            self._workers = [
+                asyncio.create_task(self._worker((INTERACTIVE,) if i < self.interactive_workers else tuple(LANES)), context=contextvars.Context())
+                for i in range(self.worker_count)
+            ]
+
+    def bucket(self, route: str, limit: tuple):
+        if route not in self.buckets:
+            if len(self.buckets) >= MAX_BUCKETS:
+                self.buckets = {key: bucket for key, bucket in self.buckets.items() if not bucket.idle()}
+            self.buckets[route] = RouteBucket(*limit)
+        return self.buckets[route]
+
+    async def _put(self, item):
+        async with self._ready:
+            self._lanes[item[0]].append(item)
+            self._ready.notify_all()
+
+    async def _take(self, lanes):
+        async with self._ready:
+            while True:
+                for priority in lanes:
+                    if self._lanes[priority]:
+                        return self._lanes[priority].popleft()
+                await self._ready.wait()
+
+    async def run(self, call, route: str, priority: int = DEFAULT, limit: tuple = MESSAGE_EDITS, requests: int = 1):
+        """Queue `call` (a function returning the coroutine that makes the write) and
+        wait for its result. `requests` is how many Discord requests the call makes on
+        `route`, paced to `limit` (requests, per seconds). Exceptions from the call are
+        raised here."""
+        self._start()
+        future = asyncio.get_running_loop().create_future()
+        self.depth[priority] += 1
+        await self._put((priority, next(self._sequence), route, limit, requests, call, future, time.monotonic()))
+        with span(f"discord {route}", lane=LANES[priority]):
+            return await future
+
+    async def _worker(self, lanes):
+        while True:
+            item = await self._take(lanes)
+            priority, sequence, route, limit, requests, call, future, queued_at = item
+            if future.cancelled():
+                self.depth[priority] -= 1
+                continue
+
+            bucket = self.bucket(route, limit)
+            delay = bucket.wait_time(requests)
+            if delay > 0:
+                # Park it until the route has room; the worker moves on to other routes
+                bucket.throttled += 1
+                asyncio.get_running_loop().call_later(delay, lambda: asyncio.create_task(self._put(item)))
+                continue
+            bucket.charge(requests)
+
+            self.depth[priority] -= 1
+            waited = time.monotonic() - queued_at
+            self.wait_total[priority] += waited
+            self.wait_max[priority] = max(self.wait_max[priority], waited)
+
+            status = 200
+            try:
+                result = await call()
+            except Exception as e:
+                if isinstance(e, discord.HTTPException):
+                    status = e.status
+                    if e.status == 429:
+                        # discord.py gave up retrying; keep the route quiet for as long as Discord asked
+                        retry_after = e.response.headers.get("Retry-After") if e.response is not None else None
+                        bucket.block(float(retry_after or limit[1]))
+                        metrics.inc("discord_rate_limit_hits_total", lane=LANES[priority])
+                else:
+                    status = "error"
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                metrics.inc("discord_api_requests_total", lane=LANES[priority], status=status)
+                self.completed[priority] += 1
+
+    # Helpers for the writes the bot makes
+
+    async def edit_message(self, message, priority: int = INTERACTIVE, **fields):
+        if isinstance(message, (discord.InteractionMessage, discord.WebhookMessage)):
+            # Interaction responses and followups are edited through the interaction's
+            # webhook token, not the channel, and that has a bucket of its own
+            route = f"PATCH /webhooks/{message.webhook_id}/messages/{message.id}"
+        else:
+            route = f"PATCH /channels/{message.channel.id}/messages"
+        return await self.run(lambda: message.edit(**fields), route, priority, MESSAGE_EDITS)
+
+    async def edit_member(self, member, priority: int = BULK, **fields):
+        return await self.run(lambda: member.edit(**fields), f"PATCH /guilds/{member.guild.id}/members", priority, MEMBER_EDITS)
+
+    # discord.py adds and removes roles one request per role
+    async def add_roles(self, member, *roles, priority: int = BULK):
+        return await self.run(lambda: member.add_roles(*roles), f"PUT /guilds/{member.guild.id}/members/roles", priority, ROLE_CHANGES, requests=len(roles))
+
+    async def remove_roles(self, member, *roles, priority: int = BULK):
+        return await self.run(lambda: member.remove_roles(*roles), f"DELETE /guilds/{member.guild.id}/members/roles", priority, ROLE_CHANGES, requests=len(roles))
+
+    async def send_dm(self, user, *args, priority: int = DEFAULT, **kwargs):
+        return await self.run(lambda: user.send(*args, **kwargs), "POST /users/@me/channels/messages", priority, DMS)
+
+    def stats(self):
+        lanes = {}
+        for priority, lane in LANES.items():
+            completed = self.completed[priority]
+            lanes[lane] = {
+                "queued": self.depth[priority],
+                "completed": completed,
+                "wait_avg_ms": self.wait_total[priority] / completed * 1000 if completed else 0.0,
+                "wait_max_ms": self.wait_max[priority] * 1000,
+            }
+        routes = {
+            route: {
+                "limit": bucket.limit,
+                "remaining": max(0, bucket.limit - len(bucket.sent)),
+                "requests": bucket.requests,
+                "throttled": bucket.throttled,
+                "rate_limited": bucket.rate_limited,
+            }
+            for route, bucket in self.buckets.items()
+        }
+        return {"lanes": lanes, "routes": routes}
+
+discord_writes = WriteScheduler()
@@ -0,0 +1,135 @@
+from dotenv import load_dotenv
+load_dotenv()
+import os
+import time
+import asyncio
+import logging
+
+import discord
+
+logger = logging.getLogger("gateway_profile")
+
+# Imported first thing by main.py, so this is close enough to process start
+PROCESS_STARTED = time.monotonic()
+
+# What each profile subscribes to and keeps in memory.
+#   intents       "all", or "default" (no members, presences or message content) plus the listed extras
+#   chunking      "startup": download every member before on_ready (on_ready waits for it)
+#                 "deferred": on_ready first, then download members in the background
+#                 "never": only cache members seen in events and interactions; guild.get_member
+#                 misses everyone else, so the nickname sweep only sees those (the API's
+#                 member endpoints fetch misses from Discord)
+#   max_messages  messages kept in the message cache, None for none
+PROFILES = {
+    # Everything, as the bot has always run: presence updates and the full member list at startup
+    "full": {"intents": ["all"], "chunking": "startup", "max_messages": 1000},
+    # What the bot actually uses. Slash commands need no message content, nothing reads
+    # presences, and the nickname sweep and the API need the member list, but not before login.
+    "standard": {"intents": ["default", "members"], "chunking": "deferred", "max_messages": None},
+    "minimal": {"intents": ["default", "members"], "chunking": "never", "max_messages": None},
+}
+
+CHUNKING_MODES = ("startup", "deferred", "never")
+
+# Seconds after on_ready before deferred chunking starts, so the first interactions go first
+DEFERRED_CHUNK_DELAY = float(os.getenv("DEFERRED_CHUNK_DELAY", "15"))
+
+def rss_bytes():
+    """Resident memory of this process. Falls back to the peak when /proc isn't there."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if peak > 1 << 32 else peak * 1024
+
+def build_intents(names):
+    intents = discord.Intents.none()
+    for name in names:
+        name = name.strip()
+        enabled = not name.startswith("-")
+        name = name.lstrip("+-")
+        if name in ("all", "default", "none"):
+            intents = getattr(discord.Intents, name)()
+        elif name in discord.Intents.VALID_FLAGS:
+            setattr(intents, name, enabled)
+        elif name:
+            raise ValueError(f"Unknown gateway intent '{name}'")
+    return intents
+
+class GatewayProfile:
+    """Gateway intents and member/message caching, picked by GATEWAY_PROFILE
+    (full, standard or minimal; full by default) with per-setting overrides:
+
+        GATEWAY_INTENTS=default,members,-typing   replaces the profile's intents
+        MEMBER_CHUNKING=startup|deferred|never
+        MAX_MESSAGES=500                           0 or none disables the message cache
+
+    Also keeps the startup report: time from process start to on_ready and to the
+    member list being loaded, with RSS and cache sizes at each, so profiles can be
+    compared from the logs or /metrics."""
+
+    def __init__(self):
+        self.name = os.getenv("GATEWAY_PROFILE", "full").lower()
+        if self.name not in PROFILES:
+            raise ValueError(f"Unknown GATEWAY_PROFILE '{self.name}', expected one of {', '.join(PROFILES)}")
+        profile = PROFILES[self.name]
+
+        intent_names = os.getenv("GATEWAY_INTENTS")
+        self.intents = build_intents(intent_names.split(",") if intent_names else profile["intents"])
+
+        self.chunking = os.getenv("MEMBER_CHUNKING", profile["chunking"]).lower()
+        if self.chunking not in CHUNKING_MODES:
+            raise ValueError(f"Unknown MEMBER_CHUNKING '{self.chunking}', expected one of {', '.join(CHUNKING_MODES)}")
+        if self.chunking != "never" and not self.intents.members:
+            logger.warning("Member chunking needs the members intent; not chunking")
+            self.chunking = "never"
+
+        max_messages = os.getenv("MAX_MESSAGES")
+        if max_messages is None:
+            self.max_messages = profile["max_messages"]
+        else:
+            self.max_messages = None if max_messages.lower() in ("", "0", "none") else int(max_messages)
+
+        # Set once the member list is as complete as this profile makes it
+        self.members_loaded = asyncio.Event()
+        self.report = {}  # stage -> {"seconds", "rss_bytes", "members", "messages"}
+
+    def bot_options(self):
+        return {
+            "intents": self.intents,
+            "chunk_guilds_at_startup": self.chunking == "startup",
+            "max_messages": self.max_messages,
+        }
+
+    def describe(self):
+        enabled = [name for name, value in self.intents if value]
+        return f"profile={self.name} chunking={self.chunking} max_messages={self.max_messages} intents={','.join(enabled)}"
+
+    def record(self, stage: str, bot):
+        """Note how long startup took to reach `stage` and what the process holds there."""
+        entry = {
+            "seconds": round(time.monotonic() - PROCESS_STARTED, 2),
+            "rss_bytes": rss_bytes(),
+            "members": sum(len(guild.members) for guild in bot.guilds),
+            "messages": len(bot.cached_messages),
+        }
+        self.report[stage] = entry
+        logger.info(
+            f"Startup {stage} ({self.describe()}): {entry['seconds']}s, "
+            f"RSS {entry['rss_bytes'] / (1024 * 1024):.1f} MiB, {entry['members']} members cached"
+        )
+        return entry
+
+    def stats(self):
+        return {
+            "profile": self.name,
+            "chunking": self.chunking,
+            "max_messages": self.max_messages,
+            "intents": self.intents.value,
+            "report": self.report,
+        }
+
+gateway_profile = GatewayProfile()
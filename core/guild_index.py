@@ -0,0 +1,95 @@
+from collections import defaultdict
+
+class GuildIndex:
+    """Name -> role and name -> category lookups per guild.
+
+    Built from the guild the first time it is used (or on ready) and kept current by
+    the GuildIndexSync cog from role and channel gateway events, so resolving a role by
+    name is a dict lookup instead of a scan over every role in the guild. Names aren't
+    unique in Discord; like discord.utils.get over guild.roles, the lowest positioned
+    match is returned."""
+
+    def __init__(self):
+        # guild_id -> name -> {object id -> role/category}
+        self._roles = {}
+        self._categories = {}
+        self.hits = 0
+        self.misses = 0
+
+    def build(self, guild):
+        roles = defaultdict(dict)
+        for role in guild.roles:
+            roles[role.name][role.id] = role
+        categories = defaultdict(dict)
+        for category in guild.categories:
+            categories[category.name][category.id] = category
+        self._roles[guild.id] = roles
+        self._categories[guild.id] = categories
+
+    def forget(self, guild):
+        self._roles.pop(guild.id, None)
+        self._categories.pop(guild.id, None)
+
+    def role(self, guild, name):
+        return self._lookup(self._roles, guild, name)
+
+    def category(self, guild, name):
+        return self._lookup(self._categories, guild, name)
+
+    def _lookup(self, index, guild, name):
+        if guild.id not in index:
+            self.build(guild)
+        matches = index[guild.id].get(name)
+        if not matches:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if len(matches) == 1:
+            return next(iter(matches.values()))
+        return min(matches.values(), key=lambda match: match.position)
+
+    # Gateway event hooks. Events for a guild that hasn't been indexed yet are ignored;
+    # it is built from the guild's current state on first lookup.
+    def add_role(self, role):
+        self._add(self._roles, role)
+
+    def remove_role(self, role):
+        self._remove(self._roles, role)
+
+    def update_role(self, before, after):
+        self._remove(self._roles, before)
+        self._add(self._roles, after)
+
+    def add_category(self, category):
+        self._add(self._categories, category)
+
+    def remove_category(self, category):
+        self._remove(self._categories, category)
+
+    def update_category(self, before, after):
+        self._remove(self._categories, before)
+        self._add(self._categories, after)
+
+    def _add(self, index, obj):
+        names = index.get(obj.guild.id)
+        if names is not None:
+            names.setdefault(obj.name, {})[obj.id] = obj
+
+    def _remove(self, index, obj):
+        names = index.get(obj.guild.id)
+        if names is None or obj.name not in names:
+            return
+        names[obj.name].pop(obj.id, None)
+        if not names[obj.name]:
+            del names[obj.name]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "guilds": len(self._roles),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+guild_index = GuildIndex()
@@ -0,0 +1,83 @@
+from dotenv import load_dotenv
+load_dotenv()
+import os
+import time
+import asyncio
+import logging
+
+import aiohttp
+
+from core.backend import backend
+from core.cache import TTLCache
+
+logger = logging.getLogger("hiscores")
+
+HISCORES_URL = os.getenv("HISCORES_URL", "https://secure.runescape.com/m=hiscore_oldschool/index_lite.ws")
+
+# A name that exists stays valid for a long while; a missing one may be created (or
+# get its first hiscore entry) any time, so it is rechecked sooner
+POSITIVE_TTL = float(os.getenv("HISCORES_POSITIVE_TTL", "86400"))
+NEGATIVE_TTL = float(os.getenv("HISCORES_NEGATIVE_TTL", "600"))
+MAX_CONCURRENCY = int(os.getenv("HISCORES_MAX_CONCURRENCY", "4"))
+
+# Jagex treats spaces, underscores and hyphens in names the same, and ignores case
+def normalize_name(name: str) -> str:
+    return " ".join(name.replace("_", " ").replace("-", " ").lower().split())
+
+class HiscoresClient:
+    """Checks whether an OSRS name exists on the hiscores.
+
+    Answers are cached (found and not found separately), concurrent checks of the
+    same name share one request, and at most `max_concurrency` requests are sent to
+    Jagex at once. Errors aren't cached, so the next check tries again."""
+
+    def __init__(self, url: str = HISCORES_URL, max_concurrency: int = MAX_CONCURRENCY):
+        self.url = url
+        self.cache = TTLCache("hiscores", ttl=POSITIVE_TTL, maxsize=4096)
+        self.requests = 0
+        self.errors = 0
+        self._inflight: dict = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def exists(self, name: str) -> bool:
+        key = normalize_name(name)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._lookup(name, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller giving up doesn't cancel the lookup for the others
+        return await asyncio.shield(task)
+
+    async def _lookup(self, name, key):
+        async with self._semaphore:
+            self.requests += 1
+            start_time = time.perf_counter()
+            try:
+                async with backend.session.get(self.url, params={"player": name}) as response:
+                    status = response.status
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.errors += 1
+                logger.error(f"Error checking OSRS Hiscores for '{name}': {e}")
+                return False
+            elapsed = (time.perf_counter() - start_time) * 1000
+
+        if status == 200:
+            self.cache.set(key, True)
+        elif status == 404:
+            self.cache.set(key, False, ttl=NEGATIVE_TTL)
+        else:
+            self.errors += 1
+            logger.warning(f"Hiscores returned {status} for '{name}' ({elapsed:.0f}ms)")
+            return False
+        logger.debug(f"Hiscores lookup for '{name}': {status} ({elapsed:.0f}ms)")
+        return status == 200
+
+    def stats(self):
+        return {**self.cache.stats(), "requests": self.requests, "errors": self.errors, "in_flight": len(self._inflight)}
+
+hiscores = HiscoresClient()
@@ -0,0 +1,157 @@
+import time
+import uuid
+import asyncio
+import logging
+import contextvars
+
+logger = logging.getLogger("jobs")
+
+# Finished jobs are kept this long so the backend can still fetch their results
+JOB_RETENTION = 3600
+
+# Every job queue, so a job can be looked up by id alone
+queues: dict = {}
+
+class QueueFull(Exception):
+    pass
+
+class Job:
+    """One unit of background work and what it has produced so far.
+
+    Work that handles many targets appends a result per target with add_result, so
+    callers can read or stream them while the job is still running."""
+
+    def __init__(self, kind: str, total: int = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.total = total
+        self.results = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    def add_result(self, result: dict):
+        self.results.append(result)
+        self._notify()
+
+    def _notify(self):
+        # Wake everyone watching, then start a fresh event for the next change
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def watch(self, offset: int = 0):
+        """Yields results from `offset` on as they arrive, until the job finishes."""
+        while True:
+            changed = self._changed
+            while offset < len(self.results):
+                yield self.results[offset]
+                offset += 1
+            if self.finished:
+                return
+            await changed.wait()
+
+    def to_dict(self, offset: int = 0):
+        counts = {}
+        for result in self.results:
+            counts[result.get("status")] = counts.get(result.get("status"), 0) + 1
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "total": self.total,
+            "processed": len(self.results),
+            "counts": counts,
+            "results": self.results[offset:],
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+class JobQueue:
+    """Bounded in-process queue of background jobs, run by a fixed number of workers.
+
+    submit() returns immediately with the Job; callers look it up later by id. A full
+    queue raises QueueFull rather than growing without limit."""
+
+    def __init__(self, name: str, workers: int = 1, maxsize: int = 100):
+        self.name = name
+        self.worker_count = workers
+        self.maxsize = maxsize
+        self.jobs: dict = {}
+        self._queue: asyncio.Queue = None
+        self._workers = []
+        queues[name] = self
+
+    def _start(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+        if not self._workers:
+            # A fresh context each, or the workers would inherit the first submitter's
+            # trace and book every later job's spans against it
+            self._workers = [asyncio.create_task(self._worker(), context=contextvars.Context()) for _ in range(self.worker_count)]
+
+    def submit(self, kind: str, work, total: int = None) -> Job:
+        """Queue `work`, an async function taking the Job. Whatever it returns becomes
+        job.result; an exception marks the job failed."""
+        self._start()
+        self._prune()
+        job = Job(kind, total)
+        try:
+            self._queue.put_nowait((job, work))
+        except asyncio.QueueFull:
+            raise QueueFull(f"The {self.name} job queue is full ({self.maxsize} jobs waiting)")
+        self.jobs[job.id] = job
+        logger.info(f"Queued {kind} job {job.id} ({self._queue.qsize()} waiting)")
+        return job
+
+    def get(self, job_id: str) -> Job:
+        return self.jobs.get(job_id)
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished and job.finished_at < cutoff]:
+            del self.jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job, work = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            job._notify()
+            try:
+                job.result = await work(job)
+                job.status = "done"
+            except Exception as e:
+                logger.error(f"{job.kind} job {job.id} failed: {str(e)}", exc_info=True)
+                job.error = str(e)
+                job.status = "failed"
+            finally:
+                job.finished_at = time.time()
+                job._notify()
+                self._queue.task_done()
+            logger.info(f"{job.kind} job {job.id} {job.status} in {job.finished_at - job.started_at:.1f}s")
+
+    def stats(self):
+        statuses = {}
+        for job in self.jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {"waiting": self._queue.qsize() if self._queue else 0, "jobs": statuses}
+
+def find_job(job_id: str) -> Job:
+    return next((queue.jobs[job_id] for queue in queues.values() if job_id in queue.jobs), None)
+
+# DM broadcasts go one at a time; the write scheduler paces the sends within each
+dm_jobs = JobQueue("dm", workers=1, maxsize=20)
+
+# Channel and role operations the internal API was asked to run in the background
+api_jobs = JobQueue("api", workers=4, maxsize=100)
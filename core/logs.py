@@ -0,0 +1,94 @@
+from dotenv import load_dotenv
+load_dotenv()
+import os
+import copy
+import json
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+
+LOG_FILE = os.getenv("LOG_FILE", "event_rolls.log")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Fraction of full payload dumps (log_payload) that are actually written
+PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.1"))
+
+_listener = None
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    # The stock QueueHandler fully formats the record (traceback included) before
+    # queueing it. Here only the message is merged with its arguments, which is cheap
+    # and has to happen now: the arguments may be mutated by the time the listener
+    # thread gets to them. The one thing left for the listener is LazyJson, which is
+    # queued over its own copy of the payload.
+    def prepare(self, record):
+        record = copy.copy(record)
+        if isinstance(record.args, tuple) and any(isinstance(arg, LazyJson) for arg in record.args):
+            record.args = tuple(_snapshot(arg) for arg in record.args)
+        else:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+# Argument as it is now: scalars as they are, LazyJson over a copy, anything else as its str
+def _snapshot(arg):
+    if isinstance(arg, LazyJson):
+        return LazyJson(copy.deepcopy(arg.data), arg.indent)
+    if arg is None or isinstance(arg, (str, bytes, int, float)):
+        return arg
+    return str(arg)
+
+class LazyJson:
+    """json.dumps(data) that only runs if the record is actually written, and then on
+    the logging thread: logger.debug("Payload: %s", LazyJson(data))."""
+
+    def __init__(self, data, indent=None):
+        self.data = data
+        self.indent = indent
+
+    def __str__(self):
+        try:
+            return json.dumps(self.data, indent=self.indent, default=str)
+        except (TypeError, ValueError):
+            return repr(self.data)
+
+def log_payload(logger: logging.Logger, message: str, payload, level: int = logging.DEBUG):
+    """Full, indented dump of a payload, written for a sample of calls only."""
+    if logger.isEnabledFor(level) and random.random() < PAYLOAD_SAMPLE_RATE:
+        logger.log(level, "%s\n%s", message, LazyJson(payload, indent=2))
+
+def setup_logging():
+    """Send all logging through a queue to a background thread that writes to stderr
+    and a size-rotated log file, so the event loop never waits on disk.
+
+    LOG_LEVEL sets the default level (INFO); LOG_LEVELS overrides it per logger, e.g.
+    LOG_LEVELS=event_user=DEBUG,backend=WARNING."""
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    for override in filter(None, os.getenv("LOG_LEVELS", "").split(",")):
+        name, _, level = override.partition("=")
+        logging.getLogger(name.strip()).setLevel(level.strip().upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+    # Flush what's still queued on exit
+    atexit.register(_listener.stop)
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from bisect import bisect_left
+from collections import defaultdict
+
+logger = logging.getLogger("metrics")
+
+# Latency buckets in seconds, from a fast cache-warm backend call to a slow Discord edit
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Registry:
+    """Counters, gauges and histograms kept in plain dicts, rendered in the Prometheus text
+    format on scrape. Recording is a dict lookup and an add, so it stays on in
+    production. Values owned by other modules (cache sizes, queue depths) are read at
+    scrape time through collectors instead of being copied in."""
+
+    def __init__(self):
+        self.help = {}
+        self.counters = defaultdict(lambda: defaultdict(float))    # name -> labels -> value
+        self.histograms = defaultdict(dict)                        # name -> labels -> Histogram
+        self.gauges = defaultdict(dict)                            # name -> labels -> value
+        self.collectors = []
+
+    def describe(self, name: str, help_text: str):
+        self.help[name] = help_text
+
+    def inc(self, name: str, value: float = 1, **labels):
+        self.counters[name][tuple(sorted(labels.items()))] += value
+
+    def set(self, name: str, value: float, **labels):
+        self.gauges[name][tuple(sorted(labels.items()))] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        histogram = self.histograms[name].get(key)
+        if histogram is None:
+            histogram = self.histograms[name][key] = Histogram()
+        histogram.observe(value)
+
+    def collector(self, collect):
+        """Register `collect()`, returning [(name, type, [(labels dict, value), ...])]."""
+        self.collectors.append(collect)
+        return collect
+
+    def render(self) -> str:
+        lines = []
+        for name, series in self.counters.items():
+            self._header(lines, name, "counter")
+            for key, value in series.items():
+                lines.append(f"{name}{_labels(dict(key))} {value}")
+
+        for name, series in self.gauges.items():
+            self._header(lines, name, "gauge")
+            for key, value in series.items():
+                lines.append(f"{name}{_labels(dict(key))} {value}")
+
+        for name, series in self.histograms.items():
+            self._header(lines, name, "histogram")
+            for key, histogram in series.items():
+                labels = dict(key)
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+        for collect in self.collectors:
+            try:
+                families = collect()
+            except Exception as e:
+                logger.error(f"Metrics collector {collect.__name__} failed: {str(e)}")
+                continue
+            for name, kind, samples in families:
+                self._header(lines, name, kind)
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(labels)} {float(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines, name, kind):
+        if name in self.help:
+            lines.append(f"# HELP {name} {self.help[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+metrics = Registry()
+
+metrics.describe("backend_request_seconds", "Backend HTTP request latency by endpoint template")
+metrics.describe("backend_requests_total", "Backend HTTP requests by endpoint template and status")
+metrics.describe("discord_api_requests_total", "Discord writes run by the write scheduler by lane and status")
+metrics.describe("discord_rate_limit_hits_total", "Scheduled Discord writes that failed with a 429 after discord.py's own retries")
+metrics.describe("slash_command_seconds", "Time from a slash command being invoked to its handler finishing")
+metrics.describe("event_loop_lag_seconds", "How late the event loop ran a timer it was asked to run")
+metrics.describe("event_loop_lag_last_seconds", "Event loop lag at the most recent check")
+metrics.describe("interactions_in_flight", "Slash commands whose handlers haven't finished yet")
+metrics.describe("slash_commands_total", "Slash commands handled, by command and outcome")
+
+# Measures how far behind the event loop is running: sleeps `interval` and records how
+# much longer than that it actually took to be woken
+async def monitor_loop_lag(interval: float = 0.5):
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - start - interval)
+        metrics.observe("event_loop_lag_seconds", lag)
+        metrics.set("event_loop_lag_last_seconds", lag)
@@ -0,0 +1,130 @@
+from dotenv import load_dotenv
+load_dotenv()
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger("roll_pages")
+
+# SQLite file holding the open roll pages. Keep it on persistent storage (a mounted
+# volume in containers): if it is lost, every open roll message stops responding.
+ROLL_PAGES_DB = os.getenv("ROLL_PAGES_DB", "roll_pages.sqlite3")
+# A roll message left open longer than this stops responding (default a week)
+ROLL_PAGE_TTL = float(os.getenv("ROLL_PAGE_TTL", str(7 * 24 * 3600)))
+
+class RollPageStore:
+    """What each open roll message is waiting on, keyed by message id.
+
+    The roll views only render components; their custom_ids name the action, and the
+    dispatcher looks the rest up here: event, team, initiator and the step's data (the
+    shop's items, the dock's destinations). Rows live in a small SQLite file rather
+    than in memory, so any number of open roll messages costs nothing while they sit
+    there and their buttons still work after a restart. Queries run on a thread.
+
+    A team has one live page at a time. Writing a new one removes the team's others and
+    hands back their messages, so the caller can take the dead buttons off them."""
+
+    def __init__(self, path: str = ROLL_PAGES_DB, ttl: float = ROLL_PAGE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._db = None
+        self._lock = threading.Lock()
+        self.entries = 0  # Row count after the last write, so stats() never queries
+        self.reads = 0
+        self.writes = 0
+        self.missing = 0
+
+    def _connection(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS roll_pages ("
+                "message_id INTEGER PRIMARY KEY, page TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            # Files from before pages were tracked per team get the new columns
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(roll_pages)")}
+            if "team_id" not in columns:
+                self._db.execute("ALTER TABLE roll_pages ADD COLUMN event_id TEXT NOT NULL DEFAULT ''")
+                self._db.execute("ALTER TABLE roll_pages ADD COLUMN team_id TEXT NOT NULL DEFAULT ''")
+                self._db.execute("ALTER TABLE roll_pages ADD COLUMN channel_id INTEGER")
+            self._db.execute("CREATE INDEX IF NOT EXISTS roll_pages_team ON roll_pages (event_id, team_id)")
+        return self._db
+
+    def _execute(self, query, params=()):
+        with self._lock:
+            return self._connection().execute(query, params).fetchall()
+
+    # Runs `work(db)` in one transaction and refreshes the row count; on the caller's thread
+    def _write(self, work):
+        with self._lock:
+            db = self._connection()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(db)
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+            (self.entries,), = db.execute("SELECT COUNT(*) FROM roll_pages").fetchall()
+            return result
+
+    def _take_team(self, db, event_id, team_id, keep):
+        rows = db.execute(
+            "SELECT message_id, channel_id FROM roll_pages WHERE event_id = ? AND team_id = ? AND message_id != ?",
+            (event_id, team_id, keep)
+        ).fetchall()
+        db.execute("DELETE FROM roll_pages WHERE event_id = ? AND team_id = ? AND message_id != ?", (event_id, team_id, keep))
+        return [(message_id, channel_id) for message_id, channel_id in rows if channel_id is not None]
+
+    async def put(self, message_id: int, channel_id: int, page: dict):
+        """Store `page` for the message. Returns [(message_id, channel_id)] of the team's
+        other pages, which are removed."""
+        self.writes += 1
+        def put(db):
+            replaced = self._take_team(db, page["event_id"], page["team_id"], message_id)
+            db.execute(
+                "INSERT OR REPLACE INTO roll_pages (message_id, page, updated_at, event_id, team_id, channel_id) VALUES (?, ?, ?, ?, ?, ?)",
+                (message_id, json.dumps(page, separators=(",", ":")), time.time(), page["event_id"], page["team_id"], channel_id)
+            )
+            return replaced
+        return await asyncio.to_thread(self._write, put)
+
+    async def get(self, message_id: int):
+        self.reads += 1
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT page FROM roll_pages WHERE message_id = ? AND updated_at > ?",
+            (message_id, time.time() - self.ttl)
+        )
+        if not rows:
+            self.missing += 1
+            return None
+        return json.loads(rows[0][0])
+
+    async def end(self, message_id: int, event_id: str, team_id: str):
+        """The team's roll is over: drop all its pages. Returns [(message_id, channel_id)]
+        of its pages on messages other than `message_id`."""
+        def end(db):
+            replaced = self._take_team(db, event_id, team_id, message_id)
+            db.execute("DELETE FROM roll_pages WHERE message_id = ?", (message_id,))
+            return replaced
+        return await asyncio.to_thread(self._write, end)
+
+    async def prune(self):
+        """Drop rows past the TTL; returns how many there were."""
+        def prune(db):
+            return db.execute("DELETE FROM roll_pages WHERE updated_at <= ?", (time.time() - self.ttl,)).rowcount
+        pruned = await asyncio.to_thread(self._write, prune)
+        if pruned:
+            logger.info(f"Pruned {pruned} expired roll pages")
+        return pruned
+
+    def stats(self):
+        return {"entries": self.entries, "reads": self.reads, "writes": self.writes, "missing": self.missing}
+
+roll_pages = RollPageStore()
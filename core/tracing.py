@@ -0,0 +1,106 @@
+import time
+import uuid
+import heapq
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+# How many of the slowest and most recent traces are kept for dumping
+SLOWEST_KEPT = 50
+RECENT_KEPT = 200
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+_current_trace = contextvars.ContextVar("trace", default=None)
+_current_depth = contextvars.ContextVar("trace_depth", default=0)
+
+class Trace:
+    """Timeline of one interaction: a span per stage (defer, backend calls, embed
+    building, the final edit), with offsets from the start of the interaction."""
+
+    def __init__(self, name: str, **attributes):
+        self.request_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.attributes = attributes
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+        self.spans = []
+
+    def to_dict(self):
+        return {
+            "request_id": self.request_id,
+            "name": self.name,
+            "attributes": self.attributes,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 2) if self.duration is not None else None,
+            "spans": sorted(self.spans, key=lambda entry: entry["start_ms"]),
+        }
+
+class TraceLog:
+    def __init__(self):
+        self._slowest = []  # Min-heap of (duration, sequence, trace)
+        self._sequence = 0
+        self.recent = deque(maxlen=RECENT_KEPT)
+
+    def record(self, trace: Trace):
+        self.recent.append(trace)
+        self._sequence += 1
+        entry = (trace.duration, self._sequence, trace)
+        if len(self._slowest) < SLOWEST_KEPT:
+            heapq.heappush(self._slowest, entry)
+        elif entry > self._slowest[0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def slowest(self, limit: int = 10, name: str = None):
+        traces = sorted((entry for entry in self._slowest if name is None or entry[2].name == name), reverse=True)
+        return [trace.to_dict() for _, _, trace in traces[:limit]]
+
+trace_log = TraceLog()
+
+@contextmanager
+def trace(name: str, **attributes):
+    """Trace everything done inside the block as one interaction."""
+    current = Trace(name, **attributes)
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        current.duration = time.perf_counter() - current._start
+        _current_trace.reset(token)
+        trace_log.record(current)
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time one stage of the current trace. Does nothing outside a trace."""
+    current = _current_trace.get()
+    if current is None:
+        yield
+        return
+
+    depth = _current_depth.get()
+    token = _current_depth.set(depth + 1)
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _current_depth.reset(token)
+        entry = {
+            "name": name,
+            "depth": depth,
+            "start_ms": round((start - current._start) * 1000, 2),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+        if attributes:
+            entry["attributes"] = attributes
+        if error:
+            entry["error"] = error
+        current.spans.append(entry)
+
+def current_request_id():
+    current = _current_trace.get()
+    return current.request_id if current else None
@@ -0,0 +1,307 @@
+import re
+import heapq
+from itertools import repeat
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+
+# Relevance weights. A query token scores against the item name higher than against
+# the source, and exact > prefix > substring > typo.
+EXACT, PREFIX, SUBSTRING, FUZZY = 10, 7, 4, 3
+SOURCE_WEIGHT = 0.6
+WHOLE_ITEM_BONUS = 20    # Query is the whole item name
+ITEM_PREFIX_BONUS = 8    # Item name starts with the query
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+# Sorts after every normalized token, so bisecting for `prefix + PREFIX_END` finds the
+# end of the tokens starting with `prefix`
+PREFIX_END = "\x7f"
+EMPTY = frozenset()
+
+def split_trigger(trigger: str):
+    """"Tanzanite fang:Zulrah" -> ("Tanzanite fang", "Zulrah"); "Dom" -> ("Dom", "")."""
+    if ":" in trigger:
+        item_name, source = trigger.split(":", 1)
+        return item_name, source
+    return trigger, ""
+
+# "Ahrim's Robe-top" -> "ahrim s robe top"
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+# "ring" -> {"ing", "rng", "rig", "rin"}
+def deletions(token: str):
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+def trigrams(token: str):
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+# Whether a and b are at most one edit (or adjacent swap) apart, by slicing instead
+# of filling the distance table
+def within_one_edit(a: str, b: str) -> bool:
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) != len(b):
+        return len(b) - len(a) == 1 and a[i:] == b[i + 1:]
+    if i == len(a) or a[i + 1:] == b[i + 1:]:
+        return True
+    return i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]
+
+# Levenshtein distance with adjacent transpositions, giving up once it exceeds `limit`
+def edit_distance(a: str, b: str, limit: int) -> int:
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if limit == 1:
+        return 0 if a == b else 1 if within_one_edit(a, b) else 2
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+def typo_limit(token: str) -> int:
+    if len(token) >= 8:
+        return 2
+    if len(token) >= 4:
+        return 1
+    return 0
+
+class TriggerIndex:
+    """Search index over the drop whitelist.
+
+    Triggers are split into item and source with split_trigger, normalized and
+    tokenized. Query tokens are matched against the token vocabulary by exact,
+    prefix (bisect over the sorted vocabulary), substring (trigram intersection)
+    and typo-tolerant matching (trigram candidates, then bounded edit distance),
+    and results are ranked by relevance. Build once per whitelist version;
+    searches don't rescan the trigger list."""
+
+    def __init__(self, triggers: list):
+        # Duplicate triggers would give a select menu duplicate option values
+        self.triggers = list(dict.fromkeys(triggers))
+        self.items = []
+        self._results = {}  # Recent (normalized query tokens, limit) -> results
+        self.postings = {"item": defaultdict(set), "source": defaultdict(set)}
+        self.doc_tokens = {"item": [], "source": []}  # Each trigger's distinct tokens
+        self.token_trigrams = defaultdict(set)
+        self.trigrams = {}  # token -> its trigrams
+        self.token_lengths = defaultdict(set)  # length -> tokens
+        self.deletions = defaultdict(set)  # one-deletion variant -> tokens, for one-typo matching
+
+        for doc_id, trigger in enumerate(self.triggers):
+            item_name, source = split_trigger(trigger)
+            item = normalize(item_name)
+            self.items.append(item)
+            self.doc_tokens["item"].append(tuple(set(item.split())))
+            self.doc_tokens["source"].append(tuple(set(normalize(source).split())))
+            for field in ("item", "source"):
+                for token in self.doc_tokens[field][doc_id]:
+                    self.postings[field][token].add(doc_id)
+
+        # Position of each trigger in tiebreak order: shorter item names first, then alphabetical
+        self.order = [0] * len(self.triggers)
+        tiebreak = sorted(range(len(self.triggers)), key=lambda doc_id: (len(self.items[doc_id]), self.triggers[doc_id].lower()))
+        for position, doc_id in enumerate(tiebreak):
+            self.order[doc_id] = position
+        # Item names in order, for finding the triggers whose name starts with the query
+        by_item = sorted(range(len(self.items)), key=self.items.__getitem__)
+        self.sorted_items = [self.items[doc_id] for doc_id in by_item]
+        self.sorted_ids = by_item
+
+        self.vocabulary = sorted(set(self.postings["item"]) | set(self.postings["source"]))
+        for token in self.vocabulary:
+            self.trigrams[token] = trigrams(token)
+            self.token_lengths[len(token)].add(token)
+            # Queries allowed one typo are 4-7 characters, so only tokens of 3-8 can match
+            if 3 <= len(token) <= 8:
+                for variant in deletions(token):
+                    self.deletions[variant].add(token)
+            for gram in self.trigrams[token]:
+                self.token_trigrams[gram].add(token)
+            # Every token gets an entry in both fields, so lookups need no default
+            self.postings["item"].setdefault(token, set())
+            self.postings["source"].setdefault(token, set())
+
+    def __len__(self):
+        return len(self.triggers)
+
+    # Vocabulary tokens matching one query token exactly, by prefix or as a
+    # substring, as {score: tokens}
+    def _match_token(self, query_token: str):
+        # Exact and prefix matches are a range of the sorted vocabulary
+        start = bisect_left(self.vocabulary, query_token)
+        end = bisect_left(self.vocabulary, query_token + PREFIX_END, start)
+        matches = {PREFIX: self.vocabulary[start:end]}
+        if matches[PREFIX] and matches[PREFIX][0] == query_token:
+            matches[EXACT] = [matches[PREFIX].pop(0)]
+
+        if len(query_token) < 3:
+            return matches
+
+        # A token containing the query contains every trigram inside it, so only the
+        # intersection of those trigrams' tokens needs the substring test
+        inner = sorted((self.token_trigrams.get(query_token[i:i + 3], EMPTY) for i in range(len(query_token) - 2)), key=len)
+        contained = inner[0].intersection(*inner[1:]).difference(self.vocabulary[start:end])
+        if len(query_token) > 3:
+            contained = {token for token in contained if query_token in token}
+        matches[SUBSTRING] = contained
+        return matches
+
+    # Vocabulary tokens within typo_limit edits of the query token, leaving out the
+    # ones `matches` already has
+    def _match_typos(self, query_token: str, matches: dict):
+        limit = typo_limit(query_token)
+        if not limit:
+            return []
+
+        if limit == 1:
+            # Tokens one edit or swap away share a one-deletion variant with the query
+            # (or are one), so the candidates come straight from the deletion map
+            variants = deletions(query_token)
+            candidates = set(self.deletions.get(query_token, EMPTY)).union(*map(self.deletions.get, variants, repeat(EMPTY)))
+            candidates.update(variant for variant in variants if variant in self.trigrams)
+            candidates.difference_update(*matches.values())
+            return [token for token in candidates if within_one_edit(query_token, token)]
+
+        # One edit changes at most three trigrams, an adjacent swap four, so a typo
+        # match shares all but 4 * limit of the query's trigrams and has at least one
+        # of any 4 * limit + 1 of them: take the candidates from the rarest ones
+        grams = trigrams(query_token)
+        needed = len(grams) - 4 * limit
+        rarest = sorted((self.token_trigrams.get(gram, EMPTY) for gram in grams), key=len)[:4 * limit + 1]
+        lengths = [self.token_lengths.get(n, EMPTY) for n in range(len(query_token) - limit, len(query_token) + limit + 1)]
+        candidates = set().union(*(tokens & length for tokens in rarest for length in lengths))
+        candidates.difference_update(*matches.values())
+        return [
+            token for token in candidates
+            if (needed <= 0 or len(grams & self.trigrams[token]) >= needed)
+            and edit_distance(query_token, token, limit) <= limit
+        ]
+
+    # {score: triggers} for one query token's matches. With `within`, only those
+    # triggers are looked at, and only the matching tokens they contain.
+    def _postings(self, matches: dict, within: set = None):
+        by_score = defaultdict(set)
+        for field, weight in (("item", 1), ("source", SOURCE_WEIGHT)):
+            postings = self.postings[field]
+            if within is not None:
+                present = set().union(*map(self.doc_tokens[field].__getitem__, within))
+            for score, tokens in matches.items():
+                if within is None:
+                    by_score[score * weight].update(*map(postings.__getitem__, tokens))
+                else:
+                    by_score[score * weight].update(*[postings[token] & within for token in present.intersection(tokens)])
+        return by_score
+
+    def search(self, query: str, limit: int = None):
+        """Returns (triggers, total): up to `limit` matching triggers, most relevant
+        first, and how many matched in all.
+
+        Typo matching is only tried when exact, prefix and substring matches of every
+        query word don't already fill `limit`, so `total` then counts those alone."""
+        # Keyed on the normalized query, so "Fang", "fang " and "FANG" share an entry
+        query_tokens = tuple(normalize(query).split())
+        key = (query_tokens, limit)
+        if key not in self._results:
+            if len(self._results) >= 256:
+                self._results.clear()
+            self._results[key] = self._search(query_tokens, limit)
+        return self._results[key]
+
+    def _search(self, query_tokens, limit):
+        if not query_tokens:
+            return [], 0
+
+        token_matches = [self._match_token(query_token) for query_token in query_tokens]
+        if limit is not None:
+            # Partial matches don't count here: "dragon pikaxe" fills any limit with
+            # other dragon items and would never get to "Dragon pickaxe"
+            ranked, total, complete = self._rank(query_tokens, token_matches, limit)
+            if complete >= limit:
+                return ranked, total
+
+        typos = [self._match_typos(query_token, matches) for query_token, matches in zip(query_tokens, token_matches)]
+        if limit is not None and not any(typos):
+            return ranked, total
+        token_matches = [{**matches, FUZZY: tokens} for matches, tokens in zip(token_matches, typos)]
+        ranked, total, _ = self._rank(query_tokens, token_matches, limit)
+        return ranked, total
+
+    # Ranks the triggers matching each query token's {score: tokens}. Returns
+    # (triggers, total, how many matched every query token).
+    def _rank(self, query_tokens, token_matches, limit):
+        # Prefer triggers matching every query word. Starting from the word with the
+        # fewest matching tokens, each next word only looks at the triggers matched so far.
+        postings = [None] * len(token_matches)
+        complete = None
+        for i in sorted(range(len(token_matches)), key=lambda i: sum(map(len, token_matches[i].values()))):
+            postings[i] = self._postings(token_matches[i], complete)
+            complete = set().union(*postings[i].values())
+        candidates = complete
+        if not complete:
+            # No trigger has every word; fall back to partial matches
+            postings = [self._postings(matches) for matches in token_matches]
+            candidates = set().union(*(docs for by_score in postings for docs in by_score.values()))
+
+        # {score: triggers}, each candidate under the sum of the best score it gets
+        # for every query token
+        levels = defaultdict(set)
+        if len(postings) == 1:
+            pending = set(candidates)
+            for score in sorted(postings[0], reverse=True):
+                levels[score] = postings[0][score] & pending
+                pending -= levels[score]
+        else:
+            scores = defaultdict(float)
+            for by_score in postings:
+                pending = set(candidates)
+                for score in sorted(by_score, reverse=True):
+                    docs = by_score[score] & pending
+                    pending -= docs
+                    for doc_id in docs:
+                        scores[doc_id] += score
+            for doc_id, score in scores.items():
+                levels[score].add(doc_id)
+
+        # Item name bonuses. The triggers whose item name starts with the query are a
+        # range of the sorted item names, and the whole-name ones the start of it.
+        normalized_query = " ".join(query_tokens)
+        start = bisect_left(self.sorted_items, normalized_query)
+        whole = bisect_left(self.sorted_items, normalized_query + " ", start)
+        end = bisect_left(self.sorted_items, normalized_query + PREFIX_END, whole)
+        whole_item = set(self.sorted_ids[start:whole]) & candidates
+        item_prefix = set(self.sorted_ids[whole:end]) & candidates
+        if whole_item or item_prefix:
+            bonused = defaultdict(set)
+            for score, docs in levels.items():
+                for bonus, boosted in ((WHOLE_ITEM_BONUS, whole_item), (ITEM_PREFIX_BONUS, item_prefix)):
+                    moved = docs & boosted
+                    if moved:
+                        docs -= moved
+                        bonused[score + bonus] |= moved
+            for score, docs in bonused.items():
+                levels.setdefault(score, set()).update(docs)
+
+        ranked = []
+        for score in sorted(levels, reverse=True):
+            if limit is None:
+                ranked.extend(sorted(levels[score], key=self.order.__getitem__))
+                continue
+            needed = limit - len(ranked)
+            if needed <= 0:
+                break
+            ranked.extend(heapq.nsmallest(needed, levels[score], key=self.order.__getitem__))
+        return [self.triggers[doc_id] for doc_id in ranked], len(candidates), len(complete)
@@ -0,0 +1,141 @@
+from dotenv import load_dotenv
+load_dotenv()
+import os
+import sys
+import time
+import logging
+from collections import OrderedDict, defaultdict
+
+logger = logging.getLogger("ui_state")
+
+# Every named registry, so their counts can be reported together
+registries: dict = {}
+
+# How deep approximate_size follows references from an entry. Past this, objects are
+# counted by their own size only, which keeps it from walking the whole client cache.
+SIZE_DEPTH = 3
+
+def approximate_size(obj, seen: set, depth: int = SIZE_DEPTH) -> int:
+    """sys.getsizeof of `obj` plus what it references, down to `depth` levels.
+    Objects whose id is in `seen` are skipped, so shared ones are counted once."""
+    if id(obj) in seen or isinstance(obj, (type, type(sys), type(approximate_size))):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj, 0)
+    if depth <= 0:
+        return size
+
+    if isinstance(obj, dict):
+        children = [value for pair in obj.items() for value in pair]
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        children = list(obj)
+    elif isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return size
+    else:
+        children = list(getattr(obj, "__dict__", {}).values())
+        for cls in type(obj).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                if hasattr(obj, slot):
+                    children.append(getattr(obj, slot))
+    return size + sum(approximate_size(child, seen, depth - 1) for child in children)
+
+class StateRegistry:
+    """Short-lived UI state (open views and what they point at) keyed by team or user.
+
+    Entries expire `ttl` seconds after they were last touched, and the least recently
+    touched is dropped once `maxsize` is reached. Whatever way an entry goes (finished,
+    replaced, expired, evicted, error) the on_end hooks are called with it, so views
+    can be stopped and messages tidied up in one place instead of on every path."""
+
+    def __init__(self, name: str, ttl: float, maxsize: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()  # key -> [expires_at, value]
+        self._start_hooks = []
+        self._end_hooks = []
+        self.started = 0
+        self.ended = defaultdict(int)  # reason -> count
+        # ids of long-lived objects entries point at (the bot, its cache) that
+        # approximate_size shouldn't count
+        self.shared_ids = set()
+        registries[name] = self
+
+    def on_start(self, hook):
+        """Register `hook(key, value)`, called when an entry is added."""
+        self._start_hooks.append(hook)
+        return hook
+
+    def on_end(self, hook):
+        """Register `hook(key, value, reason)`, called when an entry is removed."""
+        self._end_hooks.append(hook)
+        return hook
+
+    def start(self, key, value):
+        previous = self._entries.get(key)
+        if previous is not None and previous[1] is not value:
+            self.end(key, "replaced")
+
+        self._entries[key] = [time.monotonic() + self.ttl, value]
+        self._entries.move_to_end(key)
+        self.started += 1
+        self._call(self._start_hooks, key, value)
+
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self.end(oldest, "evicted")
+        return value
+
+    def get(self, key, default=None):
+        """The live value for `key`, which counts as activity and pushes its expiry back."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        if entry[0] <= time.monotonic():
+            self.end(key, "expired")
+            return default
+        entry[0] = time.monotonic() + self.ttl
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def end(self, key, reason: str = "finished"):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self.ended[reason] += 1
+        self._call(self._end_hooks, key, entry[1], reason)
+        return entry[1]
+
+    def sweep(self):
+        """End every expired entry; returns how many there were."""
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            self.end(key, "expired")
+        return len(expired)
+
+    def _call(self, hooks, *args):
+        for hook in hooks:
+            try:
+                hook(*args)
+            except Exception as e:
+                logger.error(f"{self.name} hook {getattr(hook, '__name__', hook)} failed: {str(e)}", exc_info=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def stats(self):
+        seen = set(self.shared_ids)
+        return {
+            "entries": len(self._entries),
+            "started": self.started,
+            "ended": dict(self.ended),
+            "approx_bytes": sum(approximate_size(value, seen) for _, value in self._entries.values()),
+        }
+
+# Open /items views by user id. A user has one at a time; opening another, or moving
+# between the inventory and an item, stops the previous view.
+item_views = StateRegistry("item_view", ttl=float(os.getenv("ITEM_VIEW_TTL", "180")), maxsize=int(os.getenv("ITEM_VIEW_MAX", "500")))
@@ -0,0 +1,114 @@
+from dotenv import load_dotenv
+load_dotenv()
+import os
+import json
+import time
+import asyncio
+
+import aiohttp
+
+from core.backend import backend
+from core.trigger_index import TriggerIndex
+
+class DropWhitelist:
+    """Cached copy of the backend's DROP-trigger whitelist.
+
+    Refreshed in the background by the Submit cog and revalidated with
+    ETag/If-Modified-Since when the backend sends them, so a drop search normally
+    reads straight from memory. `version` changes whenever the trigger list does."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.triggers = None
+        self.version = 0
+        self.etag = None
+        self.last_modified = None
+        self.fetched_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._lock = asyncio.Lock()
+        self._index = None
+        self._index_version = None
+
+    def is_fresh(self):
+        return self.triggers is not None and time.monotonic() - self.fetched_at < self.ttl
+
+    async def get(self):
+        """Returns the list of "Item:Source" (or bare "Item") triggers, or None when it
+        has never loaded. A failed refresh keeps serving the last good list."""
+        if self.is_fresh():
+            self.hits += 1
+            return self.triggers
+
+        self.misses += 1
+        await self.refresh()
+        return self.triggers
+
+    # Search index over the current triggers, rebuilt only when the list has changed
+    def index(self) -> TriggerIndex:
+        if self._index is None or self._index_version != self.version:
+            self._index = TriggerIndex(self.triggers or [])
+            self._index_version = self.version
+        return self._index
+
+    # force refetches the whole list, without the conditional headers (after an edit).
+    # revalidate asks the backend even while the copy is fresh, but conditionally, so
+    # the background loop doesn't skip ticks landing on the TTL edge.
+    async def refresh(self, force: bool = False, revalidate: bool = False):
+        async with self._lock:
+            # Another caller refreshed it while we waited for the lock
+            if not force and not revalidate and self.is_fresh():
+                return True
+
+            headers = {"Accept": "application/json"}
+            if not force:
+                if self.etag:
+                    headers["If-None-Match"] = self.etag
+                if self.last_modified:
+                    headers["If-Modified-Since"] = self.last_modified
+
+            try:
+                async with backend.session.get(backend.base_url + "/events/whitelist", headers=headers) as response:
+                    if response.status == 304:
+                        self.not_modified += 1
+                        self.fetched_at = time.monotonic()
+                        return True
+                    if response.status == 404:
+                        # No active event, so there is nothing to submit against
+                        print("Whitelist fetch failed: 404 (no active event)")
+                        self._store(None, None, None)
+                        return False
+                    if response.status != 200:
+                        print(f"Whitelist fetch failed: {response.status}")
+                        return False
+
+                    # Backend returns json.dumps(...) from Flask, served as text/html,
+                    # so parse the body ourselves instead of trusting the mimetype.
+                    data = json.loads(await response.text())
+                    triggers = data.get("triggers", []) if isinstance(data, dict) else None
+                    if not isinstance(triggers, list):
+                        # Keep serving the last good list rather than caching garbage
+                        print(f"Whitelist fetch failed: unexpected body {str(data)[:200]}")
+                        return False
+                    self._store(triggers, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                    return True
+            except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError) as e:
+                print(f"Error fetching whitelist: {e}")
+                return False
+            except Exception as e:
+                # Called from the Submit cog's refresh loop, which would stop for good on an escaped error
+                print(f"Unexpected error refreshing whitelist: {e}")
+                return False
+
+    def _store(self, triggers, etag, last_modified):
+        if triggers != self.triggers:
+            self.version += 1
+        self.triggers = triggers
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.monotonic()
+        # Build the search index here, in the background refresh, not on the next search
+        self.index()
+
+drop_whitelist = DropWhitelist(ttl=float(os.getenv("WHITELIST_CACHE_TTL", "300")))
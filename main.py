@@ -5,14 +5,23 @@ from dotenv import load_dotenv
 load_dotenv()
 import os
 
-from fastapi import FastAPI
+# Intents and member/message caching come from GATEWAY_PROFILE; imported first so the
+# startup report counts from here
+from core.gateway_profile import gateway_profile
+
 from threading import Thread
 import uvicorn
 import asyncio
 
-intents = discord.Intents.all()
-intents.message_content = True
-intents.members = True
+# Log through a background thread, before any cog creates its logger
+from core.logs import setup_logging
+setup_logging()
+
+# Report any synchronous network call that would stall the gateway loop
+from core import blocking_guard
+blocking_guard.install()
+
+intents = gateway_profile.intents
 
 client = discord.Client(intents = intents)
 
@@ -28,14 +37,30 @@ from cogs.event_mod import EventMod
 from cogs.event_user import EventUser
 from cogs.register_alt import RegisterAlt
 from cogs.guess import Guess
+from cogs.guild_index_sync import GuildIndexSync
+from cogs.metrics import Metrics
+from cogs.gateway_startup import GatewayStartup
+from core.backend import backend
 
 class Stabilibot(commands.Bot):
   def __init__(self):
-    super().__init__(intents = intents)
-    self.app = FastAPI()
+    super().__init__(**gateway_profile.bot_options())
+
+  async def start(self, *args, **kwargs):
+    # Open the shared backend connection pool before any cog can make a call
+    await backend.start()
+    # The internal API starts once here, not in on_ready, which fires again on every reconnect
+    await self.get_cog("Api").start()
+    await super().start(*args, **kwargs)
+
+  async def close(self):
+    # Drain in-flight API requests while Discord is still reachable
+    await self.get_cog("Api").stop()
+    await super().close()
+    await backend.close()
 
   async def on_ready(self):
-    print(f"Logged in as {self.user}")
+    print(f"Logged in as {self.user} ({gateway_profile.describe()})")
   
   async def on_message(self, message):
     if message.author == self.user:
@@ -44,6 +69,7 @@ class Stabilibot(commands.Bot):
 
   async def on_application_command_error(self, context: commands.Context, exception: commands.CommandError) -> None:
     print("Error!:", exception)
+    self.get_cog("Metrics").finish(context, "error")
 
     await super().on_application_command_error(context, exception)
 
@@ -61,5 +87,8 @@ bot.add_cog(EventMod(bot))
 bot.add_cog(EventUser(bot))
 bot.add_cog(RegisterAlt(bot))
 bot.add_cog(Guess(bot))
+bot.add_cog(GuildIndexSync(bot))
+bot.add_cog(Metrics(bot))
+bot.add_cog(GatewayStartup(bot))
 
 bot.run(os.getenv("TOKEN"))
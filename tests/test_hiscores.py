@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("dotenv")
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import core.hiscores
+from core.backend import backend
+from core.hiscores import HiscoresClient
+
+class StandIn:
+    """Local index_lite.ws: names starting with "x" don't exist. Records the names it
+    was asked for and the most requests it had open at once."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = []
+        self.active = 0
+        self.peak = 0
+
+    async def index_lite(self, request):
+        self.requests.append(request.query["player"])
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.active -= 1
+        if request.query["player"].lower().startswith("x"):
+            return web.Response(status=404)
+        return web.Response(text="1,2277,4600000000\n")
+
+def run(check, latency: float = 0.0, **client_options):
+    stand_in = StandIn(latency)
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/index_lite.ws", stand_in.index_lite)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            client = HiscoresClient(str(server.make_url("/index_lite.ws")), **client_options)
+            await check(client, stand_in)
+        finally:
+            await backend.close()
+            await server.close()
+
+    asyncio.run(main())
+
+def test_found_name_is_cached():
+    async def check(client, stand_in):
+        assert await client.exists("Lynx Titan") is True
+        # Same name as far as Jagex is concerned
+        assert await client.exists("lynx_titan") is True
+        assert stand_in.requests == ["Lynx Titan"]
+        assert client.cache.hits == 1
+
+    run(check)
+
+def test_missing_name_expires_after_negative_ttl(monkeypatch):
+    monkeypatch.setattr(core.hiscores, "NEGATIVE_TTL", 0.05)
+
+    async def check(client, stand_in):
+        assert await client.exists("xNotAName") is False
+        assert await client.exists("xNotAName") is False
+        assert len(stand_in.requests) == 1
+
+        await asyncio.sleep(0.1)
+        assert await client.exists("xNotAName") is False
+        assert len(stand_in.requests) == 2
+
+    run(check)
+
+def test_concurrent_lookups_share_one_request():
+    async def check(client, stand_in):
+        results = await asyncio.gather(*[client.exists(name) for name in ["Woox", "woox", "WOOX"] * 4])
+        assert results == [True] * 12
+        assert stand_in.requests == ["Woox"]
+
+    run(check, latency=0.05)
+
+def test_requests_are_capped_at_max_concurrency():
+    async def check(client, stand_in):
+        names = [f"Player {i}" for i in range(8)]
+        assert await asyncio.gather(*[client.exists(name) for name in names]) == [True] * 8
+        assert len(stand_in.requests) == 8
+        assert stand_in.peak == 2
+
+    run(check, latency=0.05, max_concurrency=2)
@@ -0,0 +1,32 @@
+from core.trigger_index import TriggerIndex
+
+DRAGON_ITEMS = [
+    f"Dragon {name}:Boss" for name in (
+        "axe", "claws", "dagger", "scimitar", "longsword", "platelegs", "plateskirt", "chainbody",
+        "med helm", "full helm", "boots", "gloves", "defender", "hunter crossbow", "harpoon",
+        "warhammer", "mace", "halberd", "spear", "2h sword", "sq shield", "kiteshield", "bones",
+        "arrowtips", "darts", "javelin heads", "bolts", "crossbow", "limbs", "pickaxe handle",
+    )
+]
+
+def test_typo_query_with_common_first_word():
+    # "dragon" alone fills the limit; the typo in "pikaxe" still has to find the pickaxe
+    index = TriggerIndex(DRAGON_ITEMS + ["Dragon pickaxe:Chambers of Xeric"])
+    results, total = index.search("dragon pikaxe", limit=25)
+    assert results == ["Dragon pickaxe:Chambers of Xeric", "Dragon pickaxe handle:Boss"]
+    assert total == 2
+
+def test_typo_pass_skipped_when_complete_matches_fill_the_limit():
+    index = TriggerIndex(DRAGON_ITEMS + ["Dragon pickaxe:Chambers of Xeric"])
+    results, total = index.search("dragon", limit=25)
+    assert len(results) == 25
+    assert total == len(DRAGON_ITEMS) + 1
+
+def test_ranking():
+    index = TriggerIndex(["Tanzanite fang:Zulrah", "Zulrah's scales:Zulrah", "Fang:Vorkath", "Tassets:Bandos"])
+    assert index.search("fang")[0][:2] == ["Fang:Vorkath", "Tanzanite fang:Zulrah"]
+    assert index.search("zulrah")[0] == ["Zulrah's scales:Zulrah", "Tanzanite fang:Zulrah"]
+    assert index.search("tasets") == (["Tassets:Bandos"], 1)
+    # A swap in a short word leaves no trigram in common, so it's found by deletions
+    assert index.search("fnag")[0][:2] == ["Fang:Vorkath", "Tanzanite fang:Zulrah"]
+    assert index.search("") == ([], 0)